@@ -0,0 +1,14 @@
+"""Система учёта книг в библиотеке (уровень сложности 2).\n
+Классы модуля library доступны из пакета, но модуль импортируется только
+при первом обращении к ним: импорт пакета ничего не делает, и запуск
+python -m lv2_library.library не находит модуль уже загруженным.
+"""
+
+__all__ = ['Book', 'Library', 'LibraryConsole', 'Result', 'Status']
+
+
+def __getattr__(name: str):
+    if name in __all__:
+        from . import library
+        return getattr(library, name)
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
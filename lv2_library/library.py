@@ -1,4 +1,42 @@
+import time
+import unicodedata
+from collections import OrderedDict
+from enum import Enum
+from typing import NamedTuple
+
+
+class Status(Enum):
+    """Коды результата операций библиотеки."""
+    OK = 'Книга добавлена'
+    NOT_A_BOOK = 'Не является книгой'
+
+
+class Result(NamedTuple):
+    """Результат операции: код и затронутая книга."""
+    status: Status
+    book: object = None
+
+
+class CacheStats(NamedTuple):
+    """Счетчики кэша поиска."""
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    size: int
+
+
+def normalize(text: str) -> str:
+    """Приводит строку к виду для поиска: NFKC, без регистра, "ё" как "е",
+    пробелы схлопнуты в один."""
+    text = unicodedata.normalize('NFKC', text).casefold().replace('ё', 'е')
+    return ' '.join(text.split())
+
+#######################################################################
+
+
 class Book:
+    __slots__ = ('title', 'author', 'year')
 
     def __init__(self, title: str, author: str, year: int) -> None:
         self.title = title
@@ -12,53 +50,218 @@ class Book:
 #######################################################################
 
 
+class SearchCache:
+    # Длина начала запроса, по которому запросы раскладываются по корзинам для инвалидации.
+    PREFIX = 3
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None, clock=time.monotonic) -> None:
+        """LRU-кэш результатов поиска с необязательным временем жизни записей.
+        Args:
+            maxsize (int, optional): Наибольшее количество записей, 0 - кэш выключен.
+            ttl (float | None, optional): Время жизни записи в секундах, None - без ограничения.
+            clock (Callable, optional): Источник времени. Defaults to time.monotonic.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        # Запрос -> (момент устаревания или None, результат).
+        self.entries = OrderedDict()
+        # Начало запроса -> множество запросов с этим началом.
+        self.buckets = dict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, query: str):
+        """Возвращает результат из кэша или None, если его нет или он устарел."""
+        entry = self.entries.get(query)
+        if (entry is not None and entry[0] is not None and self.clock() >= entry[0]):
+            self.drop(query)
+            self.evictions += 1
+            entry = None
+        if (entry is None):
+            self.misses += 1
+            return None
+        self.entries.move_to_end(query)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, query: str, result) -> None:
+        """Сохраняет результат, вытесняя самую старую запись при переполнении."""
+        if (self.maxsize <= 0):
+            return
+        expires = None if self.ttl is None else self.clock() + self.ttl
+        if (query not in self.entries):
+            self.buckets.setdefault(query[:self.PREFIX], set()).add(query)
+        self.entries[query] = (expires, result)
+        self.entries.move_to_end(query)
+        if (len(self.entries) > self.maxsize):
+            self.drop(next(iter(self.entries)))
+            self.evictions += 1
+
+    def drop(self, query: str) -> None:
+        """Удаляет запись запроса и убирает запрос из его корзины."""
+        del self.entries[query]
+        bucket = self.buckets[query[:self.PREFIX]]
+        bucket.discard(query)
+        if (not bucket):
+            del self.buckets[query[:self.PREFIX]]
+
+    def invalidate_matching(self, key: str) -> None:
+        """Удаляет результаты запросов, которые являются подстрокой ключа новой книги.\n
+        Начало такого запроса - подстрока ключа длиной не больше PREFIX, поэтому
+        проверяются только корзины этих подстрок: работа зависит от длины ключа,
+        а не от размера кэша. Остальные записи новая книга не затрагивает и они
+        остаются в кэше.
+        """
+        n = self.PREFIX
+        prefixes = {key[i:i + size] for size in range(n + 1) for i in range(len(key) - size + 1)}
+        for prefix in prefixes & self.buckets.keys():
+            for query in [q for q in self.buckets[prefix] if q in key]:
+                self.drop(query)
+                self.invalidations += 1
+
+    def get_stats(self) -> CacheStats:
+        return CacheStats(self.hits, self.misses, self.evictions, self.invalidations, len(self.entries))
+
+#######################################################################
+
+
 class Library:
-    def __init__(self) -> None:
+    # Длина n-граммы в инвертированном индексе поиска.
+    NGRAM = 3
+
+    def __init__(self, cache_size: int = 1024, cache_ttl: float | None = None) -> None:
+        self.search_cache = SearchCache(cache_size, cache_ttl)
         self.lib = []
+        self.search_keys = []
+        self.index_ngrams = dict()
+
+    def add_ngrams_in_index(self, position: int, key: str) -> None:
+        """Добавляет позицию книги в списки всех n-грамм её поискового ключа.
+        Args:
+            position (int): Позиция книги в списке self.lib.
+            key (str): Нормализованный поисковый ключ книги.
+        """
+        n = self.NGRAM
+        for gram in {key[i:i + n] for i in range(len(key) - n + 1)}:
+            posting = self.index_ngrams.get(gram)
+            if posting is None:
+                self.index_ngrams[gram] = [position]
+            else:
+                posting.append(position)
 
-    def add_book(self, book: Book) -> None:
+    def add_book(self, book: Book) -> Result:
         """Метод для добавления книги в библиотеку."""
-        if (isinstance(book, Book)):
-            self.lib.append(book)
-        else:
+        if (not isinstance(book, Book)):
+            return Result(Status.NOT_A_BOOK)
+        key = normalize(f'{book.title} {book.author}')
+        self.add_ngrams_in_index(len(self.lib), key)
+        self.lib.append(book)
+        self.search_keys.append(key)
+        self.search_cache.invalidate_matching(key)
+        return Result(Status.OK, book)
+
+    def search_book(self, prompt: str) -> list:
+        """Метод для поиска книги по названию или автору.\n
+        Не чувствителен к регистру, "ё"/"е" и лишним пробелам. Кандидаты отбираются пересечением списков
+        n-граммного индекса и затем проверяются на точное вхождение подстроки.
+        Результаты кэшируются кортежами, а каждый вызов получает свой список.
+        Args:
+            prompt (str): Строка содержащая название книги или автора.
+        Returns:
+            list: Список найденных книг в порядке их добавления в библиотеку.
+        """
+        query = normalize(prompt)
+        result = self.search_cache.get(query)
+        if (result is None):
+            result = tuple(self.find_books(query))
+            self.search_cache.put(query, result)
+        return list(result)
+
+    def find_books(self, query: str) -> list:
+        """Ищет книги по нормализованному запросу без кэша.
+        Args:
+            query (str): Нормализованная строка запроса.
+        Returns:
+            list: Список найденных книг в порядке их добавления в библиотеку.
+        """
+        n = self.NGRAM
+
+        # Запрос короче n-граммы: проверяем готовые ключи без индекса.
+        if len(query) < n:
+            return [self.lib[i] for i, key in enumerate(self.search_keys) if query in key]
+
+        postings = []
+        for gram in {query[i:i + n] for i in range(len(query) - n + 1)}:
+            posting = self.index_ngrams.get(gram)
+            if posting is None:
+                return []
+            postings.append(posting)
+
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return []
+
+        return [self.lib[i] for i in sorted(candidates) if query in self.search_keys[i]]
+
+
+#######################################################################
+
+
+class LibraryConsole:
+    def __init__(self, library: Library) -> None:
+        """Слой представления: выполняет операции библиотеки и печатает результат."""
+        self.library = library
+
+    def __getattr__(self, name: str):
+        return getattr(self.library, name)
+
+    def add_book(self, book: Book) -> Result:
+        """Метод для добавления книги в библиотеку с выводом ошибки."""
+        result = self.library.add_book(book)
+        if (result.status is Status.NOT_A_BOOK):
             print('Не является книгой')
+        return result
 
     def show_all_books(self) -> None:
         """Метод для отображения всех книг в библиотеке."""
-        for b in self.lib:
+        for b in self.library.lib:
             print(b.get_info_book())
 
-    def search_book(self, prompt: str) -> None:
-        """Метод для поиска книги по названию или автору."""
-        answer = []
-        for b in self.lib:
-            if (prompt.lower() in f'{b.title} {b.author}'.lower()):
-                answer.append(b)
-
-        if (len(answer) != 0):
-            print(f'Найдено совпадений {len(answer)}')
-            for b in answer:
-                print(b.get_info_book())
-        else:
-            print(f'Найдено совпадений {len(answer)}')
+    def show_search_book(self, prompt: str) -> None:
+        """Распечатывает результат поиска книги по названию или автору."""
+        answer = self.library.search_book(prompt)
+        print(f'Найдено совпадений {len(answer)}')
+        for b in answer:
+            print(b.get_info_book())
 
 #######################################################################
 
 
-b1 = Book("Простой Python", "Билл Любанович", 2021)
-b2 = Book("FastAPI", "Билл Любанович", 2024)
-b3 = Book("Внутреннее устройство Linux", "Дмитрий Кетов", 2021)
-b4 = Book("Linux Книга рецептов", "Карла Шрёдер", 2022)
-b5 = Book("Чистый код", "Роберт Мартин", 2024)
-b6 = Book("Идеальная работа", "Роберт Мартин", 2022)
-b7 = Book("Идеальный программист", "Роберт Мартин", 2015)
+def main() -> None:
+    b1 = Book("Простой Python", "Билл Любанович", 2021)
+    b2 = Book("FastAPI", "Билл Любанович", 2024)
+    b3 = Book("Внутреннее устройство Linux", "Дмитрий Кетов", 2021)
+    b4 = Book("Linux Книга рецептов", "Карла Шрёдер", 2022)
+    b5 = Book("Чистый код", "Роберт Мартин", 2024)
+    b6 = Book("Идеальная работа", "Роберт Мартин", 2022)
+    b7 = Book("Идеальный программист", "Роберт Мартин", 2015)
+
+    library = LibraryConsole(Library())
+
+    library.add_book(b1)
+    library.add_book(b2)
+    library.add_book(b3)
+    library.add_book(b4)
+    library.add_book(b5)
+    library.add_book(b6)
+    library.add_book(b7)
 
-library = Library()
 
-library.add_book(b1)
-library.add_book(b2)
-library.add_book(b3)
-library.add_book(b4)
-library.add_book(b5)
-library.add_book(b6)
-library.add_book(b7)
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,7 @@
+"""Управление библиотекой: несколько вариантов решения одного задания.\n
+- library_management: учёт книг по названию без читателей.
+- library_manag_advanc: книги и читатели по ID, лимит выдачи.
+- library_manag_revol: индексы по названию, автору и читателю.\n
+Модули не импортируются здесь, чтобы импорт пакета ничего не делал.
+Демонстрация запускается через: python -m lv2_library_management [модуль]
+"""
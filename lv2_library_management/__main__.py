@@ -0,0 +1,19 @@
+import sys
+from importlib import import_module
+
+DEMOS = ('library_manag_revol', 'library_manag_advanc', 'library_management')
+
+
+def main() -> None:
+    """Запускает демонстрацию выбранного модуля, по умолчанию library_manag_revol."""
+
+    name = sys.argv[1] if len(sys.argv) > 1 else DEMOS[0]
+
+    if name not in DEMOS:
+        sys.exit(f'ОШИБКА: Неизвестный модуль "{name}". Доступны: {", ".join(DEMOS)}')
+
+    import_module(f'{__package__}.{name}').main()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from .library_manag_revol import DAY, Library, normalize
+
+WEEK = 7 * DAY
+UNKNOWN = 'Неизвестно'
+
+# Типы колонок LoanHistory: моменты, ID книг, ID читателей, признаки возврата.
+COLUMN_TYPES = (np.int64, np.int64, np.int64, np.int8)
+
+
+class TitleCount(NamedTuple):
+    """Название и количество его выдач."""
+
+    title: str
+    loans: int
+
+
+class AuthorUtilization(NamedTuple):
+    """Загрузка книг автора: экземпляры, выдачи, дни на руках и доля времени на руках."""
+
+    author: str
+    copies: int
+    loans: int
+    loan_days: float
+    utilization: float
+
+
+class WeekActivity(NamedTuple):
+    """Начало недели в секундах и количество читателей, бравших или возвращавших книги."""
+
+    start: int
+    readers: int
+
+
+class Encoder:
+
+    def __init__(self) -> None:
+        """Кодирует ключи последовательными целыми числами с нуля.\n
+        Код - номер в массивах счетчиков, поэтому группировка по названию
+        или автору сводится к np.bincount по кодам. Для отчетов хранится
+        подпись: написание ключа, встреченное первым.
+        """
+
+        self.codes = dict()
+        self.labels = list()
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def encode(self, key: str | None, label: str) -> int:
+        code = self.codes.get(key)
+        if code is None:
+            code = self.codes[key] = len(self.labels)
+            self.labels.append(label)
+        return code
+
+
+def grow(counts: np.ndarray, size: int) -> np.ndarray:
+    """Дополняет массив счетчиков нулями до длины size."""
+
+    if len(counts) >= size:
+        return counts
+    return np.concatenate((counts, np.zeros(size - len(counts), dtype=counts.dtype)))
+
+
+class CirculationAnalytics:
+
+    def __init__(self, library: Library) -> None:
+        """Отчеты по истории выдач Library на колонках NumPy.\n
+        Колонки сегментов LoanHistory копируются в массивы NumPy, ID книг
+        переводятся в целые коды названий и авторов, и агрегаты считаются
+        группировкой np.bincount по кодам вместо перебора объектов.
+        Накопленные суммы хранятся между отчетами: refresh обрабатывает
+        только события, записанные после прошлого обновления, и каждый
+        отчет сначала вызывает его.
+        Args:
+            library (Library): Библиотека, историю которой нужно анализировать.
+        """
+
+        self.library = library
+        self.position = 0
+        self.first_time = None
+        self.titles = Encoder()
+        self.authors = Encoder()
+        # Известные книги, упорядоченные по ID, и коды их названий и авторов.
+        self.book_ids = np.zeros(0, dtype=np.int64)
+        self.book_titles = np.zeros(0, dtype=np.int64)
+        self.book_authors = np.zeros(0, dtype=np.int64)
+        self.title_loans = np.zeros(0, dtype=np.int64)
+        self.author_loans = np.zeros(0, dtype=np.int64)
+        # Сумма моментов возврата минус сумма моментов выдачи и число открытых выдач:
+        # время на руках к моменту now равно author_seconds + author_open * now.
+        self.author_seconds = np.zeros(0, dtype=np.int64)
+        self.author_open = np.zeros(0, dtype=np.int64)
+        self.week_readers = dict()
+        self.last_week = None
+        self.last_readers = np.zeros(0, dtype=np.int64)
+
+    def refresh(self) -> int:
+        """Обрабатывает события, записанные в историю после прошлого обновления.
+        Returns:
+            int: Количество обработанных событий.
+        """
+
+        history = self.library.loan_history
+        start = self.position
+        segment, offset = divmod(start, history.SEGMENT_SIZE)
+
+        for columns in history.segments[segment:]:
+            if offset < len(columns[0]):
+                # Срез array - копия, поэтому массив NumPy не держит буфер
+                # сегмента, и история может дописывать в него дальше.
+                self.add_events(*(np.frombuffer(column[offset:], dtype=dtype)
+                                  for column, dtype in zip(columns, COLUMN_TYPES)))
+            offset = 0
+
+        self.position = history.size
+        return self.position - start
+
+    def encode_books(self, book_ids: np.ndarray) -> tuple:
+        """Возвращает коды названий и авторов для каждого ID книги.\n
+        Библиотека опрашивается только о книгах, которых еще нет в
+        book_ids. Книга, удаленная до первого обновления, относится к
+        названию и автору UNKNOWN.
+        """
+
+        ids = np.unique(book_ids)
+        new_ids = ids[~np.isin(ids, self.book_ids, assume_unique=True)]
+
+        if len(new_ids):
+            titles = np.empty(len(new_ids), dtype=np.int64)
+            authors = np.empty(len(new_ids), dtype=np.int64)
+            for i, book_id in enumerate(new_ids.tolist()):
+                book = self.library.lib.get(book_id)
+                if book is None:
+                    titles[i] = self.titles.encode(None, UNKNOWN)
+                    authors[i] = self.authors.encode(None, UNKNOWN)
+                else:
+                    titles[i] = self.titles.encode(book.title_key, book.title)
+                    authors[i] = self.authors.encode(normalize(book.author), book.author)
+
+            ids = np.concatenate((self.book_ids, new_ids))
+            order = np.argsort(ids, kind='stable')
+            self.book_ids = ids[order]
+            self.book_titles = np.concatenate((self.book_titles, titles))[order]
+            self.book_authors = np.concatenate((self.book_authors, authors))[order]
+
+        rows = np.searchsorted(self.book_ids, book_ids)
+        return self.book_titles[rows], self.book_authors[rows]
+
+    def add_events(self, times: np.ndarray, book_ids: np.ndarray,
+                   reader_ids: np.ndarray, returns: np.ndarray) -> None:
+        """Добавляет упорядоченные по времени события к накопленным суммам."""
+
+        if self.first_time is None:
+            self.first_time = int(times[0])
+
+        titles, authors = self.encode_books(book_ids)
+        borrows = returns == 0
+
+        self.title_loans = grow(self.title_loans, len(self.titles))
+        self.title_loans += np.bincount(titles[borrows], minlength=len(self.titles))
+
+        size = len(self.authors)
+        self.author_loans = grow(self.author_loans, size)
+        self.author_seconds = grow(self.author_seconds, size)
+        self.author_open = grow(self.author_open, size)
+        borrowed = np.bincount(authors[borrows], minlength=size)
+        self.author_loans += borrowed
+        self.author_open += borrowed - np.bincount(authors[~borrows], minlength=size)
+        np.add.at(self.author_seconds, authors, np.where(borrows, -times, times))
+
+        self.add_week_readers(times // WEEK, reader_ids)
+
+    def add_week_readers(self, weeks: np.ndarray, reader_ids: np.ndarray) -> None:
+        """Дополняет количество разных читателей по неделям.\n
+        События идут по времени, поэтому с прошлым обновлением может
+        пересечься только его последняя неделя: для нее хранятся ID
+        читателей, а для остальных недель - только количество.
+        Пара неделя-читатель сворачивается в одно число int64, чтобы
+        убрать повторы одной сортировкой.
+        """
+
+        ids, ranks = np.unique(reader_ids, return_inverse=True)
+        pairs = np.unique((weeks - weeks[0]) * len(ids) + ranks)
+        offsets, ranks = np.divmod(pairs, len(ids))
+        numbers, starts, counts = np.unique(offsets, return_index=True, return_counts=True)
+        numbers += weeks[0]
+        readers = ids[ranks]
+        last = readers[starts[-1]:]
+
+        if numbers[0] == self.last_week:
+            merged = np.union1d(self.last_readers, readers[:counts[0]])
+            counts[0] = len(merged) - len(self.last_readers)
+            if len(numbers) == 1:
+                last = merged
+
+        for week, count in zip(numbers.tolist(), counts.tolist()):
+            self.week_readers[week] = self.week_readers.get(week, 0) + count
+        self.last_week = int(numbers[-1])
+        self.last_readers = last
+
+    def get_top_titles(self, count: int = 10) -> list:
+        """Возвращает самые выдаваемые названия.
+        Args:
+            count (int, optional): Количество названий. Defaults to 10.
+        Returns:
+            list: Список TitleCount по убыванию выдач, при равенстве - по названию.
+        """
+
+        self.refresh()
+        loans = self.title_loans
+        count = min(count, len(loans))
+        if count <= 0:
+            return []
+
+        labels = self.titles.labels
+        # Берутся все названия с выдачами не меньше count-го, чтобы при
+        # равенстве на границе в отчет попали первые по названию.
+        least = np.partition(loans, len(loans) - count)[len(loans) - count]
+        top = np.flatnonzero(loans >= least).tolist()
+        top.sort(key=lambda code: (-loans[code], labels[code]))
+        return [TitleCount(labels[code], int(loans[code])) for code in top[:count]]
+
+    def get_author_utilization(self, now: int | None = None) -> list:
+        """Возвращает загрузку книг по авторам: какую долю времени с первого
+        события истории до now экземпляры автора провели на руках.
+        Args:
+            now (int | None, optional): Конец периода в секундах. Defaults to None - текущее время библиотеки.
+        Returns:
+            list: Список AuthorUtilization по убыванию загрузки.
+        """
+
+        self.refresh()
+        if self.first_time is None:
+            return []
+
+        now = int(self.library.clock()) if now is None else now
+        index = self.library.index_books_by_author
+        copies = np.array([len(index.get(key, ())) for key in self.authors.codes], dtype=np.int64)
+        seconds = self.author_seconds + self.author_open * now
+        capacity = copies * max(now - self.first_time, 0)
+        utilization = np.divide(seconds, capacity, out=np.zeros(len(seconds)), where=capacity > 0)
+
+        return [AuthorUtilization(self.authors.labels[code], int(copies[code]), int(self.author_loans[code]),
+                                  float(seconds[code]) / DAY, float(utilization[code]))
+                for code in np.argsort(-utilization, kind='stable').tolist()]
+
+    def get_active_readers_per_week(self) -> list:
+        """Возвращает количество разных читателей, бравших или возвращавших
+        книги, по неделям от первой до последней недели истории.
+        Недели отсчитываются от момента 0, недели без событий входят с нулем.
+        Returns:
+            list: Список WeekActivity по времени.
+        """
+
+        self.refresh()
+        if not self.week_readers:
+            return []
+
+        return [WeekActivity(week * WEEK, self.week_readers.get(week, 0))
+                for week in range(min(self.week_readers), self.last_week + 1)]
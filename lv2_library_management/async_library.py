@@ -0,0 +1,114 @@
+import asyncio
+from concurrent.futures import Executor
+
+from .library_manag_revol import Book, Library, Reader, Result, SearchResult, normalize
+
+
+class AsyncLibrary:
+
+    def __init__(self, library: Library, executor: Executor | None = None) -> None:
+        """Асинхронный фасад библиотеки для сетевого сервиса.\n
+        Быстрые операции (выдача, возврат, регистрация) выполняются прямо в
+        цикле событий. Тяжелые (пакетная загрузка и поиск) уходят в пул
+        потоков. Поиск может идти в нескольких потоках сразу, а изменения
+        ждут, пока поиски завершатся, поэтому Library не видит гонок.
+        Одинаковые одновременные запросы поиска объединяются в один.
+        Args:
+            library (Library): Экземпляр класса Library.
+            executor (Executor | None, optional): Пул для тяжелых операций.
+            Defaults to None - пул цикла событий по умолчанию.
+        """
+
+        self.library = library
+        self.executor = executor
+        self.write_lock = asyncio.Lock()
+        self.searches_active = 0
+        self.no_searches = asyncio.Event()
+        self.no_searches.set()
+        self.inflight = dict()
+
+    async def run_exclusive(self, operation, *args, offload: bool = False):
+        """Выполняет изменяющую операцию, когда нет активных поисков.
+        Args:
+            operation (Callable): Метод библиотеки.
+            offload (bool, optional): Выполнить в пуле потоков. Defaults to False.
+        Returns:
+            Any: Результат операции.
+        """
+
+        async with self.write_lock:
+            await self.no_searches.wait()
+            if offload:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self.executor, operation, *args)
+            return operation(*args)
+
+    async def add_book(self, book: Book) -> Result:
+        """Добавляет книгу в библиотеку."""
+
+        return await self.run_exclusive(self.library.add_book, book)
+
+    async def add_books(self, books) -> list:
+        """Добавляет много книг в пуле потоков, не блокируя цикл событий.
+        Args:
+            books (Iterable[Book]): Последовательность объектов класса Book.
+        Returns:
+            list: Список Result для каждой книги.
+        """
+
+        def add_all() -> list:
+            return [self.library.add_book(book) for book in books]
+
+        return await self.run_exclusive(add_all, offload=True)
+
+    async def register_reader(self, reader: Reader) -> Result:
+        """Регистрирует нового читателя."""
+
+        return await self.run_exclusive(self.library.register_reader, reader)
+
+    async def borrow_book(self, title: str, reader: str) -> Result:
+        """Выдает книгу читателю, если она в наличии."""
+
+        return await self.run_exclusive(self.library.borrow_book, title, reader)
+
+    async def return_book(self, title: str, reader: str) -> Result:
+        """Возвращает книгу от читателя в библиотеку."""
+
+        return await self.run_exclusive(self.library.return_book, title, reader)
+
+    async def run_search(self, prompt: str) -> SearchResult:
+        """Выполняет поиск в пуле потоков, пока изменения библиотеки приостановлены."""
+
+        async with self.write_lock:
+            self.searches_active += 1
+            self.no_searches.clear()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, self.library.search_book, prompt)
+        finally:
+            self.searches_active -= 1
+            if not self.searches_active:
+                self.no_searches.set()
+
+    async def search_book(self, prompt: str) -> SearchResult:
+        """Ищет книги по названию, автору или читателю.\n
+        Если запрос с тем же нормализованным видом уже выполняется, ожидает
+        его результат вместо повторного поиска. Каждый ожидающий получает
+        свои списки книг.
+        Args:
+            prompt (str): Строка с название книги или именем автора или именем читателя.
+        Returns:
+            SearchResult: Результат поиска.
+        """
+
+        query = normalize(prompt)
+        task = self.inflight.get(query)
+
+        if task is None:
+            task = asyncio.ensure_future(self.run_search(prompt))
+            self.inflight[query] = task
+            task.add_done_callback(lambda _: self.inflight.pop(query, None))
+
+        # shield: отмена одного ожидающего не отменяет общий поиск для остальных.
+        result = await asyncio.shield(task)
+        return SearchResult(list(result.by_title), list(result.by_author), result.reader)
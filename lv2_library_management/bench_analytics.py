@@ -0,0 +1,105 @@
+import random
+import time
+
+from .analytics import WEEK, CirculationAnalytics
+from .library_manag_revol import DAY, Book, Library, normalize
+
+EVENTS = 2_000_000
+NEW_EVENTS = 20_000
+BOOKS = 100_000
+TITLES = 20_000
+AUTHORS = 2_000
+READERS = 20_000
+TOP = 10
+YEAR = 365 * DAY
+
+
+def fill_history(library: Library, rng: random.Random, out: bytearray, count: int, start: int) -> int:
+    """Дописывает в историю библиотеки count выдач и возвратов случайных книг
+    через равные промежутки начиная с start и возвращает момент после последнего.
+    В out отмечены выданные книги, чтобы выдача и возврат книги чередовались."""
+
+    step = YEAR // EVENTS
+    for i in range(count):
+        book_id = rng.randrange(BOOKS)
+        library.loan_history.append(start + i * step, book_id, rng.randrange(READERS), out[book_id])
+        out[book_id] ^= 1
+    return start + count * step
+
+
+def naive_reports(library: Library, now: int) -> tuple:
+    """Строит те же отчеты перебором событий истории и книг библиотеки."""
+
+    titles = dict()
+    author_seconds = dict()
+    checkouts = dict()
+    weeks = dict()
+
+    for event in library.loan_history.get_events():
+        book = library.lib[event.book_id]
+        author = normalize(book.author)
+        if event.is_return:
+            author_seconds[author] = author_seconds.get(author, 0) + event.time - checkouts.pop(event.book_id)
+        else:
+            title = normalize(book.title)
+            titles[title] = titles.get(title, 0) + 1
+            checkouts[event.book_id] = event.time
+        weeks.setdefault(event.time // WEEK, set()).add(event.reader_id)
+
+    for book_id, checkout in checkouts.items():
+        author = normalize(library.lib[book_id].author)
+        author_seconds[author] = author_seconds.get(author, 0) + now - checkout
+
+    top = sorted(titles.items(), key=lambda item: (-item[1], item[0]))[:TOP]
+    return top, author_seconds, {week: len(readers) for week, readers in weeks.items()}
+
+
+def analytics_reports(analytics: CirculationAnalytics, now: int) -> tuple:
+    return (analytics.get_top_titles(TOP), analytics.get_author_utilization(now),
+            analytics.get_active_readers_per_week())
+
+
+def measure(action, *args) -> tuple:
+    """Возвращает время вызова action(*args) в миллисекундах и результат."""
+
+    start = time.perf_counter()
+    result = action(*args)
+    return (time.perf_counter() - start) * 1000, result
+
+
+def check(naive: tuple, reports: tuple) -> None:
+    """Сверяет отчеты CirculationAnalytics с перебором."""
+
+    top, author_seconds, weeks = naive
+    titles, authors, activity = reports
+    assert [item.loans for item in titles] == [loans for _, loans in top]
+    assert all(round(item.loan_days * DAY) == author_seconds[normalize(item.author)] for item in authors)
+    assert {item.start // WEEK: item.readers for item in activity if item.readers} == weeks
+
+
+def main() -> None:
+    """Сравнивает отчеты CirculationAnalytics с перебором событий, сначала
+    по всей истории, затем после дописывания NEW_EVENTS событий."""
+
+    rng = random.Random(1)
+    library = Library(4, cache_size=0)
+    for i in range(BOOKS):
+        library.add_book(Book(f'Книга {i % TITLES}', f'Автор {i % TITLES % AUTHORS}', i))
+    out = bytearray(BOOKS)
+    now = fill_history(library, rng, out, EVENTS, 0)
+    analytics = CirculationAnalytics(library)
+
+    print(f'{EVENTS:,} событий, {TITLES:,} названий, {AUTHORS:,} авторов, {READERS:,} читателей')
+    for name, count in (('вся история', EVENTS), (f'еще {NEW_EVENTS:,} событий', NEW_EVENTS)):
+        if count == NEW_EVENTS:
+            now = fill_history(library, rng, out, NEW_EVENTS, now)
+        analytics_ms, reports = measure(analytics_reports, analytics, now)
+        naive_ms, naive = measure(naive_reports, library, now)
+        check(naive, reports)
+        print(f'  {name:<20}: NumPy {analytics_ms:8.1f} мс, перебор {naive_ms:8.1f} мс')
+
+    print(f'  самые выдаваемые: {", ".join(f"{item.title} ({item.loans})" for item in reports[0][:3])}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+import asyncio
+import random
+import statistics
+import time
+
+from .async_library import AsyncLibrary
+from .library_manag_revol import Book, Library, Reader
+
+BOOKS = 10_000
+READERS = 1_000
+OPERATIONS = 20_000
+CONCURRENCY = (1, 10, 100, 1000)
+QUERIES = [f'Автор {i}' for i in range(20)] + [f'Книга {i}' for i in range(20)]
+
+
+async def worker(library: AsyncLibrary, seed: int, count: int, latencies: list) -> None:
+    """Выполняет count случайных операций и записывает их задержки."""
+
+    rnd = random.Random(seed)
+    for _ in range(count):
+        start = time.perf_counter()
+        action = rnd.random()
+        if action < 0.4:
+            await library.borrow_book(f'Книга {rnd.randrange(BOOKS)}', f'Читатель{rnd.randrange(READERS)}')
+        elif action < 0.8:
+            await library.return_book(f'Книга {rnd.randrange(BOOKS)}', f'Читатель{rnd.randrange(READERS)}')
+        else:
+            await library.search_book(rnd.choice(QUERIES))
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(concurrency: int) -> None:
+    """Замеряет задержки при заданном числе одновременных клиентов."""
+
+    library = AsyncLibrary(Library(4))
+    await library.add_books(Book(f'Книга {i}', f'Автор {i % 100}', i) for i in range(BOOKS))
+    for i in range(READERS):
+        await library.register_reader(Reader(f'Читатель{i}', i))
+
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(library, seed, OPERATIONS // concurrency, latencies)
+                           for seed in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    print(f'клиентов {concurrency:>5}: {len(latencies) / elapsed:>9,.0f} оп/с, '
+          f'p50 {percentiles[49] * 1000:.3f} мс, p99 {percentiles[98] * 1000:.3f} мс')
+
+
+def main() -> None:
+    """Печатает пропускную способность и задержки p50/p99 AsyncLibrary."""
+
+    for concurrency in CONCURRENCY:
+        asyncio.run(run(concurrency))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+import random
+import time
+
+from lv2_library import library as simple
+
+from .library_manag_revol import Book, Library, Reader
+
+BOOKS = 50_000
+WORDS = 5_000
+DISTINCT = 5_000
+QUERIES = 100_000
+ZIPF = 1.1
+WRITE_EVERY = 50
+ALPHABET = 'абвгдежзийклмнопрстуфхцчшщыэюя'
+
+
+def make_catalog(rng: random.Random) -> list:
+    """Возвращает список пар (название, автор) из случайных слов."""
+
+    vocabulary = [''.join(rng.choice(ALPHABET) for _ in range(rng.randint(4, 9))) for _ in range(WORDS)]
+    authors = [f'{rng.choice(vocabulary)} {rng.choice(vocabulary)}'.title() for _ in range(BOOKS // 20)]
+    return [(' '.join(rng.choice(vocabulary) for _ in range(rng.randint(1, 3))).capitalize(), rng.choice(authors))
+            for _ in range(BOOKS)]
+
+
+def make_log(rng: random.Random, prompts: list) -> list:
+    """Возвращает журнал запросов с распределением Ципфа по списку prompts."""
+
+    weights = [1 / rank ** ZIPF for rank in range(1, len(prompts) + 1)]
+    return rng.choices(prompts, weights, k=QUERIES)
+
+
+def replay_revol(catalog: list, log: list, cache_size: int) -> tuple:
+    """Проигрывает журнал на library_manag_revol.Library, перемежая поиск
+    выдачей, возвратом и добавлением книг."""
+
+    library = Library(4, cache_size)
+    for i, (title, author) in enumerate(catalog):
+        library.add_book(Book(title, author, i))
+    library.register_reader(Reader('Читатель', 1))
+
+    start = time.perf_counter()
+    for i, prompt in enumerate(log):
+        library.search_book(prompt)
+        if i % WRITE_EVERY == 0:
+            title = catalog[i % len(catalog)][0]
+            library.borrow_book(title, 'Читатель')
+            library.return_book(title, 'Читатель')
+            library.add_book(Book(f'Новая книга {i}', catalog[i % len(catalog)][1], BOOKS + i))
+    return len(log) / (time.perf_counter() - start), library.search_cache.get_stats()
+
+
+def replay_simple(catalog: list, log: list, cache_size: int) -> tuple:
+    """Проигрывает журнал на lv2_library.Library, перемежая поиск добавлением книг."""
+
+    library = simple.Library(cache_size)
+    for title, author in catalog:
+        library.add_book(simple.Book(title, author, 2024))
+
+    start = time.perf_counter()
+    for i, prompt in enumerate(log):
+        library.search_book(prompt)
+        if i % WRITE_EVERY == 0:
+            library.add_book(simple.Book(f'Новая книга {i}', catalog[i % len(catalog)][1], 2024))
+    return len(log) / (time.perf_counter() - start), library.search_cache.get_stats()
+
+
+def main() -> None:
+    """Сравнивает поиск с кэшем и без него на журнале запросов с распределением Ципфа."""
+
+    rng = random.Random(1)
+    catalog = make_catalog(rng)
+
+    exact = list(dict.fromkeys(p for pair in catalog for p in pair))[:DISTINCT]
+    words = list(dict.fromkeys(w for title, _ in catalog for w in title.split()))[:DISTINCT]
+    rng.shuffle(exact)
+    rng.shuffle(words)
+
+    for name, replay, prompts in (('library_manag_revol', replay_revol, exact),
+                                  ('lv2_library', replay_simple, words)):
+        log = make_log(rng, prompts)
+        print(f'{name}: {QUERIES:,} запросов, {len(prompts):,} различных, Ципф s={ZIPF}')
+        for cache_size in (0, 256, 1024):
+            speed, stats = replay(catalog, log, cache_size)
+            total = stats.hits + stats.misses
+            print(f'  кэш {cache_size:>4}: {speed:>9,.0f} запр/с, попаданий {stats.hits / total:.0%}, '
+                  f'вытеснений {stats.evictions:,}, инвалидаций {stats.invalidations:,}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+import random
+import time
+
+from .library_manag_revol import Book, Library, edit_distance, normalize
+
+BOOKS = 100_000
+WORDS = 20_000
+QUERIES = 1_000
+NAIVE_QUERIES = 20
+ALPHABET = 'абвгдежзийклмнопрстуфхцчшщыэюя'
+
+
+def make_typo(word: str, rng: random.Random) -> str:
+    """Вносит в слово одну случайную опечатку."""
+
+    i = rng.randrange(len(word))
+    kind = rng.randrange(4)
+    if kind == 0:
+        return word[:i] + word[i + 1:]
+    if kind == 1:
+        return word[:i] + rng.choice(ALPHABET) + word[i:]
+    if kind == 2:
+        return word[:i] + rng.choice(ALPHABET) + word[i + 1:]
+    i = min(i, len(word) - 2)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def fill(rng: random.Random) -> Library:
+    """Создает библиотеку из случайных названий и авторов."""
+
+    vocabulary = [''.join(rng.choice(ALPHABET) for _ in range(rng.randint(4, 10))) for _ in range(WORDS)]
+    authors = [f'{rng.choice(vocabulary).capitalize()} {rng.choice(vocabulary).capitalize()}' for _ in range(BOOKS // 20)]
+    library = Library(4)
+    for i in range(BOOKS):
+        title = ' '.join(rng.choice(vocabulary) for _ in range(rng.randint(1, 4))).capitalize()
+        library.add_book(Book(title, rng.choice(authors), i))
+    return library
+
+
+def naive_search(library: Library, prompt: str, limit: int = 10) -> list:
+    """Нечеткий поиск полным перебором: расстояние до каждого названия и автора."""
+
+    prompt = normalize(prompt)
+    scored = []
+    for key in (*library.index_books_by_title, *library.index_books_by_author):
+        distance = edit_distance(prompt, key, 2)
+        if distance <= 2:
+            scored.append((distance, key))
+    scored.sort(key=lambda item: item[0])
+    return [key for _, key in scored[:limit]]
+
+
+def measure(search, queries: list) -> tuple:
+    """Возвращает среднюю и наихудшую задержку в миллисекундах и долю найденных книг."""
+
+    timings = []
+    hits = 0
+    for title, prompt in queries:
+        start = time.perf_counter()
+        found = search(prompt)
+        timings.append((time.perf_counter() - start) * 1000)
+        hits += title in found
+    return sum(timings) / len(timings), max(timings), hits / len(queries)
+
+
+def main() -> None:
+    """Сравнивает нечеткий поиск по индексу с перебором всего каталога."""
+
+    rng = random.Random(1)
+    library = fill(rng)
+
+    start = time.perf_counter()
+    library.index_fuzzy
+    print(f'Построение индекса для {BOOKS:,} книг: {time.perf_counter() - start:.2f} с')
+
+    titles = list(library.index_books_by_title)
+    queries = []
+    for _ in range(QUERIES):
+        title = rng.choice(titles)
+        words = title.split()
+        i = rng.randrange(len(words))
+        words[i] = make_typo(words[i], rng)
+        queries.append((title, ' '.join(words)))
+
+    def indexed(prompt: str) -> list:
+        return [normalize(match.book.title) for match in library.search_book_fuzzy(prompt)]
+
+    for name, search, sample in (('Индекс', indexed, queries),
+                                 ('Перебор', lambda prompt: naive_search(library, prompt), queries[:NAIVE_QUERIES])):
+        mean, worst, recall = measure(search, sample)
+        print(f'{name}: {mean:.2f} мс в среднем, {worst:.2f} мс максимум, найдено {recall:.0%}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+import random
+import sys
+import time
+
+from .library_manag_revol import DAY
+from .loan_history import LoanEvent, LoanHistory
+
+EVENTS = 2_000_000
+BOOKS = 100_000
+READERS = 20_000
+QUERIES = 1_000
+NAIVE_QUERIES = 5
+YEAR = 365 * DAY
+MONTH = 30 * DAY
+
+
+def fill_history(rng: random.Random) -> tuple:
+    """Заполняет историю и список LoanEvent одними и теми же событиями за год."""
+
+    history = LoanHistory()
+    events = []
+    step = YEAR // EVENTS
+    start = time.perf_counter()
+    for i in range(EVENTS):
+        event = LoanEvent(i * step, rng.randrange(BOOKS), rng.randrange(READERS), i % 2 == 1)
+        history.append(*event)
+        events.append(event)
+    return history, events, (time.perf_counter() - start) / EVENTS * 1e6
+
+
+def get_size(history: LoanHistory) -> int:
+    """Возвращает объем колонок и индексов истории в байтах."""
+
+    size = sum(sys.getsizeof(column) for segment in history.segments for column in segment)
+    for index in (history.by_reader, history.by_book):
+        size += sys.getsizeof(index) + sum(sys.getsizeof(positions) for positions in index.values())
+    return size
+
+
+def measure(queries: list, search) -> tuple:
+    """Возвращает среднее время запроса в миллисекундах и количество найденных событий."""
+
+    found = 0
+    start = time.perf_counter()
+    for query in queries:
+        found += len(search(*query))
+    return (time.perf_counter() - start) / len(queries) * 1000, found
+
+
+def main() -> None:
+    """Сравнивает запросы к LoanHistory с перебором списка событий."""
+
+    rng = random.Random(1)
+    history, events, append = fill_history(rng)
+    history.build_indexes()
+    print(f'{EVENTS:,} событий: запись {append:.2f} мкс, '
+          f'{get_size(history) / EVENTS:.0f} байт на событие вместе с индексами '
+          f'(список LoanEvent: {sys.getsizeof(events[0]) + sys.getsizeof(events) / EVENTS:.0f} байт без индексов)')
+
+    months = [rng.randrange(YEAR - MONTH) for _ in range(QUERIES)]
+    cases = (
+        ('выдачи читателя за месяц',
+         [(rng.randrange(READERS), m, m + MONTH) for m in months],
+         history.get_reader_events,
+         lambda reader_id, start, end: [e for e in events if e.reader_id == reader_id and start <= e.time < end]),
+        ('история книги',
+         [(rng.randrange(BOOKS), None, None) for _ in range(QUERIES)],
+         history.get_book_events,
+         lambda book_id, start, end: [e for e in events if e.book_id == book_id]),
+        ('все события за час',
+         [(m, m + 3600) for m in months],
+         history.get_events,
+         lambda start, end: [e for e in events if start <= e.time < end]),
+    )
+
+    for name, queries, indexed, naive in cases:
+        indexed_ms, found = measure(queries, indexed)
+        naive_ms, _ = measure(queries[:NAIVE_QUERIES], naive)
+        print(f'  {name:<25}: {indexed_ms:8.4f} мс, перебор {naive_ms:8.1f} мс, '
+              f'в среднем событий {found / len(queries):.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+import random
+import time
+
+from .library_manag_revol import Book, HoldQueue, Library, Reader
+
+TITLES = 100
+HOLDS = 100_000
+LOOKUPS = 100_000
+RETURNS = 20_000
+PRIORITY_SHARE = 0.1
+NAIVE_LOOKUPS = 1_000
+
+
+class ListHoldQueue:
+    """Очередь бронирования простым списком: место и следующий читатель ищутся перебором."""
+
+    def __init__(self) -> None:
+        self.entries = []
+        self.sequence = 0
+
+    def push(self, reader_id: int, priority: int = 0) -> None:
+        self.sequence += 1
+        self.entries.append((-priority, self.sequence, reader_id))
+
+    def get_position(self, reader_id: int) -> int | None:
+        entry = next((e for e in self.entries if e[2] == reader_id), None)
+        if entry is None:
+            return None
+        return sum(1 for e in self.entries if e < entry) + 1
+
+    def pop_eligible(self, is_eligible) -> int | None:
+        eligible = [e for e in self.entries if is_eligible(e[2])]
+        if not eligible:
+            return None
+        entry = min(eligible)
+        self.entries.remove(entry)
+        return entry[2]
+
+
+def measure(count: int, action) -> float:
+    """Возвращает среднее время одного вызова action(i) в микросекундах."""
+
+    start = time.perf_counter()
+    for i in range(count):
+        action(i)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def bench_library(rng: random.Random) -> None:
+    """Ставит HOLDS броней на выданные книги и прогоняет возвраты с выдачей по брони."""
+
+    library = Library(4, cache_size=0)
+    titles = [f'Книга {i}' for i in range(TITLES)]
+    for i, title in enumerate(titles):
+        library.add_book(Book(title, 'Автор', i))
+        library.register_reader(Reader(f'Первый {i}', i))
+        library.borrow_book(title, f'Первый {i}')
+
+    names = [f'Читатель {i}' for i in range(HOLDS)]
+    for i, name in enumerate(names):
+        library.register_reader(Reader(name, TITLES + i))
+    holds = [(rng.choice(titles), name, int(rng.random() < PRIORITY_SHARE)) for name in names]
+    lookups = [rng.choice(holds)[:2] for _ in range(LOOKUPS)]
+    returns = [rng.choice(titles) for _ in range(RETURNS)]
+
+    print(f'Library: {TITLES} названий по одному экземпляру, {HOLDS:,} броней')
+    place = measure(HOLDS, lambda i: library.place_hold(*holds[i]))
+    print(f'  place_hold:        {place:6.2f} мкс')
+    lookup = measure(LOOKUPS, lambda i: library.get_hold_position(*lookups[i]))
+    print(f'  get_hold_position: {lookup:6.2f} мкс')
+
+    def return_and_hand_over(i: int) -> None:
+        title = returns[i]
+        borrower = library.find_book_by_title(title).borrower
+        result = library.return_book(title, borrower.name)
+        assert result.holder is not None
+
+    handover = measure(RETURNS, return_and_hand_over)
+    waiting = sum(len(queue) for queue in library.hold_queues.values())
+    print(f'  return_book + выдача по брони: {handover:6.2f} мкс, осталось броней {waiting:,}')
+
+
+def bench_queue(rng: random.Random) -> None:
+    """Сравнивает HoldQueue и очередь-список на одной очереди из HOLDS броней."""
+
+    print(f'Одна очередь из {HOLDS:,} броней')
+    priorities = [int(rng.random() < PRIORITY_SHARE) for _ in range(HOLDS)]
+    readers = [rng.randrange(HOLDS) for _ in range(NAIVE_LOOKUPS)]
+    eligible = lambda reader_id: reader_id % 10 != 0  # каждый десятый читатель достиг лимита
+
+    for name, queue in (('HoldQueue', HoldQueue()), ('список', ListHoldQueue())):
+        push = measure(HOLDS, lambda i: queue.push(i, priorities[i]))
+        lookup = measure(NAIVE_LOOKUPS, lambda i: queue.get_position(readers[i]))
+        pop = measure(NAIVE_LOOKUPS, lambda i: queue.pop_eligible(eligible))
+        print(f'  {name:<9}: постановка {push:8.2f} мкс, место {lookup:10.2f} мкс, выдача {pop:10.2f} мкс')
+
+
+def main() -> None:
+    """Измеряет бронирование на библиотеке и на отдельной очереди из HOLDS броней."""
+
+    rng = random.Random(1)
+    bench_library(rng)
+    print('')
+    bench_queue(rng)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+import subprocess
+import sys
+
+MODULES = (
+    'lv2_library',
+    'lv2_library_management.library_management',
+    'lv2_library_management.library_manag_advanc',
+    'lv2_library_management.library_manag_revol',
+)
+
+# Допустимое время импорта одного модуля сверх запуска пустого интерпретатора.
+LIMIT_MS = 50.0
+REPEAT = 5
+
+
+def measure_import(module: str) -> tuple:
+    """Измеряет время импорта модуля в отдельном процессе.
+    Args:
+        module (str): Полное имя модуля.
+    Returns:
+        tuple: Лучшее время импорта в миллисекундах и вывод, сделанный при импорте.
+    """
+
+    code = (
+        'import time\n'
+        'start = time.perf_counter()\n'
+        f'import {module}\n'
+        'print(f"{(time.perf_counter() - start) * 1000:.3f}")\n'
+    )
+    best = None
+    output = ''
+
+    for _ in range(REPEAT):
+        lines = subprocess.run([sys.executable, '-c', code], capture_output=True,
+                               text=True, check=True, stdin=subprocess.DEVNULL).stdout.splitlines()
+        elapsed = float(lines[-1])
+        output = '\n'.join(lines[:-1])
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best, output
+
+
+def main() -> None:
+    """Печатает время импорта модулей и завершает работу с ошибкой, если
+    импорт что-то выводит или длится дольше LIMIT_MS."""
+
+    failed = False
+
+    for module in MODULES:
+        elapsed, output = measure_import(module)
+        status = 'OK'
+        if output:
+            status = 'ОШИБКА: импорт выводит текст'
+            failed = True
+        elif elapsed > LIMIT_MS:
+            status = f'ОШИБКА: дольше {LIMIT_MS} мс'
+            failed = True
+        print(f'{module}: {elapsed:.2f} мс - {status}')
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import time
+
+from .journal import JournaledLibrary
+from .library_manag_revol import Book, Library, Reader
+
+BOOKS = 10_000
+READERS = 100
+OPERATIONS = 20_000
+
+
+def fill(library) -> None:
+    """Регистрирует книги и читателей для замера."""
+
+    for i in range(BOOKS):
+        library.add_book(Book(f'Книга {i}', f'Автор {i % 100}', i))
+    for i in range(READERS):
+        library.register_reader(Reader(f'Читатель{i}', i))
+
+
+def run(library) -> float:
+    """Выполняет OPERATIONS выдач и возвратов и возвращает число операций в секунду."""
+
+    start = time.perf_counter()
+    for i in range(OPERATIONS // 2):
+        title = f'Книга {i % BOOKS}'
+        reader = f'Читатель{i % READERS}'
+        library.borrow_book(title, reader)
+        library.return_book(title, reader)
+    return OPERATIONS / (time.perf_counter() - start)
+
+
+def main() -> None:
+    """Сравнивает пропускную способность выдач и возвратов без журнала,
+    с fsync на каждую операцию и с групповым fsync."""
+
+    library = Library(4)
+    fill(library)
+    baseline = run(library)
+    print(f'Без журнала: {baseline:,.0f} оп/с')
+
+    for batch_size in (1, 16, 64, 256):
+        with tempfile.TemporaryDirectory() as directory:
+            snapshot_path = os.path.join(directory, 'library.snap')
+            journal_path = os.path.join(directory, 'library.wal')
+            with JournaledLibrary(snapshot_path, journal_path, batch_size=batch_size,
+                                  max_delay=1.0, compact_every=10 ** 9) as library:
+                fill(library)
+                library.compact()
+                speed = run(library)
+        print(f'fsync на {batch_size} записей: {speed:,.0f} оп/с '
+              f'({baseline / speed:.1f}x медленнее)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+import tracemalloc
+
+from .library_manag_revol import Book, BookStore
+
+BOOKS = 100_000
+AUTHORS = ['Билл Любанович', 'Роберт Мартин', 'Марк Лутц', 'Кайл Симпсон']
+
+
+def compare_memory_usage(count: int, copies: int = 1) -> tuple:
+    """Сравнивает объем памяти, занимаемый книгами в виде объектов Book и в
+    колоночном хранилище BookStore.
+    Args:
+        count (int): Количество создаваемых книг.
+        copies (int, optional): Экземпляров каждого названия. Defaults to 1 - все названия разные.
+    Returns:
+        tuple: Количество байт для Book и для BookStore.
+    """
+
+    def fill_books() -> list:
+        return [Book(f'Книга {i // copies}', AUTHORS[i % len(AUTHORS)], i) for i in range(count)]
+
+    def fill_store() -> BookStore:
+        store = BookStore()
+        for i in range(count):
+            store.add_book(f'Книга {i // copies}', AUTHORS[i % len(AUTHORS)], i)
+        return store
+
+    result = list()
+    for fill in (fill_books, fill_store):
+        tracemalloc.start()
+        data = fill()
+        result.append(tracemalloc.get_traced_memory()[0])
+        tracemalloc.stop()
+        del data
+
+    return tuple(result)
+
+
+def main() -> None:
+    """Печатает расход памяти Book и BookStore для разных названий и для
+    нескольких экземпляров одного названия."""
+
+    print(f'{BOOKS:,} книг')
+    for copies in (1, 5):
+        memory_books, memory_store = compare_memory_usage(BOOKS, copies)
+        print(f'  экземпляров названия {copies}: Book {memory_books / 1024 / 1024:.1f} МБ, '
+              f'BookStore {memory_store / 1024 / 1024:.1f} МБ')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+import os
+import time
+
+from .library_manag_revol import Book, Reader
+from .sharding import ShardedLibrary
+
+BOOKS = 200_000
+READERS = 1_000
+OPERATIONS = 10_000
+SEARCHES = 5_000
+
+
+def run(shards: int) -> tuple:
+    """Замеряет загрузку, поиск и выдачу для заданного числа шардов.
+    Returns:
+        tuple: Книг в секунду при загрузке, запросов поиска в секунду и
+        операций выдачи и возврата в секунду.
+    """
+
+    with ShardedLibrary(4, shards) as library:
+        start = time.perf_counter()
+        library.add_books(Book(f'Книга {i}', f'Автор {i % 1000}', i) for i in range(BOOKS))
+        load = BOOKS / (time.perf_counter() - start)
+
+        for i in range(READERS):
+            library.register_reader(Reader(f'Читатель{i}', i))
+
+        prompts = [f'Автор {i % 1000}' if i % 2 else f'Книга {i}' for i in range(SEARCHES)]
+        start = time.perf_counter()
+        library.search_many(prompts)
+        search = SEARCHES / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for i in range(OPERATIONS // 2):
+            title = f'Книга {i}'
+            reader = f'Читатель{i % READERS}'
+            library.borrow_book(title, reader)
+            library.return_book(title, reader)
+        circulation = OPERATIONS / (time.perf_counter() - start)
+
+    return load, search, circulation
+
+
+def main() -> None:
+    """Сравнивает пропускную способность при 1..N процессах-шардах."""
+
+    count = os.cpu_count() or 1
+    levels = sorted({1, 2, 4, count})
+    print(f'Ядер: {count}')
+    for shards in levels:
+        load, search, circulation = run(shards)
+        print(f'{shards} шард(ов): загрузка {load:,.0f} книг/с, '
+              f'поиск {search:,.0f} запр/с, выдача {circulation:,.0f} оп/с')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,428 @@
+import os
+import struct
+import threading
+import time
+import zlib
+
+from .library_manag_revol import Book, Library, Reader, Result, Status
+from .snapshot import load_snapshot, read_sequence, save_snapshot
+
+# Запись журнала: CRC32 остальной части записи, номер записи, момент операции
+# в секундах, код операции, ID книги или читателя, длины двух строк в байтах,
+# затем сами строки в UTF-8. Для выдачи и возврата ID - это ID читателя, а
+# строки - название книги и имя читателя, для добавления книги - название и
+# автор, для регистрации читателя - пустая строка и имя. Для брони ID - это
+# ID читателя, а строки - название книги и приоритет числом, при снятии
+# брони вторая строка пустая.
+CRC = struct.Struct('<I')
+RECORD = struct.Struct('<qqBqHH')
+BORROW = 1
+RETURN = 2
+ADD_BOOK = 3
+REMOVE_BOOK = 4
+REGISTER_READER = 5
+PLACE_HOLD = 6
+CANCEL_HOLD = 7
+
+
+class Journal:
+
+    def __init__(self, path: str, batch_size: int = 64, max_delay: float = 0.05) -> None:
+        """Открывает журнал операций только на дозапись.\n
+        Каждая запись сразу передается операционной системе и переживает
+        падение процесса. От сбоя питания записи защищает fsync: он делается
+        на группу, когда записей набирается batch_size, а остальные записи
+        фоновый поток сбрасывает на диск не позже чем через max_delay секунд,
+        даже если новых операций нет.
+        Args:
+            path (str): Путь к файлу журнала.
+            batch_size (int, optional): Размер группы записей на один fsync. Defaults to 64.
+            max_delay (float, optional): Максимальная задержка fsync в секундах. Defaults to 0.05.
+        """
+
+        self.path = path
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.file = open(path, 'ab')
+        self.pending = 0
+        self.lock = threading.Lock()
+        self.closed = threading.Event()
+        self.flusher = threading.Thread(target=self.run_flusher, daemon=True)
+        self.flusher.start()
+
+    def append(self, sequence: int, moment: int, op: int, id: int, first: str, second: str) -> None:
+        """Дописывает запись в журнал и при необходимости сбрасывает группу на диск.
+        Args:
+            sequence (int): Номер записи.
+            moment (int): Момент операции в секундах часов библиотеки.
+            op (int): Код операции.
+            id (int): ID книги или читателя.
+            first (str): Название книги, для регистрации читателя пустая строка.
+            second (str): Имя читателя, автор книги или приоритет брони.
+        """
+
+        first_bytes = first.encode()
+        second_bytes = second.encode()
+        body = RECORD.pack(sequence, moment, op, id, len(first_bytes), len(second_bytes)) \
+            + first_bytes + second_bytes
+
+        with self.lock:
+            self.file.write(CRC.pack(zlib.crc32(body)) + body)
+            self.file.flush()
+            self.pending += 1
+            if self.pending >= self.batch_size:
+                self.fsync()
+
+    def fsync(self) -> None:
+        """Сбрасывает записи на диск. Вызывается под self.lock."""
+
+        if self.pending:
+            os.fsync(self.file.fileno())
+            self.pending = 0
+
+    def run_flusher(self) -> None:
+        """Фоновый поток: раз в max_delay сбрасывает на диск неполную группу."""
+
+        while not self.closed.wait(self.max_delay):
+            with self.lock:
+                self.fsync()
+
+    def sync(self) -> None:
+        """Сбрасывает все накопленные записи на диск."""
+
+        with self.lock:
+            self.fsync()
+
+    def truncate(self) -> None:
+        """Очищает журнал после того, как его записи попали в снимок."""
+
+        with self.lock:
+            self.file.close()
+            self.file = open(self.path, 'wb')
+            os.fsync(self.file.fileno())
+            self.pending = 0
+
+    def close(self) -> None:
+        """Останавливает фоновый поток, сбрасывает накопленные записи и закрывает файл журнала."""
+
+        self.closed.set()
+        self.flusher.join()
+        with self.lock:
+            self.fsync()
+            self.file.close()
+
+
+def read_journal(path: str):
+    """Читает записи журнала до первой неполной или поврежденной записи.
+    Args:
+        path (str): Путь к файлу журнала.
+    Returns:
+        tuple: Список записей (номер, момент, операция, ID, первая строка, вторая строка)
+        и длина корректной части файла в байтах.
+    """
+
+    records = []
+
+    if not os.path.exists(path):
+        return records, 0
+
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    position = 0
+    header_size = CRC.size + RECORD.size
+    while position + header_size <= len(data):
+        crc, = CRC.unpack_from(data, position)
+        sequence, moment, op, id, first_size, second_size = RECORD.unpack_from(data, position + CRC.size)
+        end = position + header_size + first_size + second_size
+        if end > len(data) or zlib.crc32(data[position + CRC.size:end]) != crc:
+            break
+        first_start = position + header_size
+        records.append((sequence, moment, op, id,
+                        data[first_start:first_start + first_size].decode(),
+                        data[first_start + first_size:end].decode()))
+        position = end
+
+    return records, position
+
+
+class JournaledLibrary:
+
+    def __init__(self, snapshot_path: str, journal_path: str, limit: int = 4,
+                 batch_size: int = 64, max_delay: float = 0.05, compact_every: int = 100_000,
+                 clock=time.time) -> None:
+        """Восстанавливает библиотеку из последнего снимка и журнала операций
+        и открывает журнал для новых операций.\n
+        Добавление и удаление книг, регистрация читателей, выдачи,
+        возвраты, постановка и снятие брони попадают в журнал до того, как
+        операция вернет результат, а очереди бронирования сохраняются в
+        снимке. Выдачи по брони при воспроизведении повторяются сами -
+        вслед за возвратом, добавлением книги или бронью, которые их
+        вызвали, - поэтому отдельно в журнал не пишутся. Операции читателя
+        воспроизводятся по его ID: имя могут носить несколько читателей, а
+        индекс по имени хранит только последнего из них.
+        Каждая запись хранит момент операции: на время операции часы
+        библиотеки останавливаются на этом моменте, и при воспроизведении
+        сроки выдач и штрафы получаются теми же, что и до сбоя.
+        Args:
+            snapshot_path (str): Путь к файлу снимка.
+            journal_path (str): Путь к файлу журнала.
+            limit (int, optional): rental_limit новой библиотеки, если снимка еще нет. Defaults to 4.
+            batch_size (int, optional): Размер группы записей на один fsync. Defaults to 64.
+            max_delay (float, optional): Максимальная задержка fsync в секундах. Defaults to 0.05.
+            compact_every (int, optional): Через сколько записей журнала делать новый снимок. Defaults to 100 000.
+            clock (Callable, optional): Источник времени в секундах. Defaults to time.time.
+        """
+
+        self.snapshot_path = snapshot_path
+        self.compact_every = compact_every
+        self.sequence = 0
+        self.clock = clock
+        self.moment = None
+
+        if os.path.exists(snapshot_path):
+            self.library = load_snapshot(snapshot_path)
+            self.sequence = read_sequence(snapshot_path)
+        else:
+            self.library = Library(limit)
+        self.library.clock = self.get_time
+
+        records, valid_size = read_journal(journal_path)
+        self.replay(records)
+
+        # Отрезаем недописанный при сбое хвост, чтобы новые записи шли следом
+        # за последней корректной.
+        if os.path.exists(journal_path) and os.path.getsize(journal_path) > valid_size:
+            os.truncate(journal_path, valid_size)
+
+        self.journal = Journal(journal_path, batch_size, max_delay)
+        self.logged = len(records)
+
+    def __getattr__(self, name: str):
+        return getattr(self.library, name)
+
+    def __enter__(self) -> 'JournaledLibrary':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def get_time(self) -> int:
+        """Часы библиотеки: момент текущей операции, а вне операций - текущее время."""
+
+        return self.clock() if self.moment is None else self.moment
+
+    def run_at(self, moment: int, operation, *args):
+        """Выполняет операцию библиотеки с часами, остановленными на moment."""
+
+        self.moment = moment
+        try:
+            return operation(*args)
+        finally:
+            self.moment = None
+
+    def replay(self, records: list) -> None:
+        """Повторяет операции журнала, которых еще нет в снимке.\n
+        В журнал попадают только успешные операции, поэтому неуспешный
+        повтор означает, что журнал не соответствует снимку: восстановление
+        прерывается, а не теряет операцию молча.
+        Args:
+            records (list): Записи журнала (номер, момент, операция, ID, первая строка, вторая строка).
+        """
+
+        library = self.library
+        for sequence, moment, op, id, first, second in records:
+            if sequence <= self.sequence:
+                continue
+            if op == BORROW:
+                result = self.run_at(moment, library.borrow_book_by_id, first, id, False)
+            elif op == RETURN:
+                result = self.run_at(moment, library.return_book_by_id, first, id)
+            elif op == ADD_BOOK:
+                result = self.run_at(moment, library.add_book, Book(first, second, id))
+            elif op == REMOVE_BOOK:
+                result = library.remove_book(id)
+            elif op == PLACE_HOLD:
+                result = self.run_at(moment, library.place_hold_by_id, first, id, int(second))
+            elif op == CANCEL_HOLD:
+                result = library.cancel_hold_by_id(first, id)
+            else:
+                result = library.register_reader(Reader(second, id))
+            if result.status is not Status.OK:
+                raise ValueError(f'ОШИБКА: Запись журнала {sequence} не воспроизводится: {result.status.name}.')
+            self.sequence = sequence
+
+    def log(self, moment: int, op: int, first: str, second: str, id: int = 0) -> None:
+        """Записывает успешную операцию в журнал."""
+
+        self.sequence += 1
+        self.journal.append(self.sequence, moment, op, id, first, second)
+        self.logged += 1
+
+    def compact_if_needed(self) -> None:
+        """Делает снимок, если журнал вырос до compact_every записей."""
+
+        if self.logged >= self.compact_every:
+            self.compact()
+
+    def add_book(self, book: Book) -> Result:
+        """Добавляет книгу в библиотеку и записывает добавление в журнал.
+        Args:
+            book (Book): Экземпляр класса Book.
+        Returns:
+            Result: Результат процедуры регистрации книги.
+        """
+
+        moment = int(self.clock())
+        result = self.run_at(moment, self.library.add_book, book)
+        if result.status is Status.OK:
+            self.log(moment, ADD_BOOK, book.title, book.author, book.id)
+            self.compact_if_needed()
+        return result
+
+    def remove_book(self, book_id: int) -> Result:
+        """Удаляет книгу из библиотеки и записывает удаление в журнал.
+        Args:
+            book_id (int): Уникальный идентификатор книги.
+        Returns:
+            Result: Результат процедуры удаления книги.
+        """
+
+        result = self.library.remove_book(book_id)
+        if result.status is Status.OK:
+            self.log(int(self.clock()), REMOVE_BOOK, '', '', book_id)
+            self.compact_if_needed()
+        return result
+
+    def register_reader(self, reader: Reader) -> Result:
+        """Регистрирует читателя и записывает регистрацию в журнал.
+        Args:
+            reader (Reader): Экземпляр класса Reader.
+        Returns:
+            Result: Результат процедуры регистрации читателя.
+        """
+
+        result = self.library.register_reader(reader)
+        if result.status is Status.OK:
+            self.log(int(self.clock()), REGISTER_READER, '', reader.name, reader.id)
+            self.compact_if_needed()
+        return result
+
+    def borrow_book(self, title: str, reader: str) -> Result:
+        """Выдает книгу читателю и записывает выдачу в журнал.
+        Args:
+            title (str): Строка с названием книги.
+            reader (str): Строка с именем читателя.
+        Returns:
+            Result: Результат процедуры выдачи книги читателю.
+        """
+
+        moment = int(self.clock())
+        result = self.run_at(moment, self.library.borrow_book, title, reader)
+        if result.status is Status.OK:
+            self.log(moment, BORROW, title, reader, result.reader.id)
+            self.compact_if_needed()
+        return result
+
+    def return_book(self, title: str, reader: str) -> Result:
+        """Возвращает книгу в библиотеку и записывает возврат в журнал.
+        Args:
+            title (str): Строка с названием книги.
+            reader (str): Строка с именем читателя.
+        Returns:
+            Result: Результат процедуры возврата книги читателем.
+        """
+
+        moment = int(self.clock())
+        result = self.run_at(moment, self.library.return_book, title, reader)
+        if result.status is Status.OK:
+            self.log(moment, RETURN, title, reader, result.reader.id)
+            self.compact_if_needed()
+        return result
+
+    def place_hold(self, title: str, reader: str, priority: int = 0) -> Result:
+        """Ставит читателя в очередь на книгу и записывает бронь в журнал.
+        Args:
+            title (str): Строка с названием книги.
+            reader (str): Строка с именем читателя.
+            priority (int, optional): Приоритет брони. Defaults to 0.
+        Returns:
+            Result: Результат постановки в очередь.
+        """
+
+        moment = int(self.clock())
+        result = self.run_at(moment, self.library.place_hold, title, reader, priority)
+        if result.status is Status.OK:
+            self.log(moment, PLACE_HOLD, title, str(priority), result.reader.id)
+            self.compact_if_needed()
+        return result
+
+    def cancel_hold(self, title: str, reader: str) -> Result:
+        """Снимает бронь читателя на книгу и записывает снятие в журнал.
+        Args:
+            title (str): Строка с названием книги.
+            reader (str): Строка с именем читателя.
+        Returns:
+            Result: Результат снятия брони.
+        """
+
+        result = self.library.cancel_hold(title, reader)
+        if result.status is Status.OK:
+            self.log(int(self.clock()), CANCEL_HOLD, title, '', result.reader.id)
+            self.compact_if_needed()
+        return result
+
+    def borrow_many(self, pairs) -> list:
+        """Выдает пакет книг и записывает его в журнал, если пакет применен.
+        Args:
+            pairs (Iterable[tuple]): Пары (название книги, имя читателя).
+        Returns:
+            list: Список Result для каждой пары в исходном порядке.
+        """
+
+        pairs = list(pairs)
+        moment = int(self.clock())
+        results = self.run_at(moment, self.library.borrow_many, pairs)
+        for (title, reader), result in zip(pairs, results):
+            if result.status is Status.OK:
+                self.log(moment, BORROW, title, reader, result.reader.id)
+        self.compact_if_needed()
+        return results
+
+    def return_many(self, pairs) -> list:
+        """Принимает пакет возвращаемых книг и записывает его в журнал, если пакет применен.
+        Args:
+            pairs (Iterable[tuple]): Пары (название книги, имя читателя).
+        Returns:
+            list: Список Result для каждой пары в исходном порядке.
+        """
+
+        pairs = list(pairs)
+        moment = int(self.clock())
+        results = self.run_at(moment, self.library.return_many, pairs)
+        for (title, reader), result in zip(pairs, results):
+            if result.status is Status.OK:
+                self.log(moment, RETURN, title, reader, result.reader.id)
+        self.compact_if_needed()
+        return results
+
+    def sync(self) -> None:
+        """Сбрасывает накопленные записи журнала на диск."""
+
+        self.journal.sync()
+
+    def compact(self) -> None:
+        """Сохраняет новый снимок и очищает журнал.\n
+        Снимок хранит номер последней учтенной записи, поэтому сбой между
+        сохранением снимка и очисткой журнала не приведет к повтору операций.
+        """
+
+        self.journal.sync()
+        save_snapshot(self.library, self.snapshot_path, self.sequence)
+        self.journal.truncate()
+        self.logged = 0
+
+    def close(self) -> None:
+        """Сбрасывает журнал на диск и закрывает его."""
+
+        self.journal.close()
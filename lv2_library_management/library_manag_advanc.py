@@ -1,4 +1,70 @@
+import sys
+import time
+import unicodedata
+from bisect import bisect_left, bisect_right, insort
+from enum import Enum
+from itertools import islice
+from threading import Lock, RLock
+from typing import NamedTuple
+
+from .loan_history import LoanHistory
+
+# Длительность суток в секундах: сроки выдачи хранятся в секундах часов библиотеки.
+DAY = 86_400
+
+
+class Status(Enum):
+    """Коды результата операций библиотеки."""
+
+    OK = 'Успешно'
+    NOT_A_BOOK = 'Переданный аргумент НЕ ЯВЛЯЕТСЯ объектом КНИГИ'
+    NOT_A_READER = 'Переданный аргумент НЕ ЯВЛЯЕТСЯ объектом ЧИТАТЕЛЯ'
+    BOOK_EXISTS = 'Книга УЖЕ ЗАРЕГИСТРИРОВАНА'
+    READER_EXISTS = 'Читатель уже БЫЛ ЗАРЕГИСТРИРОВАН в библиотеке ранее'
+    BOOK_NOT_FOUND = 'Книга НЕ зарегистрирована'
+    READER_NOT_FOUND = 'Читатель НЕ зарегистрирован'
+    BOOK_UNAVAILABLE = 'Книги нет в наличии'
+    LIMIT_REACHED = 'ДОСТИГНУТ ЛИМИТ выдачи'
+    NOT_BORROWED = 'Книга НЕ числится в списке читателя'
+    ROLLED_BACK = 'Операция отменена из-за ошибки в пакете'
+
+
+class Result(NamedTuple):
+    """Результат одной операции: код и затронутые книга и читатель."""
+
+    status: Status
+    book: object = None
+    reader: object = None
+
+
+class Loan(NamedTuple):
+    """Выдача книги: книга, читатель, момент выдачи и срок возврата в секундах."""
+
+    book: object
+    reader: object
+    checkout: int
+    due: int
+
+
+class Page(NamedTuple):
+    """Страница списка книг и курсор для запроса следующей страницы."""
+
+    books: list
+    cursor: int | None
+
+
+def normalize(text: str) -> str:
+    """Возвращает ключ поиска: строка в форме NFKC без учета регистра,
+    с "ё" замененной на "е" и одиночными пробелами между словами."""
+    text = unicodedata.normalize('NFKC', text).casefold().replace('ё', 'е')
+    return ' '.join(text.split())
+
+
+#######################################################################
+
+
 class Book:
+    __slots__ = ('title', 'author', 'id', 'status', 'borrower', 'key')
 
     def __init__(self, title: str, author: str,  id: int, status: bool = True) -> None:
         """Инициализирует объект класса книга.
@@ -13,6 +79,8 @@ class Book:
         self.id = id
         self.status = status
         self.borrower = None
+        # Нормализованные название и автор для поиска.
+        self.key = normalize(f'{title} {author}')
 
     def get_status_book(self):
         """Возвращает строку описывающую статус книги в удобочитаемом формате.
@@ -41,6 +109,7 @@ class Book:
 
 
 class Reader:
+    __slots__ = ('name', 'id', 'borrowed_books', 'book_ids')
 
     def __init__(self, name: str, id: int) -> None:
         """Инициализирует объект класса читатель.
@@ -51,74 +120,99 @@ class Reader:
 
         self.name = name
         self.id = id
-        self.borrowed_books = []
+        # Словарь используется как упорядоченное множество выданных книг:
+        # проверка и удаление за O(1), порядок выдачи сохраняется.
+        self.borrowed_books = dict()
+        # ID выданных книг по возрастанию - для постраничного вывода по курсору.
+        self.book_ids = list()
 
 #######################################################################
 
 
 class Library:
 
-    def __init__(self, limit: int) -> None:
+    def __init__(self, limit: int, loan_days: int = 14, fine_per_day: int = 10, clock=time.time) -> None:
         """Инициализирует объект класса библиотека.
         Args:
             limit (int): Число указывающее лимит книг которые читатель может взять.
+            loan_days (int, optional): Срок выдачи книги в днях. Defaults to 14.
+            fine_per_day (int, optional): Штраф за каждый начатый день просрочки. Defaults to 10.
+            clock (Callable, optional): Источник времени в секундах. Defaults to time.time.
         """
 
         self.lib = dict()
         self.readers = dict()
-        self.borrow_history = []
+        self.borrow_history = dict()
         self.rental_limit = limit
-
-    def print_list_book(self, list_books: list) -> None:
-        """Распечатывает список книг в формате:\n
-        Название: ...\n
-        Автор: ...\n
-        Статус: ...\n
-        id: ...\n
-        Кем арендована: ...\n
+        self.books_in_stock = dict()
+        self.books_out_stock = dict()
+        # ID книг по возрастанию - для постраничного вывода по курсору.
+        self.book_ids = list()
+        # Имя автора -> ID его книг по возрастанию.
+        self.index_books_by_author = dict()
+        self.loan_period = loan_days * DAY
+        self.fine_per_day = fine_per_day
+        self.clock = clock
+        # Открытые выдачи по ID книги. due_index - пары (срок возврата, ID книги)
+        # по возрастанию: срок выдачи всегда now + loan_period, поэтому insort
+        # почти всегда дописывает в конец, а просроченные выдачи - это начало
+        # списка до bisect_left(now), без перебора всех книг.
+        self.loans = dict()
+        self.due_index = list()
+        # Начисленные при возврате штрафы: ID читателя -> сумма.
+        self.fines = dict()
+        self.loan_history = LoanHistory()
+
+    def set_status_book(self, book_obj: Book, status: bool) -> None:
+        """Устанавливает статус книги и переносит её в соответствующий раздел
+        книг в наличии или выданных читателю.
         Args:
-            list_books (list): Список экземпляров класса Book.
+            book_obj (Book): Экземпляр объекта Book.
+            status (bool): True - книга в наличии, False - у читателя.
         """
 
-        count_print = 0
-        for b in list_books:
-            count_print += 1
-            print('')
-            print(f'''{count_print}.''')
-            print(b.get_info_book())
+        book_obj.status = status
+        if (status):
+            self.books_out_stock.pop(book_obj.id, None)
+            self.books_in_stock[book_obj.id] = book_obj
+        else:
+            self.books_in_stock.pop(book_obj.id, None)
+            self.books_out_stock[book_obj.id] = book_obj
 
-    def register_reader(self, reader_obj: Reader) -> None:
+    def register_reader(self, reader_obj: Reader) -> Result:
         """Регистрирует нового читателя в библиотеке.
         Args:
             reader (Reader): Экземпляр объекта Reader.
+        Returns:
+            Result: Результат процедуры регистрации читателя.
         """
 
-        if isinstance(reader_obj, Reader) and reader_obj.id not in self.readers:
-            self.readers[reader_obj.id] = reader_obj
-            print(f'Читатель по имени "{
-                  reader_obj.name}" БЫЛ ЗАРЕГИСТРИРОВАН под номером {reader_obj.id}.')
-        elif not isinstance(reader_obj, Reader):
-            print('Переданный аргумент НЕ ЯВЛЯЕТСЯ объектом ЧИТАТЕЛЯ.')
+        if not isinstance(reader_obj, Reader):
+            return Result(Status.NOT_A_READER)
         elif reader_obj.id in self.readers:
-            print(f'''Читатель с id: {
-                reader_obj.id} уже БЫЛ ЗАРЕГИСТРИРОВАН в библиотеке ранее.''')
+            return Result(Status.READER_EXISTS, reader=self.readers[reader_obj.id])
+
+        self.readers[reader_obj.id] = reader_obj
+        return Result(Status.OK, reader=reader_obj)
 
-    def add_book(self, book_obj: Book) -> None:
+    def add_book(self, book_obj: Book) -> Result:
         """Добавляет книгу в библиотеку.
         Args:
             book_obj (Book): Экземпляр объекта Book.
+        Returns:
+            Result: Результат процедуры регистрации книги.
         """
 
-        if isinstance(book_obj, Book) and book_obj.id not in self.lib:
-            self.lib[book_obj.id] = book_obj
-            print('Книга БЫЛА ЗАРЕГИСТРИРОВАНА в библиотеке.')
-            print(book_obj.get_info_book())
-            print('')
-            return
-        elif not isinstance(book_obj, Book):
-            print('Переданный аргумент НЕ ЯВЛЯЕТСЯ объектом КНИГИ.')
+        if not isinstance(book_obj, Book):
+            return Result(Status.NOT_A_BOOK)
         elif book_obj.id in self.lib:
-            print(f'''Книга с id: {book_obj.id} УЖЕ ЗАРЕГИСТРИРОВАНА.''')
+            return Result(Status.BOOK_EXISTS, self.lib[book_obj.id])
+
+        self.lib[book_obj.id] = book_obj
+        self.set_status_book(book_obj, book_obj.status)
+        insort(self.book_ids, book_obj.id)
+        insort(self.index_books_by_author.setdefault(normalize(book_obj.author), list()), book_obj.id)
+        return Result(Status.OK, book_obj)
 
     def get_book_by_id(self, book_id: int):
         """Возвращает объект книги или None.
@@ -140,96 +234,708 @@ class Library:
 
         return self.readers.get(reader_id)
 
-    def borrow_book(self, book_id: int, reader_id: int) -> None:
+    def apply_borrow(self, book_obj: Book, reader_obj: Reader) -> None:
+        """Оформляет выдачу книги читателю без каких-либо проверок.
+        Args:
+            book_obj (Book): Экземпляр объекта Book.
+            reader_obj (Reader): Экземпляр объекта Reader.
+        """
+
+        self.set_status_book(book_obj, False)
+        book_obj.borrower = reader_obj.name
+        reader_obj.borrowed_books[book_obj] = None
+        insort(reader_obj.book_ids, book_obj.id)
+        self.add_borrow_history(reader_obj)
+        self.open_loan(book_obj, reader_obj)
+
+    def apply_return(self, book_obj: Book, reader_obj: Reader) -> None:
+        """Оформляет возврат книги читателем без каких-либо проверок.
+        Args:
+            book_obj (Book): Экземпляр объекта Book.
+            reader_obj (Reader): Экземпляр объекта Reader.
+        """
+
+        self.set_status_book(book_obj, True)
+        book_obj.borrower = None
+        del reader_obj.borrowed_books[book_obj]
+        del reader_obj.book_ids[bisect_left(reader_obj.book_ids, book_obj.id)]
+        self.close_loan(book_obj, reader_obj)
+
+    def open_loan(self, book_obj: Book, reader_obj: Reader) -> None:
+        """Заводит запись о выдаче со сроком возврата, вносит ее в индекс сроков
+        и дописывает выдачу в историю.
+        Args:
+            book_obj (Book): Экземпляр объекта Book.
+            reader_obj (Reader): Экземпляр объекта Reader.
+        """
+
+        now = int(self.clock())
+        loan = self.loans[book_obj.id] = Loan(book_obj, reader_obj, now, now + self.loan_period)
+        insort(self.due_index, (loan.due, book_obj.id))
+        self.loan_history.append(now, book_obj.id, reader_obj.id, False)
+
+    def close_loan(self, book_obj: Book, reader_obj: Reader) -> None:
+        """Закрывает запись о выдаче, начисляет читателю штраф за просрочку
+        и дописывает возврат в историю.
+        Книга, зарегистрированная сразу выданной, записи о выдаче не имеет.
+        Args:
+            book_obj (Book): Экземпляр объекта Book.
+            reader_obj (Reader): Экземпляр объекта Reader.
+        """
+
+        now = int(self.clock())
+        self.loan_history.append(now, book_obj.id, reader_obj.id, True)
+        loan = self.loans.pop(book_obj.id, None)
+        if (loan is None):
+            return
+
+        del self.due_index[bisect_left(self.due_index, (loan.due, book_obj.id))]
+        fine = self.get_fine(loan, now)
+        if (fine):
+            self.fines[reader_obj.id] = self.fines.get(reader_obj.id, 0) + fine
+
+    def get_fine(self, loan: Loan, now: int = None) -> int:
+        """Возвращает штраф по выдаче: fine_per_day за каждый начатый день просрочки.
+        Args:
+            loan (Loan): Запись о выдаче.
+            now (int, optional): Момент времени в секундах. Defaults to None - текущее время.
+        Returns:
+            int: Сумма штрафа, 0 если срок не истек.
+        """
+
+        now = int(self.clock()) if now is None else now
+        if (now <= loan.due):
+            return 0
+        return -(-(now - loan.due) // DAY) * self.fine_per_day
+
+    def get_overdue(self, now: int = None) -> list:
+        """Возвращает просроченные выдачи по возрастанию срока.
+        Время работы пропорционально количеству найденных выдач.
+        Args:
+            now (int, optional): Момент времени в секундах. Defaults to None - текущее время.
+        Returns:
+            list: Список Loan со сроком возврата раньше now.
+        """
+
+        now = int(self.clock()) if now is None else now
+        end = bisect_left(self.due_index, (now,))
+        return [self.loans[book_id] for _, book_id in self.due_index[:end]]
+
+    def get_due_within(self, days: int, now: int = None) -> list:
+        """Возвращает выдачи, срок возврата которых наступит в ближайшие days дней.
+        Args:
+            days (int): Количество дней.
+            now (int, optional): Момент времени в секундах. Defaults to None - текущее время.
+        Returns:
+            list: Список Loan со сроком от now до now + days дней включительно.
+        """
+
+        now = int(self.clock()) if now is None else now
+        start = bisect_left(self.due_index, (now,))
+        end = bisect_left(self.due_index, (now + days * DAY + 1,))
+        return [self.loans[book_id] for _, book_id in self.due_index[start:end]]
+
+    def get_reader_history(self, reader_id: int, start: int = None, end: int = None) -> list:
+        """Возвращает выдачи и возвраты читателя в промежутке времени [start, end).
+        Args:
+            reader_id (int): Уникальный идентификатор читателя.
+            start (int, optional): Начало промежутка в секундах. Defaults to None - с начала.
+            end (int, optional): Конец промежутка в секундах. Defaults to None - до конца.
+        Returns:
+            list: Список LoanEvent по времени.
+        """
+
+        return self.loan_history.get_reader_events(reader_id, start, end)
+
+    def get_book_history(self, book_id: int, start: int = None, end: int = None) -> list:
+        """Возвращает историю выдач книги в промежутке времени [start, end).
+        Args:
+            book_id (int): Уникальный идентификатор книги.
+            start (int, optional): Начало промежутка в секундах. Defaults to None - с начала.
+            end (int, optional): Конец промежутка в секундах. Defaults to None - до конца.
+        Returns:
+            list: Список LoanEvent по времени.
+        """
+
+        return self.loan_history.get_book_events(book_id, start, end)
+
+    def get_fines(self, now: int = None) -> dict:
+        """Возвращает штрафы читателей: начисленные при возврате и набегающие
+        по еще не возвращенным просроченным книгам.
+        Args:
+            now (int, optional): Момент времени в секундах. Defaults to None - текущее время.
+        Returns:
+            dict: Словарь ID читателя -> сумма штрафа.
+        """
+
+        now = int(self.clock()) if now is None else now
+        fines = dict(self.fines)
+        for loan in self.get_overdue(now):
+            fines[loan.reader.id] = fines.get(loan.reader.id, 0) + self.get_fine(loan, now)
+        return fines
+
+    def commit_batch(self, results: list, apply) -> list:
+        """Применяет пакет операций, только если все они прошли проверку.\n
+        Иначе ни одна операция не применяется, а успешно проверенные
+        получают статус ROLLED_BACK.
+        Args:
+            results (list): Список Result после проверки пакета.
+            apply (Callable): Метод применения одной операции.
+        Returns:
+            list: Итоговый список Result.
+        """
+
+        if all(r.status is Status.OK for r in results):
+            for r in results:
+                apply(r.book, r.reader)
+            return results
+
+        return [r._replace(status=Status.ROLLED_BACK) if r.status is Status.OK else r
+                for r in results]
+
+    def borrow_many(self, pairs) -> list:
+        """Выдает пакет книг читателям. Пакет проверяется за один проход с
+        учетом уже выданных в нем книг и лимита каждого читателя, после чего
+        применяется целиком либо не применяется вовсе. Ничего не печатает.
+        Args:
+            pairs (Iterable[tuple]): Пары (book_id, reader_id).
+        Returns:
+            list: Список Result для каждой пары в исходном порядке.
+        """
+
+        taken = set()
+        loans = dict()
+        results = []
+
+        for book_id, reader_id in pairs:
+            book_obj = self.lib.get(book_id)
+            reader_obj = self.readers.get(reader_id)
+
+            if (book_obj is None):
+                status = Status.BOOK_NOT_FOUND
+            elif (reader_obj is None):
+                status = Status.READER_NOT_FOUND
+            elif (not book_obj.status or book_id in taken):
+                status = Status.BOOK_UNAVAILABLE
+            elif (len(reader_obj.borrowed_books) + loans.get(reader_id, 0) >= self.rental_limit):
+                status = Status.LIMIT_REACHED
+            else:
+                status = Status.OK
+                taken.add(book_id)
+                loans[reader_id] = loans.get(reader_id, 0) + 1
+
+            results.append(Result(status, book_obj, reader_obj))
+
+        return self.commit_batch(results, self.apply_borrow)
+
+    def return_many(self, pairs) -> list:
+        """Принимает пакет возвращаемых книг. Пакет проверяется за один проход
+        и применяется целиком либо не применяется вовсе. Ничего не печатает.
+        Args:
+            pairs (Iterable[tuple]): Пары (book_id, reader_id).
+        Returns:
+            list: Список Result для каждой пары в исходном порядке.
+        """
+
+        returned = set()
+        results = []
+
+        for book_id, reader_id in pairs:
+            book_obj = self.lib.get(book_id)
+            reader_obj = self.readers.get(reader_id)
+
+            if (book_obj is None):
+                status = Status.BOOK_NOT_FOUND
+            elif (reader_obj is None):
+                status = Status.READER_NOT_FOUND
+            elif (book_obj not in reader_obj.borrowed_books or book_id in returned):
+                status = Status.NOT_BORROWED
+            else:
+                status = Status.OK
+                returned.add(book_id)
+
+            results.append(Result(status, book_obj, reader_obj))
+
+        return self.commit_batch(results, self.apply_return)
+
+    def borrow_book(self, book_id: int, reader_id: int) -> Result:
         """Выдает книгу читателю, если она в наличии.
         Args:
             book_id (int): Уникальный идентификатор книги
             reader_id (int): Уникальный идентификатор читателя
+        Returns:
+            Result: Результат процедуры выдачи книги читателю.
         """
 
         book_obj = self.get_book_by_id(book_id)
         reader_obj = self.get_reader_by_id(reader_id)
-        book_status = None
-        reader_status = None
 
         if (book_obj is None):
-            print(f'Книга c id: "{book_id}" НЕ зарегистрирована')
-            return
-        elif (book_obj.status):
-            book_status = True
-        else:
-            book_status = False
-
-        if (reader_obj is None):
-            print(f'Читатель с id: "{reader_id}" НЕ зарегистрирован')
-        elif (len(reader_obj.borrowed_books) < self.rental_limit):
-            reader_status = True
-        else:
-            print(f'У читателя "{reader_obj.name}" ДОСТИГНУТ ЛИМИТ выдачи: {
-                self.rental_limit} книги.')
-            reader_status = False
-
-        if (book_status and reader_status):
-            book_obj.status = False
-            book_obj.borrower = reader_obj.name
-            reader_obj.borrowed_books.append(book_obj)
-            self.add_borrow_history(reader_obj)
-            print(f'Книга "{book_obj.title}" была ВЫДАНА читателю по имени "{
-                reader_obj.name}".')
-        elif (not book_status):
-            print(f'Книги "{book_obj.title}" нет в наличии.')
-            print(f'Книга "{book_obj.title}" в данный момент у читателя "{
-                  book_obj.borrower}".')
-
-    def return_book(self, book_id: int, reader_id: int) -> None:
+            return Result(Status.BOOK_NOT_FOUND)
+        elif (reader_obj is None):
+            return Result(Status.READER_NOT_FOUND, book_obj)
+        elif (len(reader_obj.borrowed_books) >= self.rental_limit):
+            return Result(Status.LIMIT_REACHED, book_obj, reader_obj)
+        elif (not book_obj.status):
+            return Result(Status.BOOK_UNAVAILABLE, book_obj, reader_obj)
+
+        self.apply_borrow(book_obj, reader_obj)
+        return Result(Status.OK, book_obj, reader_obj)
+
+    def return_book(self, book_id: int, reader_id: int) -> Result:
         """Возвращает книгу в библиотеку.
         Args:
             book_id (int): Уникальный идентификатор книги
             reader_id (int): Уникальный идентификатор читателя
+        Returns:
+            Result: Результат процедуры возврата книги читателем.
         """
 
         book_obj = self.get_book_by_id(book_id)
         reader_obj = self.get_reader_by_id(reader_id)
-        book_status = None
-        reader_status = None
 
         if (book_obj is None):
-            print(f'Книга c id: "{book_id}" НЕ зарегистрирована')
-            return
+            return Result(Status.BOOK_NOT_FOUND)
+        elif (reader_obj is None):
+            return Result(Status.READER_NOT_FOUND, book_obj)
+        elif (book_obj not in reader_obj.borrowed_books):
+            return Result(Status.NOT_BORROWED, book_obj, reader_obj)
+
+        self.apply_return(book_obj, reader_obj)
+        return Result(Status.OK, book_obj, reader_obj)
+
+    def search_book(self, prompt: str) -> list:
+        """Ищет книгу среди всех зарегистрированных по названию или автору.\n
+        Не чувствителен к регистру.\n
+        Args:
+            prompt (str): Строка содержащая название книги или автора.
+        Returns:
+            list: Список найденных экземпляров класса Book.
+        """
+
+        query = normalize(prompt)
+        return [b for b in self.lib.values() if query in b.key]
+
+    def add_borrow_history(self, reader_obj: Reader) -> None:
+        """Добавляет читателя в историю библиотеки.
+        Args:
+            reader_obj (Reader): Экземпляр объекта читатель.
+        """
+
+        if (reader_obj not in self.borrow_history):
+            self.borrow_history[reader_obj] = None
+
+    def iter_nomenclature_book(self, status: bool = None):
+        """Перебирает книги только из запрошенного раздела, не собирая список.
+        Args:
+            status (bool, optional): None - все книги, True - в наличии,
+            False - выданные читателю.
+        Returns:
+            Iterator[Book]: Итератор по книгам раздела.
+        """
+
+        if (status):
+            return iter(self.books_in_stock.values())
+        elif (status is False):
+            return iter(self.books_out_stock.values())
         else:
-            book_status = True
+            return iter(self.lib.values())
 
-        if (reader_obj is None):
+    def get_page_nomenclature_book(self, status: bool = None, page: int = 1, size: int = 10) -> list:
+        """Возвращает одну страницу списка книг выбранного раздела.
+        Args:
+            status (bool, optional): Флаг раздела, как в show_nomenclature_book.
+            page (int, optional): Номер страницы начиная с 1. Defaults to 1.
+            size (int, optional): Количество книг на странице. Defaults to 10.
+        Returns:
+            list: Список экземпляров класса Book на запрошенной странице.
+        """
+
+        start = (page - 1) * size
+        return list(islice(self.iter_nomenclature_book(status), start, start + size))
+
+    def iter_books(self, after: int = None, status: bool = None, author: str = None, reader_id: int = None):
+        """Перебирает книги по возрастанию ID, начиная после курсора, не
+        собирая список всего каталога.\n
+        Книги берутся из самого узкого источника: книги читателя, книги
+        автора или все ID каталога - все три списка хранятся по возрастанию.
+        Начало страницы находится двоичным поиском, поэтому первая книга
+        выдается сразу при любом размере каталога. Остальные фильтры
+        проверяются по ходу перебора.
+        Args:
+            after (int, optional): ID последней книги предыдущей страницы. Defaults to None - с начала.
+            status (bool, optional): True - в наличии, False - выданные, None - все.
+            author (str, optional): Имя автора. Defaults to None - любой.
+            reader_id (int, optional): ID читателя, у которого книга. Defaults to None - любой.
+        Returns:
+            Iterator[Book]: Итератор по книгам.
+        """
+
+        author_key = None if author is None else normalize(author)
+
+        if reader_id is not None:
+            reader_obj = self.readers.get(reader_id)
+            book_ids = [] if reader_obj is None else reader_obj.book_ids
+        elif author_key is not None:
+            book_ids = self.index_books_by_author.get(author_key, [])
+        else:
+            book_ids = self.book_ids
+
+        # Идем по номеру позиции: срез или islice прошли бы весь список до курсора.
+        position = 0 if after is None else bisect_right(book_ids, after)
+        while position < len(book_ids):
+            book_id = book_ids[position]
+            position += 1
+            book_obj = self.lib[book_id]
+            if status is not None and book_obj.status != status:
+                continue
+            # Книги автора уже отобраны источником, проверять нужно только книги читателя.
+            if reader_id is not None and author_key is not None and normalize(book_obj.author) != author_key:
+                continue
+            yield book_obj
+
+    def get_page_books(self, after: int = None, size: int = 10, **filters) -> Page:
+        """Возвращает страницу книг по курсору.\n
+        В отличие от номера страницы, курсор не сдвигается при добавлении
+        книг, и страница не требует пропуска всех предыдущих книг.
+        Args:
+            after (int, optional): Курсор из предыдущей страницы. Defaults to None - первая страница.
+            size (int, optional): Количество книг на странице. Defaults to 10.
+            filters: Фильтры status, author, reader_id как в iter_books.
+        Returns:
+            Page: Книги страницы и курсор следующей страницы или None, если это последняя.
+        Raises:
+            ValueError: Если size меньше 1.
+        """
+
+        if size < 1:
+            raise ValueError(f'ОШИБКА: Размер страницы "{size}" должен быть не меньше 1.')
+
+        books = list(islice(self.iter_books(after, **filters), size))
+        return Page(books, books[-1].id if len(books) == size else None)
+
+
+#######################################################################
+
+
+class ConcurrentLibrary(Library):
+
+    def __init__(self, limit: int, stripes: int = 64, **options) -> None:
+        """Инициализирует библиотеку, безопасную для работы из нескольких потоков.\n
+        Вместо одной общей блокировки используются наборы блокировок
+        (lock striping) отдельно для книг и для читателей: операции с разными
+        книгами и читателями не мешают друг другу. Блокировки всегда берутся
+        в одном порядке: сначала читателей, затем книг, по возрастанию номера.
+        Общие контейнеры каталога - словари книг и читателей, book_ids,
+        индекс по автору, разделы книг в наличии и выданных и история
+        читателей - защищает одна блокировка registry_lock, она берется
+        после блокировок книг. Индекс сроков и история выдач общие для всех
+        книг, поэтому их защищает отдельная блокировка loans_lock, которая
+        берется последней.
+        Args:
+            limit (int): Число указывающее лимит книг которые читатель может взять.
+            stripes (int, optional): Количество блокировок в каждом наборе. Defaults to 64.
+            options: loan_days, fine_per_day и clock как в Library.
+        """
+
+        super().__init__(limit, **options)
+        self.book_locks = [Lock() for _ in range(stripes)]
+        self.reader_locks = [Lock() for _ in range(stripes)]
+        # RLock: add_book под этой блокировкой вызывает set_status_book.
+        self.registry_lock = RLock()
+        self.loans_lock = Lock()
+
+    def get_locks(self, pairs) -> list:
+        """Возвращает блокировки, нужные для операций над парами книга-читатель,
+        в порядке их захвата.
+        Args:
+            pairs (Iterable[tuple]): Пары (book_id, reader_id).
+        Returns:
+            list: Список объектов Lock.
+        """
+
+        stripes = len(self.book_locks)
+        reader_stripes = sorted({hash(reader_id) % stripes for _, reader_id in pairs})
+        book_stripes = sorted({hash(book_id) % stripes for book_id, _ in pairs})
+        return ([self.reader_locks[i] for i in reader_stripes]
+                + [self.book_locks[i] for i in book_stripes])
+
+    def run_locked(self, pairs: list, operation, *args):
+        """Выполняет операцию, удерживая блокировки всех затронутых книг и читателей.
+        Args:
+            pairs (list): Пары (book_id, reader_id), затрагиваемые операцией.
+            operation (Callable): Метод базового класса Library.
+        Returns:
+            Any: Результат операции.
+        """
+
+        locks = self.get_locks(pairs)
+        for lock in locks:
+            lock.acquire()
+        try:
+            return operation(self, *args)
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    def register_reader(self, reader_obj: Reader) -> Result:
+        with self.registry_lock:
+            return super().register_reader(reader_obj)
+
+    def add_book(self, book_obj: Book) -> Result:
+        with self.registry_lock:
+            return super().add_book(book_obj)
+
+    def set_status_book(self, book_obj: Book, status: bool) -> None:
+        with self.registry_lock:
+            super().set_status_book(book_obj, status)
+
+    def add_borrow_history(self, reader_obj: Reader) -> None:
+        with self.registry_lock:
+            super().add_borrow_history(reader_obj)
+
+    def search_book(self, prompt: str) -> list:
+        with self.registry_lock:
+            return super().search_book(prompt)
+
+    def iter_nomenclature_book(self, status: bool = None):
+        """Перебирает книги раздела по копии, снятой под registry_lock: выдача
+        в другом потоке переносит книгу между разделами во время перебора."""
+
+        with self.registry_lock:
+            return iter(list(super().iter_nomenclature_book(status)))
+
+    def get_page_nomenclature_book(self, status: bool = None, page: int = 1, size: int = 10) -> list:
+        with self.registry_lock:
+            start = (page - 1) * size
+            return list(islice(super().iter_nomenclature_book(status), start, start + size))
+
+    def iter_books(self, after: int = None, status: bool = None, author: str = None, reader_id: int = None):
+        """Перебирает книги как Library.iter_books, но каждую следующую книгу
+        ищет заново по курсору под registry_lock, а для фильтра по читателю -
+        и под блокировкой читателя. Генератор не держит блокировки между
+        книгами, а add_book может вставить ID в середину book_ids, поэтому
+        позиция в списке между шагами сдвинулась бы.
+        """
+
+        locks = [self.registry_lock]
+        if (reader_id is not None):
+            locks.insert(0, self.reader_locks[hash(reader_id) % len(self.reader_locks)])
+
+        while True:
+            for lock in locks:
+                lock.acquire()
+            try:
+                book_obj = next(Library.iter_books(self, after, status, author, reader_id), None)
+            finally:
+                for lock in reversed(locks):
+                    lock.release()
+            if (book_obj is None):
+                return
+            after = book_obj.id
+            yield book_obj
+
+    def borrow_book(self, book_id: int, reader_id: int) -> Result:
+        return self.run_locked([(book_id, reader_id)], Library.borrow_book, book_id, reader_id)
+
+    def return_book(self, book_id: int, reader_id: int) -> Result:
+        return self.run_locked([(book_id, reader_id)], Library.return_book, book_id, reader_id)
+
+    def borrow_many(self, pairs) -> list:
+        pairs = list(pairs)
+        return self.run_locked(pairs, Library.borrow_many, pairs)
+
+    def return_many(self, pairs) -> list:
+        pairs = list(pairs)
+        return self.run_locked(pairs, Library.return_many, pairs)
+
+    def open_loan(self, book_obj: Book, reader_obj: Reader) -> None:
+        with self.loans_lock:
+            super().open_loan(book_obj, reader_obj)
+
+    def close_loan(self, book_obj: Book, reader_obj: Reader) -> None:
+        with self.loans_lock:
+            super().close_loan(book_obj, reader_obj)
+
+    def get_overdue(self, now: int = None) -> list:
+        with self.loans_lock:
+            return super().get_overdue(now)
+
+    def get_due_within(self, days: int, now: int = None) -> list:
+        with self.loans_lock:
+            return super().get_due_within(days, now)
+
+    def get_fines(self, now: int = None) -> dict:
+        with self.loans_lock:
+            return super().get_fines(now)
+
+    def get_reader_history(self, reader_id: int, start: int = None, end: int = None) -> list:
+        with self.loans_lock:
+            return super().get_reader_history(reader_id, start, end)
+
+    def get_book_history(self, book_id: int, start: int = None, end: int = None) -> list:
+        with self.loans_lock:
+            return super().get_book_history(book_id, start, end)
+
+
+#######################################################################
+
+
+class LibraryConsole:
+
+    def __init__(self, library: Library) -> None:
+        """Инициализирует слой представления библиотеки.\n
+        Выполняет операции библиотеки и распечатывает их результат в
+        удобочитаемом виде. Все остальные атрибуты и методы берутся у
+        самой библиотеки.
+        Args:
+            library (Library): Экземпляр объекта Library.
+        """
+
+        self.library = library
+
+    def __getattr__(self, name: str):
+        return getattr(self.library, name)
+
+    def print_list_book(self, list_books: list) -> None:
+        """Распечатывает список книг в формате:\n
+        Название: ...\n
+        Автор: ...\n
+        Статус: ...\n
+        id: ...\n
+        Кем арендована: ...\n
+        Args:
+            list_books (list): Список экземпляров класса Book.
+        """
+
+        count_print = 0
+        for b in list_books:
+            count_print += 1
+            print('')
+            print(f'''{count_print}.''')
+            print(b.get_info_book())
+
+    def register_reader(self, reader_obj: Reader) -> Result:
+        """Регистрирует нового читателя в библиотеке и распечатывает результат.
+        Args:
+            reader (Reader): Экземпляр объекта Reader.
+        Returns:
+            Result: Результат процедуры регистрации читателя.
+        """
+
+        result = self.library.register_reader(reader_obj)
+
+        if (result.status is Status.OK):
+            print(f'Читатель по имени "{
+                  reader_obj.name}" БЫЛ ЗАРЕГИСТРИРОВАН под номером {reader_obj.id}.')
+        elif (result.status is Status.NOT_A_READER):
+            print('Переданный аргумент НЕ ЯВЛЯЕТСЯ объектом ЧИТАТЕЛЯ.')
+        else:
+            print(f'''Читатель с id: {
+                reader_obj.id} уже БЫЛ ЗАРЕГИСТРИРОВАН в библиотеке ранее.''')
+
+        return result
+
+    def add_book(self, book_obj: Book) -> Result:
+        """Добавляет книгу в библиотеку и распечатывает результат.
+        Args:
+            book_obj (Book): Экземпляр объекта Book.
+        Returns:
+            Result: Результат процедуры регистрации книги.
+        """
+
+        result = self.library.add_book(book_obj)
+
+        if (result.status is Status.OK):
+            print('Книга БЫЛА ЗАРЕГИСТРИРОВАНА в библиотеке.')
+            print(book_obj.get_info_book())
+            print('')
+        elif (result.status is Status.NOT_A_BOOK):
+            print('Переданный аргумент НЕ ЯВЛЯЕТСЯ объектом КНИГИ.')
+        else:
+            print(f'''Книга с id: {book_obj.id} УЖЕ ЗАРЕГИСТРИРОВАНА.''')
+
+        return result
+
+    def print_book_unavailable(self, book_obj: Book) -> None:
+        """Распечатывает сообщение о том, что книги нет в наличии.
+        Args:
+            book_obj (Book): Экземпляр объекта Book.
+        """
+
+        print(f'Книги "{book_obj.title}" нет в наличии.')
+        print(f'Книга "{book_obj.title}" в данный момент у читателя "{
+              book_obj.borrower}".')
+
+    def borrow_book(self, book_id: int, reader_id: int) -> Result:
+        """Выдает книгу читателю и распечатывает результат.
+        Args:
+            book_id (int): Уникальный идентификатор книги
+            reader_id (int): Уникальный идентификатор читателя
+        Returns:
+            Result: Результат процедуры выдачи книги читателю.
+        """
+
+        result = self.library.borrow_book(book_id, reader_id)
+        book_obj = result.book
+
+        if (result.status is Status.OK):
+            print(f'Книга "{book_obj.title}" была ВЫДАНА читателю по имени "{
+                result.reader.name}".')
+            return result
+        elif (result.status is Status.BOOK_NOT_FOUND):
+            print(f'Книга c id: "{book_id}" НЕ зарегистрирована')
+            return result
+        elif (result.status is Status.READER_NOT_FOUND):
+            print(f'Читатель с id: "{reader_id}" НЕ зарегистрирован')
+        elif (result.status is Status.LIMIT_REACHED):
+            print(f'У читателя "{result.reader.name}" ДОСТИГНУТ ЛИМИТ выдачи: {
+                self.library.rental_limit} книги.')
+
+        if (not book_obj.status):
+            self.print_book_unavailable(book_obj)
+
+        return result
+
+    def return_book(self, book_id: int, reader_id: int) -> Result:
+        """Возвращает книгу в библиотеку и распечатывает результат.
+        Args:
+            book_id (int): Уникальный идентификатор книги
+            reader_id (int): Уникальный идентификатор читателя
+        Returns:
+            Result: Результат процедуры возврата книги читателем.
+        """
+
+        result = self.library.return_book(book_id, reader_id)
+
+        if (result.status is Status.OK):
+            print(f'Книга "{result.book.title}" была ВОЗВРАЩЕНА читателем {
+                result.reader.name}".')
+        elif (result.status is Status.BOOK_NOT_FOUND):
+            print(f'Книга c id: "{book_id}" НЕ зарегистрирована')
+        elif (result.status is Status.READER_NOT_FOUND):
             print(f'Читатель с id: "{reader_id}" НЕ зарегистрирован')
-        elif (book_obj in reader_obj.borrowed_books):
-            reader_status = True
         else:
-            reader_status = False
-            print(f'Книга "{book_obj.title}" НЕ числится в списке читателя {
-                reader_obj.name}')
+            print(f'Книга "{result.book.title}" НЕ числится в списке читателя {
+                result.reader.name}')
 
-        if (book_status and reader_status):
-            book_obj.status = True
-            book_obj.borrower = None
-            reader_obj.borrowed_books.remove(book_obj)
-            print(f'Книга "{book_obj.title}" была ВОЗВРАЩЕНА читателем {
-                reader_obj.name}".')
+        return result
 
     def get_book_status(self, book_id: int) -> None:
         """Выводит информацию о статусе книги и у какого читателя она находится.
         Args:
-            title (str): Строка с название книги.
+            book_id (int): Уникальный идентификатор книги
         """
 
-        print(self.get_book_by_id(book_id).get_info_book())
+        print(self.library.get_book_by_id(book_id).get_info_book())
 
     def list_reader_books(self, reader_id: int) -> None:
         """Распечатывает список книг конкретного читателя.
         Args:
-            reader (str): Строка с именем читателя.
+            reader_id (int): Уникальный идентификатор читателя
         """
 
-        reader_obj = self.get_reader_by_id(reader_id)
+        reader_obj = self.library.get_reader_by_id(reader_id)
 
         if reader_obj is None:
             print(f'Читатель с id: "{reader_id}" НЕ зарегистрирован')
@@ -238,66 +944,45 @@ class Library:
                 len(reader_obj.borrowed_books)} книг на руках.')
             self.print_list_book(reader_obj.borrowed_books)
 
-    def search_book(self, prompt: str) -> None:
-        """Ищет книгу среди всех зарегистрированных по названию или автору.\n
-        Не чувствителен к регистру.\n
+    def search_book(self, prompt: str, reader_name: str = None) -> list:
+        """Ищет книгу по названию или автору и распечатывает результат.\n
+        Если часть книг выдана, распечатывает читателей, у которых они, и
+        список книг читателя reader_name, если он среди них.
         Args:
             prompt (str): Строка содержащая название книги или автора.
+            reader_name (str, optional): Имя читателя, чьи книги нужно показать. Defaults to None.
+        Returns:
+            list: Список найденных экземпляров класса Book.
         """
 
-        count_match = 0
-        match_list = []
-        borrower_list = set()
-
-        for b in self.lib:
-            current_book = f'{b.title} {b.author}'
-            if (prompt.lower() in current_book.lower()):
-                count_match += 1
-                match_list.append(b)
-
-        for b in match_list:
-            if (not b.status):
-                borrower_list.add(b.borrower)
+        match_list = self.library.search_book(prompt)
+        borrower_list = dict.fromkeys(b.borrower for b in match_list if not b.status)
 
-        print(f'По запросу "{prompt}" найдено {count_match} книг:')
+        print(f'По запросу "{prompt}" найдено {len(match_list)} книг:')
         self.print_list_book(match_list)
 
         if (len(borrower_list) > 0):
             print(f'Одна или несколько книг в данный момент у читателей')
             for rd in borrower_list:
                 print(f'{rd}')
-            current_reader = input('Для показа списка введите имя читателя:')
-            self.list_reader_books(current_reader.capitalize())
+            if (reader_name is not None):
+                for rd in self.library.readers.values():
+                    if (rd.name == reader_name.capitalize()):
+                        self.list_reader_books(rd.id)
+
+        return match_list
 
     def show_status_library(self) -> None:
         """Отображает текущее состояние всех книг в библиотеке."""
 
-        in_stock = 0
-        out_stock = 0
-
-        for b in self.lib.values():
-            if (b.status):
-                in_stock += 1
-            else:
-                out_stock += 1
-
-        print(f'Книг всего зарегистрировано: {len(self.lib)}')
-        print(f'Книг в наличии: {in_stock}')
-        print(f'Книг выдано читателю: {out_stock}')
-
-    def add_borrow_history(self, reader_obj: Reader) -> None:
-        """Добавляет читателя в историю библиотеки.
-        Args:
-            reader_obj (Reader): Экземпляр объекта читатель.
-        """
-
-        if (reader_obj not in self.borrow_history):
-            self.borrow_history.append(reader_obj)
+        print(f'Книг всего зарегистрировано: {len(self.library.lib)}')
+        print(f'Книг в наличии: {len(self.library.books_in_stock)}')
+        print(f'Книг выдано читателю: {len(self.library.books_out_stock)}')
 
     def show_borrow_history(self):
         """Распечатывает список читателей которые брали книги."""
 
-        for rd in self.borrow_history:
+        for rd in self.library.borrow_history:
             print(f'{rd.name}')
 
     def show_nomenclature_book(self, status: bool = None) -> None:
@@ -309,130 +994,202 @@ class Library:
             status (bool, optional): Флаг обозначающий тот или иной список.
         """
 
-        in_stock = []
-        out_stock = []
-
-        for v in self.lib.values():
-            if (v.status):
-                in_stock.append(v)
-            else:
-                out_stock.append(v)
-
         if (status):
-            print(f'Книги в наличии: {len(in_stock)}')
-            self.print_list_book(in_stock)
-            print('')
-            print(f'Книги в наличии: {len(in_stock)}')
+            title = f'Книги в наличии: {len(self.library.books_in_stock)}'
         elif (status is False):
-            print(f'Книги выданные читателям: {len(out_stock)}')
-            self.print_list_book(out_stock)
-            print('')
-            print(f'Книги выданные читателям: {len(out_stock)}')
+            title = f'Книги выданные читателям: {len(self.library.books_out_stock)}'
         else:
-            print(f'Книг всего зарегистрировано: {len(self.lib)}')
-            self.print_list_book(list(self.lib.values()))
-            print('')
-            print(f'Книг всего зарегистрировано: {len(self.lib)}')
+            title = f'Книг всего зарегистрировано: {len(self.library.lib)}'
+
+        print(title)
+        self.print_list_book(self.library.iter_nomenclature_book(status))
+        print('')
+        print(title)
+
+    def show_page_books(self, after: int = None, size: int = 10, **filters) -> Page:
+        """Распечатывает одну страницу списка книг по курсору.
+        Args:
+            after (int, optional): Курсор из предыдущей страницы. Defaults to None - первая страница.
+            size (int, optional): Количество книг на странице. Defaults to 10.
+            filters: Фильтры status, author, reader_id как в Library.iter_books.
+        Returns:
+            Page: Распечатанная страница.
+        """
+
+        page = self.library.get_page_books(after, size, **filters)
+        self.print_list_book(page.books)
+        print('')
+        if page.cursor is None:
+            print('Это последняя страница.')
+        else:
+            print(f'Следующая страница: after={page.cursor}')
+        return page
+
+    def show_overdue(self, now: int = None) -> list:
+        """Распечатывает просроченные выдачи и штраф по каждой.
+        Args:
+            now (int, optional): Момент времени в секундах. Defaults to None - текущее время.
+        Returns:
+            list: Список просроченных Loan.
+        """
+
+        overdue = self.library.get_overdue(now)
+        if (not overdue):
+            print('Просроченных книг нет.')
+        for loan in overdue:
+            print(f'{loan.book.id}: {loan.book.title} - {loan.reader.name}, штраф: {self.library.get_fine(loan, now)}')
+        return overdue
 
 
 # Тесты ###############################################################
 
-print('-------- Создаем Библиотеку')
-library = Library(4)
-print('')
-
-print('-------- Создаем Книги')
-b1 = Book("FastAPI", "Билл Любанович", 1)
-b2 = Book("Простой Python", "Билл Любанович", 2)
-b3 = Book("Чистый код", "Роберт Мартин", 3)
-b4 = Book("Идеальная работа", "Роберт Мартин", 4)
-b5 = Book("Идеальный программист", "Роберт Мартин", 5)
-b6 = Book("Изучаем Python", "Марк Лутц", 6)
-b7 = Book("Python Карманный справочник", "Марк Лутц", 7)
-b8 = Book("ES6 и не только", "Кайл Симпсон", 8)
-b9 = Book("Замыкания и объекты", "Кайл Симпсон", 9)
-b10 = Book("Познакомьтесь, JavaScript", "Кайл Симпсон", 10)
-b11 = Book("Изучаем SQL", "Алан Бьюли", 11)
-b12 = Book("Django 4 в примерах", "Антонио Меле", 12)
-b13 = Book("Linux Книга рецептов", "Карла Шрёдер", 13)
-b14 = Book("jQuery в действии", "Аурелио де Роза", 14)
-b15 = Book("Внутреннее устройство Linux", "Дмитрий Кетов", 15)
-b16 = Book("Внутреннее устройство Linux", "Дмитрий Кетов", 15)  # Duplicate
-print('')
-
-print('-------- Регистрируем Книги в библиотеке')
-library.add_book(b1)
-library.add_book(b2)
-library.add_book(b3)
-library.add_book(b4)
-library.add_book(b5)
-library.add_book(b6)
-library.add_book(b7)
-library.add_book(b8)
-library.add_book(b9)
-library.add_book(b10)
-library.add_book(b11)
-library.add_book(b12)
-library.add_book(b13)
-library.add_book(b14)
-library.add_book(b15)
-library.add_book(b16)
-library.add_book('Caramba!')
-print('')
-
-print('-------- Показываем список Книг')
-for k, v in library.lib.items():
-    print(f'{k}: {v.title} - {v.author} - {v.status}')
-print('')
-
-
-print('-------- Создаем Читателей')
-r1 = Reader('Alice', 123)
-r2 = Reader('Bob', 456)
-r3 = Reader('Eve', 789)
-r4 = Reader('Eve', 789)  # Duplicate
-print('')
-
-print('-------- Регистрируем Читателей в библиотеке')
-library.register_reader(r1)
-library.register_reader(r2)
-library.register_reader(r3)
-library.register_reader(r4)
-library.register_reader('Caramba!')
-print('')
-
-print('-------- Показываем список Читателей')
-for k, v in library.readers.items():
-    print(f'{k}: {v.name} - {v.borrowed_books}')
-print('')
-
-
-print('-------- Выдаем Книги Читателям')
-library.borrow_book(1, 123)
-library.borrow_book(2, 123)
-library.borrow_book(3, 123)
-library.borrow_book(4, 123)
-library.borrow_book(5, 456)
-library.borrow_book(6, 456)
-library.borrow_book(7, 456)
-library.borrow_book(8, 456)
-library.borrow_book(9, 789)
-library.borrow_book(10, 789)
-library.borrow_book(11, 789)
-library.borrow_book(12, 789)
-library.borrow_book(13, 123)
-library.borrow_book(14, 456)
-library.borrow_book(15, 789)
-
-library.borrow_book(7, 246)  # Fake
-library.borrow_book(42, 246)  # Fake
-print('')
-
-print('-------- Читатели возвращают книги')
-library.return_book(13, 123)
-library.return_book(14, 456)
-library.return_book(15, 789)
-
-library.return_book(7, 246)  # Fake
-library.return_book(42, 246)  # Fake
-print('')
+
+def main() -> None:
+    print('-------- Создаем Библиотеку')
+    library = LibraryConsole(Library(4))
+    print('')
+
+    print('-------- Создаем Книги')
+    b1 = Book("FastAPI", "Билл Любанович", 1)
+    b2 = Book("Простой Python", "Билл Любанович", 2)
+    b3 = Book("Чистый код", "Роберт Мартин", 3)
+    b4 = Book("Идеальная работа", "Роберт Мартин", 4)
+    b5 = Book("Идеальный программист", "Роберт Мартин", 5)
+    b6 = Book("Изучаем Python", "Марк Лутц", 6)
+    b7 = Book("Python Карманный справочник", "Марк Лутц", 7)
+    b8 = Book("ES6 и не только", "Кайл Симпсон", 8)
+    b9 = Book("Замыкания и объекты", "Кайл Симпсон", 9)
+    b10 = Book("Познакомьтесь, JavaScript", "Кайл Симпсон", 10)
+    b11 = Book("Изучаем SQL", "Алан Бьюли", 11)
+    b12 = Book("Django 4 в примерах", "Антонио Меле", 12)
+    b13 = Book("Linux Книга рецептов", "Карла Шрёдер", 13)
+    b14 = Book("jQuery в действии", "Аурелио де Роза", 14)
+    b15 = Book("Внутреннее устройство Linux", "Дмитрий Кетов", 15)
+    b16 = Book("Внутреннее устройство Linux", "Дмитрий Кетов", 15)  # Duplicate
+    print('')
+
+    print('-------- Регистрируем Книги в библиотеке')
+    library.add_book(b1)
+    library.add_book(b2)
+    library.add_book(b3)
+    library.add_book(b4)
+    library.add_book(b5)
+    library.add_book(b6)
+    library.add_book(b7)
+    library.add_book(b8)
+    library.add_book(b9)
+    library.add_book(b10)
+    library.add_book(b11)
+    library.add_book(b12)
+    library.add_book(b13)
+    library.add_book(b14)
+    library.add_book(b15)
+    library.add_book(b16)
+    library.add_book('Caramba!')
+    print('')
+
+    print('-------- Показываем список Книг')
+    for k, v in library.lib.items():
+        print(f'{k}: {v.title} - {v.author} - {v.status}')
+    print('')
+
+    print('-------- Создаем Читателей')
+    r1 = Reader('Alice', 123)
+    r2 = Reader('Bob', 456)
+    r3 = Reader('Eve', 789)
+    r4 = Reader('Eve', 789)  # Duplicate
+    print('')
+
+    print('-------- Регистрируем Читателей в библиотеке')
+    library.register_reader(r1)
+    library.register_reader(r2)
+    library.register_reader(r3)
+    library.register_reader(r4)
+    library.register_reader('Caramba!')
+    print('')
+
+    print('-------- Показываем список Читателей')
+    for k, v in library.readers.items():
+        print(f'{k}: {v.name} - {list(v.borrowed_books)}')
+    print('')
+
+    print('-------- Выдаем Книги Читателям')
+    library.borrow_book(1, 123)
+    library.borrow_book(2, 123)
+    library.borrow_book(3, 123)
+    library.borrow_book(4, 123)
+    library.borrow_book(5, 456)
+    library.borrow_book(6, 456)
+    library.borrow_book(7, 456)
+    library.borrow_book(8, 456)
+    library.borrow_book(9, 789)
+    library.borrow_book(10, 789)
+    library.borrow_book(11, 789)
+    library.borrow_book(12, 789)
+    library.borrow_book(13, 123)
+    library.borrow_book(14, 456)
+    library.borrow_book(15, 789)
+
+    library.borrow_book(7, 246)  # Fake
+    library.borrow_book(42, 246)  # Fake
+    print('')
+
+    print('-------- Читатели возвращают книги')
+    library.return_book(13, 123)
+    library.return_book(14, 456)
+    library.return_book(15, 789)
+
+    library.return_book(7, 246)  # Fake
+    library.return_book(42, 246)  # Fake
+    print('')
+
+    print('-------- Ищем книги')
+    # Имя спрашивается только при запуске из терминала, чтобы демонстрация шла и без ввода.
+    reader_name = input('Для показа списка введите имя читателя:') if sys.stdin.isatty() else 'Alice'
+    library.search_book('Python', reader_name)
+    print('')
+
+    print('-------- Пакетная выдача и возврат книг')
+    for r in library.return_many([(1, 123), (5, 456), (1, 123)]):
+        print(f'{r.book.id}: {r.status.value}')
+    for r in library.return_many([(1, 123), (5, 456)]):
+        print(f'{r.book.id}: {r.status.value}')
+    for r in library.borrow_many([(13, 123), (1, 456)]):
+        print(f'{r.book.id}: {r.status.value}')
+    for r in library.borrow_many([(5, 123), (14, 789)]):
+        print(f'{r.book.id}: {r.status.value}')
+    print('')
+
+    print('-------- Постраничный вывод книг в наличии')
+    page = library.show_page_books(size=3, status=True)
+    library.show_page_books(page.cursor, size=3, status=True)
+    print('')
+
+    print('-------- Сроки возврата и штрафы')
+    moment = [0]
+    loans = LibraryConsole(Library(4, loan_days=14, fine_per_day=10, clock=lambda: moment[0]))
+    for b in (Book("Чистый код", "Роберт Мартин", 1), Book("Изучаем SQL", "Алан Бьюли", 2),
+              Book("FastAPI", "Билл Любанович", 3)):
+        loans.library.add_book(b)
+    loans.library.register_reader(Reader('Alice', 123))
+    loans.library.borrow_book(1, 123)
+    moment[0] = 5 * DAY
+    loans.library.borrow_book(2, 123)
+    loans.library.borrow_book(3, 123)
+    moment[0] = 17 * DAY
+    loans.show_overdue()
+    print(f'Срок возврата в ближайшие 3 дня: {[loan.book.id for loan in loans.get_due_within(3)]}')
+    loans.library.return_book(1, 123)
+    moment[0] = 20 * DAY
+    print(f'Штрафы читателей: {loans.get_fines()}')
+    print('')
+
+    print('-------- История выдач')
+    for event in loans.get_reader_history(123, 0, 10 * DAY):
+        print(f'День {event.time // DAY}: книга {event.book_id} {"возвращена" if event.is_return else "выдана"}')
+    print(f'История книги 1: {[(e.time // DAY, e.is_return) for e in loans.get_book_history(1)]}')
+    print('')
+
+
+if __name__ == '__main__':
+    main()
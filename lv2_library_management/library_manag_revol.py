@@ -1,246 +1,2233 @@
+import heapq
+import sys
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from enum import Enum
+from itertools import islice
+from threading import Lock, RLock
+from typing import NamedTuple
+
+from .loan_history import LoanHistory
+
+# Длительность суток в секундах: сроки выдачи хранятся в секундах часов библиотеки.
+DAY = 86_400
+
+
+class Status(Enum):
+    """Коды результата операций библиотеки."""
+
+    OK = 'УСПЕХ'
+    NOT_A_BOOK = 'НЕ ЯВЛЯЕТСЯ объектом книги'
+    NOT_A_READER = 'НЕ ЯВЛЯЕТСЯ объектом читателя'
+    BOOK_EXISTS = 'Книга УЖЕ зарегистрирована в библиотеке'
+    READER_EXISTS = 'Читатель УЖЕ зарегистрирован в библиотеке'
+    BOOK_NOT_FOUND = 'ID книги не найден в индексе'
+    READER_NOT_FOUND = 'ID читателя не найден в индексе'
+    BOOK_UNAVAILABLE = 'Книга в данный момент У ДРУГОГО ЧИТАТЕЛЯ'
+    LIMIT_REACHED = 'Для читателя БЫЛ ДОСТИГНУТ ЛИМИТ'
+    NOT_BORROWED = 'Книга НЕ ЧИСЛИТСЯ в списке читателя'
+    ROLLED_BACK = 'Операция отменена из-за ошибки в пакете'
+    HOLD_EXISTS = 'Читатель УЖЕ СТОИТ в очереди на книгу'
+    HOLD_NOT_FOUND = 'Читатель НЕ СТОИТ в очереди на книгу'
+    BOOK_RESERVED = 'Свободный экземпляр книги ОТЛОЖЕН для очереди бронирования'
+
+
+class Result(NamedTuple):
+    """Результат одной операции: код и затронутые книга и читатель.
+    holder - читатель, которому по брони выдан экземпляр книги операции,
+    handoffs - все книги, выданные по брони в ходе операции, включая книги
+    других названий, выданные читателю, у которого освободилось место.
+    """
+
+    status: Status
+    book: object = None
+    reader: object = None
+    holder: object = None
+    handoffs: tuple = ()
+
+
+class Availability(NamedTuple):
+    """Количество экземпляров книги: всего и в наличии."""
+
+    total: int
+    available: int
+
+
+class Loan(NamedTuple):
+    """Выдача книги: книга, читатель, момент выдачи и срок возврата в секундах."""
+
+    book: object
+    reader: object
+    checkout: int
+    due: int
+
+
+class Page(NamedTuple):
+    """Страница списка книг и курсор для запроса следующей страницы."""
+
+    books: list
+    cursor: int | None
+
+
+class SearchResult(NamedTuple):
+    """Результат поиска: книги по названию, книги по автору и читатель."""
+
+    by_title: list
+    by_author: list
+    reader: object = None
+
+
+class CacheStats(NamedTuple):
+    """Счетчики кэша результатов поиска."""
+
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    size: int
+
+
+class Completions(NamedTuple):
+    """Варианты автодополнения: названия, авторы и имена читателей."""
+
+    titles: list
+    authors: list
+    readers: list
+
+
+class FuzzyMatch(NamedTuple):
+    """Книга, найденная нечетким поиском, и число опечаток в запросе."""
+
+    distance: int
+    book: object
+
+
+def normalize(text: str) -> str:
+    """Нормализует строку для индексов и поиска.\n
+    Форма NFKC, сравнение без учета регистра (casefold), "ё" совпадает с
+    "е", пробелы по краям убраны, а внутри схлопнуты до одного. Ключ
+    названия книги и ключ читателя вычисляются один раз при создании, ключ
+    автора - при добавлении книги, а запрос нормализуется один раз при поиске.
+    Args:
+        text (str): Исходная строка.
+    Returns:
+        str: Нормализованный ключ.
+    """
+
+    text = unicodedata.normalize('NFKC', text).casefold().replace('ё', 'е')
+    return ' '.join(text.split())
+
+
+def iter_heap(heap: list):
+    """Перебирает элементы min-кучи по возрастанию, не изменяя ее.\n
+    Первые k элементов обходятся за O(k log k) независимо от размера кучи.
+    Args:
+        heap (list): Min-куча heapq.
+    Returns:
+        Iterator: Итератор элементов кучи по возрастанию.
+    """
+
+    frontier = [(heap[0], 0)] if heap else []
+    while frontier:
+        value, i = heapq.heappop(frontier)
+        yield value
+        for child in (2 * i + 1, 2 * i + 2):
+            if child < len(heap):
+                heapq.heappush(frontier, (heap[child], child))
+
+
+#######################################################################
+
+
 class Book:
+    __slots__ = ('title', 'author', 'id', 'status', 'borrower', 'title_key')
+
+    def __init__(self, title: str, author: str, id: int) -> None:
+        """Инициализирует объект класса книга.
+        Args:
+            title (str): Строка с названием книги.
+            author (str): Строка с ФИО автора.
+            id (int): Уникальный идентификатор книги.
+        """
+
+        self.title = title
+        self.author = author
+        self.id = id
+        self.status = True
+        self.borrower = None
+        # Ключ названия нужен при каждой выдаче и возврате, поэтому вычисляется один раз.
+        self.title_key = normalize(title)
+
+    def __str__(self) -> str:
+        return f'Название книги: {self.title}\nАвтор книги: {self.author}\nID книги: {self.id}\nСтатус книги: {'В наличии' if self.status else 'У читателя'}'
+
+#######################################################################
+
+
+class Reader:
+    __slots__ = ('name', 'id', 'borrowed_books', 'key')
+
+    def __init__(self, name: str, id: int) -> None:
+        """Инициализирует объект класса читатель.
+        Args:
+            name (str): Имя читателя.
+            id (int): Уникальный идентификатор читателя.
+        """
+
+        self.name = name.capitalize()
+        self.id = id
+        self.key = normalize(name)
+        # Словарь используется как упорядоченное множество выданных книг:
+        # проверка и удаление за O(1), порядок выдачи сохраняется.
+        self.borrowed_books = dict()
+
+    def __str__(self) -> str:
+        return f'Имя читателя: {self.name}\nID читателя: {self.id}'
+
+
+#######################################################################
+
+
+class BookStore(MutableMapping):
+    # Статус строки удаленной книги.
+    DELETED = -1
+
+    def __init__(self) -> None:
+        """Инициализирует колоночное хранилище книг: словарь ID -> BookView.\n
+        Каждый атрибут книги хранится в отдельной колонке: ID и статус в
+        компактных массивах array, названия, их ключи и авторы -
+        интернированными строками, поэтому повторяющиеся значения не
+        дублируются в памяти.
+        Передается в Library как хранилище lib, см. параметр store. Строка
+        удаленной книги помечается статусом DELETED и не переиспользуется,
+        чтобы представления остальных книг не сдвигались.
+        """
+
+        self.titles = list()
+        self.title_keys = list()
+        self.authors = list()
+        self.ids = array('q')
+        self.statuses = array('b')
+        self.borrowers = list()
+        # Пока ID добавляются по возрастанию, строка находится двоичным поиском
+        # по колонке ids без словаря на каждую книгу. Строки книг, добавленных
+        # не по порядку, хранятся в словаре ID -> номер строки.
+        self.sorted_rows = 0
+        self.unordered = dict()
+        self.deleted = 0
+
+    def find_row(self, book_id: int) -> int | None:
+        """Находит номер строки книги по ID.
+        Args:
+            book_id (int): Уникальный идентификатор книги.
+        Returns:
+            int | None: Номер строки или None, если книги нет в хранилище.
+        """
+
+        row = bisect_left(self.ids, book_id, 0, self.sorted_rows)
+        if row < self.sorted_rows and self.ids[row] == book_id and self.statuses[row] != self.DELETED:
+            return row
+        return self.unordered.get(book_id)
+
+    def __len__(self) -> int:
+        return len(self.ids) - self.deleted
+
+    def __getitem__(self, book_id: int) -> 'BookView':
+        row = self.find_row(book_id)
+        if row is None:
+            raise KeyError(book_id)
+        return BookView(self, row)
+
+    def __contains__(self, book_id) -> bool:
+        return self.find_row(book_id) is not None
+
+    def __iter__(self):
+        for row, book_id in enumerate(self.ids):
+            if self.statuses[row] != self.DELETED:
+                yield book_id
+
+    def __setitem__(self, book_id: int, book) -> None:
+        if book_id in self:
+            del self[book_id]
+        self.add_book(book.title, book.author, book_id, book.status, book.borrower)
+
+    def __delitem__(self, book_id: int) -> None:
+        row = self.find_row(book_id)
+        if row is None:
+            raise KeyError(book_id)
+        self.unordered.pop(book_id, None)
+        self.statuses[row] = self.DELETED
+        self.borrowers[row] = None
+        self.deleted += 1
+
+    def add_book(self, title: str, author: str, id: int, status: bool = True, borrower=None) -> 'BookView':
+        """Добавляет книгу в хранилище.
+        Args:
+            title (str): Строка с названием книги.
+            author (str): Строка с ФИО автора.
+            id (int): Уникальный идентификатор книги.
+            status (bool, optional): True - книга в наличии. Defaults to True.
+            borrower (Reader | None, optional): Читатель, у которого книга. Defaults to None.
+        Returns:
+            BookView: Представление добавленной книги.
+        """
+
+        row = len(self.ids)
+        if self.sorted_rows == row and (not row or id > self.ids[-1]):
+            self.sorted_rows += 1
+        else:
+            self.unordered[id] = row
+
+        self.titles.append(sys.intern(title))
+        self.title_keys.append(sys.intern(normalize(title)))
+        self.authors.append(sys.intern(author))
+        self.ids.append(id)
+        self.statuses.append(1 if status else 0)
+        self.borrowers.append(borrower)
+        return BookView(self, row)
+
+
+class BookView:
+    __slots__ = ('store', 'row')
+
+    def __init__(self, store: BookStore, row: int) -> None:
+        """Инициализирует представление одной строки хранилища BookStore.\n
+        Предоставляет те же атрибуты, что и класс Book. Хранилище создает
+        представление при каждом обращении, поэтому представления одной
+        строки равны и имеют один хеш: их можно использовать как ключи
+        словаря вместо одного объекта книги.
+        Args:
+            store (BookStore): Хранилище книг.
+            row (int): Номер строки книги в хранилище.
+        """
+
+        self.store = store
+        self.row = row
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, BookView) and other.store is self.store and other.row == self.row
+
+    def __hash__(self) -> int:
+        return hash(self.row)
+
+    @property
+    def title(self) -> str:
+        return self.store.titles[self.row]
+
+    @property
+    def title_key(self) -> str:
+        return self.store.title_keys[self.row]
+
+    @property
+    def author(self) -> str:
+        return self.store.authors[self.row]
+
+    @property
+    def id(self) -> int:
+        return self.store.ids[self.row]
+
+    @property
+    def status(self) -> bool:
+        return bool(self.store.statuses[self.row])
+
+    @status.setter
+    def status(self, value: bool) -> None:
+        self.store.statuses[self.row] = 1 if value else 0
+
+    @property
+    def borrower(self):
+        return self.store.borrowers[self.row]
+
+    @borrower.setter
+    def borrower(self, value) -> None:
+        self.store.borrowers[self.row] = value
+
+    __str__ = Book.__str__
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Вычисляет расстояние Левенштейна между строками, считая перестановку
+    двух соседних букв одной опечаткой.\n
+    Подсчет прерывается, как только расстояние превысит limit.
+    Args:
+        a (str): Первая строка.
+        b (str): Вторая строка.
+        limit (int): Наибольшее интересующее расстояние.
+    Returns:
+        int: Расстояние, но не больше limit + 1.
+    """
+
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    before = None
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            distance = min(previous[j] + 1, current[-1] + 1,
+                           previous[j - 1] + (char_a != char_b))
+            if before is not None and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                distance = min(distance, before[j - 2] + 1)
+            current.append(distance)
+        if min(current) > limit and min(previous) >= limit:
+            return limit + 1
+        before, previous = previous, current
+
+    return min(previous[-1], limit + 1)
+
+
+class FuzzyIndex:
+
+    def __init__(self, max_distance: int = 2) -> None:
+        """Индекс нечеткого поиска по словам названий и авторов.\n
+        Для каждого слова словаря заранее сохраняются все варианты с
+        удаленными буквами (до max_distance штук). Слово запроса с
+        опечатками находится через общие варианты удалений, а не перебором
+        всего словаря, поэтому время поиска не зависит от размера каталога.
+        Удаленные из библиотеки ключи не вычищаются - Library пропускает
+        ключи, которых уже нет в индексах.
+        Args:
+            max_distance (int, optional): Наибольшее число опечаток в слове. Defaults to 2.
+        """
+
+        self.max_distance = max_distance
+        # Слово -> ключи (названия и авторы), в которых оно встречается.
+        self.words = dict()
+        # Вариант слова с удаленными буквами -> слова словаря.
+        self.deletes = dict()
+
+    def get_deletes(self, word: str, distance: int) -> set:
+        """Возвращает слово и все его варианты без distance или меньше букв."""
+
+        variants = {word}
+        edge = {word}
+        for _ in range(distance):
+            edge = {w[:i] + w[i + 1:] for w in edge for i in range(len(w))}
+            variants |= edge
+        return variants
+
+    def get_word_distance(self, word: str) -> int:
+        """Допустимое число опечаток: в словах короче 4 букв - ни одной,
+        до 8 букв - одна, в длинных словах - max_distance."""
+
+        return min(self.max_distance, len(word) // 4)
+
+    def add(self, key: str) -> None:
+        """Добавляет нормализованный ключ (название книги или имя автора) в индекс."""
+
+        for word in set(key.split()):
+            keys = self.words.get(word)
+            if keys is None:
+                self.words[word] = {key: None}
+                for variant in self.get_deletes(word, self.max_distance):
+                    self.deletes.setdefault(variant, []).append(word)
+            else:
+                keys[key] = None
+
+    def match_word(self, token: str) -> dict:
+        """Находит слова словаря, похожие на слово запроса.
+        Args:
+            token (str): Нормализованное слово запроса.
+        Returns:
+            dict: Словарь слово -> число опечаток.
+        """
+
+        distance = self.get_word_distance(token)
+        found = dict()
+        for variant in self.get_deletes(token, distance):
+            for word in self.deletes.get(variant, ()):
+                if word not in found:
+                    found[word] = edit_distance(token, word, distance)
+        return {word: d for word, d in found.items() if d <= distance}
+
+    def search(self, prompt: str) -> dict:
+        """Находит ключи, в которых для каждого слова запроса есть похожее слово.
+        Args:
+            prompt (str): Нормализованная строка запроса.
+        Returns:
+            dict: Словарь ключ -> суммарное число опечаток.
+        """
+
+        matches = [self.match_word(token) for token in prompt.split()]
+        if not matches:
+            return {}
+
+        # Кандидаты берутся по самому редкому слову запроса, остальные только проверяются.
+        matches.sort(key=lambda words: sum(len(self.words[word]) for word in words))
+        scores = dict()
+        for word, distance in matches[0].items():
+            for key in self.words[word]:
+                if distance < scores.get(key, distance + 1):
+                    scores[key] = distance
+
+        for words in matches[1:]:
+            for key in list(scores):
+                best = min((distance for word, distance in words.items() if key in self.words[word]), default=None)
+                if best is None:
+                    del scores[key]
+                else:
+                    scores[key] += best
+
+        return scores
+
+
+class PrefixIndex:
+
+    def __init__(self, items=()) -> None:
+        """Индекс автодополнения: отсортированный массив нормализованных ключей.\n
+        Ключи с нужным префиксом лежат в массиве подряд, поэтому поиск - это
+        двоичный поиск начала диапазона и чтение k ключей, без перебора.
+        Добавленные и удаленные ключи копятся в added и removed и попадают в
+        массив одним слиянием при следующем поиске: пакет из k изменений
+        стоит O(n + k log k), тогда как вставка каждого ключа в середину
+        массива сдвигает его хвост, и загрузка каталога обходится в O(n²).
+        Поиск идет из нескольких потоков, поэтому слияние защищено
+        блокировкой, а массив после слияния заменяется новым, а не меняется.
+        Args:
+            items (Iterable[tuple], optional): Пары (ключ, написание для подсказки). Defaults to ().
+        """
+
+        # Нормализованный ключ -> написание, которое показывается в подсказке.
+        self.labels = dict(items)
+        self.keys = sorted(self.labels)
+        # Ключи, которых еще нет в keys, словарь как упорядоченное множество.
+        self.added = dict()
+        # Ключи, которые еще лежат в keys, но уже удалены.
+        self.removed = set()
+        self.lock = Lock()
+
+    def __getstate__(self) -> dict:
+        self.merge()
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def add(self, key: str, label: str) -> None:
+        """Добавляет ключ в индекс, если его там еще нет."""
+
+        with self.lock:
+            if key not in self.labels:
+                self.labels[key] = label
+                if key in self.removed:
+                    self.removed.discard(key)
+                else:
+                    self.added[key] = None
+
+    def remove(self, key: str) -> None:
+        """Удаляет ключ из индекса."""
+
+        with self.lock:
+            if self.labels.pop(key, None) is None:
+                return
+            if key in self.added:
+                del self.added[key]
+            else:
+                self.removed.add(key)
+
+    def merge(self) -> list:
+        """Вливает накопленные изменения в массив ключей.
+        Returns:
+            list: Отсортированный массив ключей.
+        """
+
+        with self.lock:
+            if self.added or self.removed:
+                if self.removed:
+                    keys = [key for key in self.keys if key not in self.removed]
+                else:
+                    keys = self.keys.copy()
+                # Два отсортированных участка: Timsort сливает их за линейное время.
+                keys.extend(sorted(self.added))
+                keys.sort()
+                self.keys = keys
+                self.added = dict()
+                self.removed = set()
+            return self.keys
+
+    def complete(self, prefix: str, limit: int = 10) -> list:
+        """Находит ключи, начинающиеся с prefix, в алфавитном порядке.
+        Args:
+            prefix (str): Нормализованное начало ключа.
+            limit (int, optional): Наибольшее количество ключей. Defaults to 10.
+        Returns:
+            list: Написания найденных ключей для подсказки.
+        """
+
+        keys = self.merge()
+        start = bisect_left(keys, prefix)
+        found = list()
+
+        for key in keys[start:start + limit]:
+            if not key.startswith(prefix):
+                break
+            found.append(self.labels[key])
+
+        return found
+
+
+class SearchCache:
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None, clock=time.monotonic) -> None:
+        """LRU-кэш результатов поиска с необязательным временем жизни записей.\n
+        При переполнении вытесняется запись, к которой дольше всего не
+        обращались. Записи удаляет и сама библиотека - только те, на которые
+        повлияло изменение каталога. Поиск в AsyncLibrary идет из нескольких
+        потоков, поэтому операции защищены блокировкой.
+        Args:
+            maxsize (int, optional): Наибольшее количество записей, 0 - кэш выключен. Defaults to 1024.
+            ttl (float | None, optional): Время жизни записи в секундах. Defaults to None - без ограничения.
+            clock (Callable, optional): Источник времени. Defaults to time.monotonic.
+        """
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        # Ключ запроса -> (момент устаревания или None, результат).
+        self.entries = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.lock = Lock()
+
+    def get(self, key: str):
+        """Возвращает результат из кэша или None, если его нет или он устарел."""
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] is not None and self.clock() >= entry[0]:
+                del self.entries[key]
+                self.evictions += 1
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, result) -> None:
+        """Сохраняет результат, вытесняя самую старую запись при переполнении."""
+
+        if self.maxsize <= 0:
+            return
+
+        expires = None if self.ttl is None else self.clock() + self.ttl
+        with self.lock:
+            self.entries[key] = (expires, result)
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: str) -> None:
+        """Удаляет запись, результат которой изменился."""
+
+        with self.lock:
+            if self.entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def get_stats(self) -> CacheStats:
+        return CacheStats(self.hits, self.misses, self.evictions, self.invalidations, len(self.entries))
+
+
+class FenwickTree:
+
+    def __init__(self) -> None:
+        """Дерево Фенвика над растущим массивом чисел: добавление к элементу,
+        сумма префикса и дописывание элемента в конец за O(log n).
+        Элементы нумеруются с 1.
+        """
+
+        self.tree = [0]
+
+    def __len__(self) -> int:
+        return len(self.tree) - 1
+
+    def append(self, value: int) -> None:
+        """Дописывает элемент в конец массива."""
+
+        i = len(self.tree)
+        # Узел i хранит сумму элементов (i - lowbit(i), i], все они, кроме нового, уже есть.
+        self.tree.append(value + self.prefix(i - 1) - self.prefix(i - (i & -i)))
+
+    def add(self, i: int, delta: int) -> None:
+        """Прибавляет delta к элементу номер i."""
+
+        tree = self.tree
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def prefix(self, i: int) -> int:
+        """Возвращает сумму элементов с 1 по i."""
+
+        tree = self.tree
+        total = 0
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+
+class HoldQueue:
+
+    COMPACT_AT = 1024
+
+    def __init__(self) -> None:
+        """Очередь бронирования одного названия.\n
+        Брони упорядочены по убыванию приоритета, а внутри приоритета - по
+        времени постановки. Запись брони - (-приоритет, номер, ID читателя),
+        где номер - порядковый номер постановки внутри приоритета. Читатели,
+        которым можно выдавать книгу, лежат в min-куче heap, а читатели,
+        которых выдача застала на лимите, - в parked. Снятая бронь остается
+        в куче, пока не окажется на вершине, и тогда отбрасывается.
+        Для каждого приоритета ведется дерево Фенвика по номерам постановки,
+        где живой брони соответствует 1: место читателя - это число броней с
+        большим приоритетом плюс сумма префикса дерева до его номера.
+        Постановка, снятие брони, unpark и выдача из головы стоят O(log n),
+        место в очереди - O(log n + P), где P - число разных приоритетов.
+        Когда снятых броней в деревьях или куче становится больше живых,
+        очередь перестраивается заново, что в среднем тоже O(log n) на операцию.
+        """
+
+        self.heap = []
+        self.parked = set()
+        # ID читателя -> запись брони.
+        self.keys = dict()
+        # Приоритет -> дерево Фенвика по номерам постановки и число живых броней.
+        self.levels = dict()
+        self.level_sizes = dict()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, reader_id: int) -> bool:
+        return reader_id in self.keys
+
+    def push(self, reader_id: int, priority: int = 0, parked: bool = False) -> None:
+        """Ставит читателя в конец его приоритета.
+        Args:
+            reader_id (int): Уникальный идентификатор читателя.
+            priority (int, optional): Приоритет, больший обслуживается раньше. Defaults to 0.
+            parked (bool, optional): Читатель на лимите, как после peek_eligible. Defaults to False.
+        """
+
+        tree = self.levels.get(priority)
+        if tree is None:
+            tree = self.levels[priority] = FenwickTree()
+        tree.append(1)
+        self.level_sizes[priority] = self.level_sizes.get(priority, 0) + 1
+
+        entry = self.keys[reader_id] = (-priority, len(tree), reader_id)
+        if parked:
+            self.parked.add(reader_id)
+        else:
+            heapq.heappush(self.heap, entry)
+        self.compact_if_needed()
+
+    def is_live(self, entry: tuple) -> bool:
+        """Проверяет, что запись из кучи - действующая бронь читателя не на лимите."""
+
+        reader_id = entry[2]
+        return self.keys.get(reader_id) == entry and reader_id not in self.parked
+
+    def remove(self, reader_id: int) -> None:
+        """Снимает бронь читателя, сохраняя порядок остальных."""
+
+        entry = self.keys.pop(reader_id)
+        self.parked.discard(reader_id)
+        priority = -entry[0]
+        self.levels[priority].add(entry[1], -1)
+        self.level_sizes[priority] -= 1
+        self.compact_if_needed()
+
+    def compact_if_needed(self) -> None:
+        """Перестраивает очередь, если снятые брони занимают больше места, чем живые."""
+
+        slots = max(len(self.heap), sum(len(tree) for tree in self.levels.values()))
+        if slots >= self.COMPACT_AT and slots >= 2 * len(self.keys):
+            self.compact()
+
+    def compact(self) -> None:
+        """Перенумеровывает живые брони подряд и строит кучу и деревья заново."""
+
+        entries = sorted(self.keys.values())
+        self.heap = []
+        self.keys = dict()
+        self.levels = dict()
+        self.level_sizes = dict()
+        parked = self.parked
+        self.parked = set()
+        for priority, _, reader_id in entries:
+            self.push(reader_id, -priority, reader_id in parked)
+
+    def unpark(self, reader_id: int) -> None:
+        """Возвращает читателя из parked к тем, кому можно выдавать книгу.
+        Вызывается, когда у читателя освободилось место под книгу.
+        """
+
+        if reader_id in self.parked:
+            self.parked.discard(reader_id)
+            heapq.heappush(self.heap, self.keys[reader_id])
+
+    def get_position(self, reader_id: int) -> int | None:
+        """Возвращает место читателя в очереди начиная с 1 или None, если брони нет."""
+
+        entry = self.keys.get(reader_id)
+        if entry is None:
+            return None
+        priority = -entry[0]
+        ahead = sum(size for level, size in self.level_sizes.items() if level > priority)
+        return ahead + self.levels[priority].prefix(entry[1])
+
+    def peek_eligible(self, is_eligible) -> int | None:
+        """Возвращает первого читателя, которому можно выдать книгу, не снимая бронь.\n
+        Читатели из головы, для которых is_eligible ложно, переносятся в
+        parked со своим местом в очереди и больше не проверяются, пока их
+        не вернет unpark. Поэтому каждая бронь проверяется впустую не чаще
+        одного раза на каждое освобождение места у читателя.
+        Args:
+            is_eligible (Callable): Проверка ID читателя, например лимита выдачи.
+        Returns:
+            int | None: ID читателя или None, если подходящих нет.
+        """
+
+        heap = self.heap
+        while heap:
+            entry = heap[0]
+            if not self.is_live(entry):
+                heapq.heappop(heap)
+            elif is_eligible(entry[2]):
+                return entry[2]
+            else:
+                heapq.heappop(heap)
+                self.parked.add(entry[2])
+        return None
+
+    def pop_eligible(self, is_eligible) -> int | None:
+        """Снимает с очереди первого читателя, которому можно выдать книгу.
+        Args:
+            is_eligible (Callable): Проверка ID читателя, например лимита выдачи.
+        Returns:
+            int | None: ID читателя или None, если подходящих нет.
+        """
+
+        reader_id = self.peek_eligible(is_eligible)
+        if reader_id is not None:
+            heapq.heappop(self.heap)
+            self.remove(reader_id)
+        return reader_id
+
+
+#######################################################################
+
+
+class Library:
+
+    def __init__(self, limit: int, cache_size: int = 1024, cache_ttl: float | None = None,
+                 loan_days: int = 14, fine_per_day: int = 10, clock=time.time, store: bool = False) -> None:
+        """Инициализирует объект класса библиотека.
+        Args:
+            limit (int): Число определяющее максимальное количество книг
+        которые читатель может взять.
+            cache_size (int, optional): Размер кэша результатов search_book, 0 - без кэша. Defaults to 1024.
+            cache_ttl (float | None, optional): Время жизни результата в кэше в секундах. Defaults to None.
+            loan_days (int, optional): Срок выдачи книги в днях. Defaults to 14.
+            fine_per_day (int, optional): Штраф за каждый начатый день просрочки. Defaults to 10.
+            clock (Callable, optional): Источник времени выдач в секундах. Defaults to time.time.
+            store (bool, optional): True - хранить книги в колоночном BookStore
+        вместо словаря объектов Book. Defaults to False.
+        """
+
+        self.search_cache = SearchCache(cache_size, cache_ttl)
+        self.lib = BookStore() if store else dict()
+        self.readers = dict()
+        self.borrow_history = set()
+        self.rental_limit = limit
+        self.index_books_by_title = dict()
+        self.index_books_by_author = dict()
+        self.index_books_by_reader = dict()
+        self.index_readers_by_name = dict()
+        # Пулы свободных экземпляров: нормализованное название -> куча ID книг в наличии.
+        # Пул названия строится при первой выдаче, см. get_free_copies.
+        self.index_free_copies = dict()
+        # Выданные или удаленные экземпляры, которые еще лежат в куче пула:
+        # название -> множество ID. Они снимаются, когда доходят до вершины.
+        self.stale_free_copies = dict()
+        # Очереди бронирования: нормализованное название -> HoldQueue,
+        # и брони читателя: ID читателя -> словарь названий.
+        self.hold_queues = dict()
+        self.holds_by_reader = dict()
+        self.loan_period = loan_days * DAY
+        self.fine_per_day = fine_per_day
+        self.clock = clock
+        # Открытые выдачи по ID книги и индекс сроков: отсортированный список пар
+        # (срок возврата, ID книги), load_snapshot строит его сортировкой. Срок
+        # новой выдачи может оказаться раньше открытых, если loan_period
+        # уменьшили или часы отстали, поэтому open_loan вставляет пару через
+        # insort, а не дописывает в конец.
+        self.loans = dict()
+        self.due_index = []
+        # Начисленные при возврате штрафы: ID читателя -> сумма.
+        self.fines = dict()
+        self.loan_history = LoanHistory()
+        # Индексы, которые будут построены при первом обращении к ним.
+        # Построитель удаляется только после того, как индекс сохранен в
+        # атрибут, а построение идет под lazy_lock: поток, обратившийся к
+        # индексу во время построения, дождется его, а не получит AttributeError.
+        # RLock, потому что построитель может обратиться к другому отложенному индексу.
+        self.lazy_lock = RLock()
+        self.lazy_indexes = self.default_lazy_indexes()
+
+    def default_lazy_indexes(self) -> dict:
+        """Возвращает построители индексов, которые всегда строятся при первом обращении.
+        Returns:
+            dict: Имя индекса -> функция без аргументов, возвращающая индекс.
+        """
+
+        return {
+            'index_fuzzy': self.build_fuzzy_index,
+            'index_prefix_by_title': lambda: self.build_prefix_index(self.index_books_by_title, 'title'),
+            'index_prefix_by_author': lambda: self.build_prefix_index(self.index_books_by_author, 'author'),
+            'index_sorted_ids': lambda: sorted(self.lib),
+            'index_sorted_by_author': lambda: {key: sorted(book_ids) for key, book_ids in self.index_books_by_author.items()},
+            'index_sorted_by_reader': lambda: {reader_id: sorted(book_ids)
+                                               for reader_id, book_ids in self.index_books_by_reader.items()},
+            'index_prefix_by_reader': lambda: PrefixIndex(
+                (key, self.readers[reader_id].name) for key, reader_id in self.index_readers_by_name.items()),
+        }
+
+    def __getattr__(self, name: str):
+        """Строит отложенный индекс из lazy_indexes при первом обращении к нему.
+        Args:
+            name (str): Имя атрибута, например index_books_by_title.
+        Raises:
+            AttributeError: Если атрибута нет и он не является отложенным индексом.
+        """
+
+        lazy_indexes = self.__dict__.get('lazy_indexes', {})
+
+        if name in lazy_indexes:
+            with self.lazy_lock:
+                index = self.__dict__.get(name)
+                if index is None:
+                    index = lazy_indexes[name]()
+                    setattr(self, name, index)
+                    del lazy_indexes[name]
+                return index
+
+        # Индекс мог достроить другой поток между обычным поиском атрибута и проверкой выше.
+        if name in self.__dict__:
+            return self.__dict__[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def __getstate__(self) -> dict:
+        """Готовит библиотеку к pickle: функции-построители и блокировку не
+        сохраняет, книги снимка переводит в обычный словарь.\n
+        Непостроенные индексы из default_lazy_indexes не сохраняются -
+        __setstate__ снова откладывает их построение. Остальные отложенные
+        индексы (индексы снимка) строятся, так как их построители читают
+        снимок, который в pickle не попадает.
+        """
+
+        defaults = self.default_lazy_indexes()
+        for name in list(self.lazy_indexes):
+            if name not in defaults:
+                getattr(self, name)
+
+        state = self.__dict__.copy()
+        del state['lazy_lock'], state['lazy_indexes']
+        if type(self.lib) not in (dict, BookStore):
+            state['lib'] = dict(self.lib)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.lazy_lock = RLock()
+        self.lazy_indexes = {name: build for name, build in self.default_lazy_indexes().items()
+                             if name not in state}
+
+    def build_fuzzy_index(self) -> FuzzyIndex:
+        """Строит индекс нечеткого поиска по названиям и авторам."""
+
+        index = FuzzyIndex()
+        for key in self.index_books_by_title:
+            index.add(key)
+        for key in self.index_books_by_author:
+            index.add(key)
+        return index
+
+    def build_prefix_index(self, index: dict, attribute: str) -> PrefixIndex:
+        """Строит индекс автодополнения по ключам многозначного индекса книг.
+        Подсказкой служит написание у первой книги с этим ключом.
+        Args:
+            index (dict): Словарь указатель, например index_books_by_title.
+            attribute (str): Атрибут книги с написанием: title или author.
+        """
+
+        return PrefixIndex((key, getattr(self.lib[next(iter(book_ids))], attribute))
+                           for key, book_ids in index.items())
+
+    def update_lazy_index(self, name: str, *args: str) -> None:
+        """Дополняет отложенный индекс, только если он уже построен.
+        Args:
+            name (str): Имя индекса, например index_fuzzy.
+            args (str): Аргументы метода add индекса.
+        """
+
+        index = self.__dict__.get(name)
+        if index is not None:
+            index.add(*args)
+
+    def update_sorted_index(self, name: str, key, book_id: int, add: bool) -> None:
+        """Вставляет ID книги в отсортированный список ключа отложенного индекса
+        или удаляет его оттуда, только если индекс уже построен. Пустой
+        список удаляется вместе с ключом.
+        Args:
+            name (str): Имя индекса, например index_sorted_by_author.
+            key (str | int): Ключ индекса: имя автора или ID читателя.
+            book_id (int): Уникальный идентификатор книги.
+            add (bool): True - вставить ID, False - удалить.
+        """
+
+        index = self.__dict__.get(name)
+        if index is None:
+            return
+        if add:
+            insort(index.setdefault(key, []), book_id)
+            return
+        book_ids = index[key]
+        del book_ids[bisect_left(book_ids, book_id)]
+        if not book_ids:
+            del index[key]
+
+    def add_in_index(self, index: dict, key: str, book_id: int) -> None:
+        """Добавляет ID книги в многозначный индекс по ключу.\n
+        Значением ключа всегда является словарь ID книг, используемый как
+        упорядоченное множество, поэтому тип значения не зависит от
+        количества книг.
+        Args:
+            index (dict): Словарь указатель, например index_books_by_author.
+            key (str): Ключ индекса: нормализованное название книги или имя автора.
+            book_id (int): Уникальный идентификатор книги.
+        """
+
+        book_ids = index.get(key)
+
+        if book_ids is None:
+            index[key] = {book_id: None}
+        else:
+            book_ids[book_id] = None
+
+    def remove_from_index(self, index: dict, key: str, book_id: int) -> None:
+        """Удаляет ID книги из многозначного индекса. Ключ без книг удаляется.
+        Args:
+            index (dict): Словарь указатель, например index_books_by_author.
+            key (str): Ключ индекса: нормализованное название книги или имя автора.
+            book_id (int): Уникальный идентификатор книги.
+        """
+
+        book_ids = index.get(key)
+
+        if book_ids is not None:
+            book_ids.pop(book_id, None)
+            if not book_ids:
+                del index[key]
+
+    def get_free_copies(self, title_key: str) -> list:
+        """Возвращает пул свободных экземпляров названия, строя его при первом обращении.\n
+        Пул - это min-куча ID книг в наличии: выдается экземпляр с
+        наименьшим ID за O(log n), поэтому выбор экземпляра зависит только
+        от состояния библиотеки и повторяется при воспроизведении журнала.
+        Выданные экземпляры не из вершины остаются в куче до тех пор, пока
+        не окажутся наверху (см. update_free_copies), поэтому вершина
+        возвращаемой кучи всегда свободна, а количество свободных - это
+        длина кучи без stale_free_copies.
+        Args:
+            title_key (str): Нормализованное название книги.
+        Returns:
+            list: Куча ID свободных экземпляров, пустая если их нет.
+        """
+
+        free = self.index_free_copies.get(title_key)
+        if free is None:
+            book_ids = self.index_books_by_title.get(title_key, ())
+            free = self.index_free_copies[title_key] = [i for i in book_ids if self.lib[i].status]
+            heapq.heapify(free)
+            return free
+
+        stale = self.stale_free_copies.get(title_key)
+        if stale:
+            while free and free[0] in stale:
+                stale.discard(heapq.heappop(free))
+            if not stale:
+                del self.stale_free_copies[title_key]
+        return free
+
+    def update_free_copies(self, title_key: str, book_id: int, free: bool) -> None:
+        """Добавляет экземпляр в пул свободных или изымает из него, если пул уже построен.
+        Args:
+            title_key (str): Нормализованное название книги.
+            book_id (int): Уникальный идентификатор книги.
+            free (bool): True - экземпляр в наличии, False - выдан или удален.
+        """
+
+        pool = self.index_free_copies.get(title_key)
+        if pool is None:
+            return
+
+        stale = self.stale_free_copies.get(title_key, ())
+        if free and book_id in stale:
+            # Экземпляр еще лежит в куче: достаточно снять пометку.
+            stale.discard(book_id)
+            if not stale:
+                del self.stale_free_copies[title_key]
+        elif free:
+            heapq.heappush(pool, book_id)
+        elif pool[0] == book_id:
+            heapq.heappop(pool)
+        else:
+            # Ленивое удаление: поиск и heapify стоили бы O(n), а помеченный
+            # ID снимет get_free_copies, когда он окажется на вершине.
+            self.stale_free_copies.setdefault(title_key, set()).add(book_id)
+
+    def get_availability(self, title: str) -> Availability:
+        """Возвращает количество экземпляров книги всего и в наличии.
+        Args:
+            title (str): Строка с названием книги.
+        Returns:
+            Availability: Счетчики экземпляров, нули если книги нет.
+        """
+
+        title_key = normalize(title)
+        book_ids = self.index_books_by_title.get(title_key)
+
+        if book_ids is None:
+            return Availability(0, 0)
+
+        free = self.get_free_copies(title_key)
+        return Availability(len(book_ids), len(free) - len(self.stale_free_copies.get(title_key, ())))
+
+    def is_within_limit(self, reader_id: int) -> bool:
+        return len(self.readers[reader_id].borrowed_books) < self.rental_limit
+
+    def forget_hold(self, title_key: str, reader_id: int) -> None:
+        """Убирает снятую с очереди бронь из броней читателя и удаляет опустевшую очередь."""
+
+        titles = self.holds_by_reader[reader_id]
+        del titles[title_key]
+        if not titles:
+            del self.holds_by_reader[reader_id]
+        if not self.hold_queues[title_key]:
+            del self.hold_queues[title_key]
+
+    def is_reserved(self, title_key: str, reader_id: int) -> bool:
+        """Проверяет, отложены ли свободные экземпляры названия для другого
+        читателя из очереди бронирования, которому уже можно выдать книгу."""
+
+        queue = self.hold_queues.get(title_key)
+        if not queue:
+            return False
+        holder_id = queue.peek_eligible(self.is_within_limit)
+        return holder_id is not None and holder_id != reader_id
+
+    def fulfil_hold(self, title_key: str) -> Book | None:
+        """Выдает свободный экземпляр названия первому подходящему читателю из очереди бронирования.\n
+        Вызывается на каждый освободившийся экземпляр и выдает не больше
+        одной книги, поэтому каждая выдача по брони попадает в Result.handoffs
+        своей операции. Читатели, достигшие лимита, остаются в очереди на
+        своем месте, а fulfil_reader_holds снова предлагает им книги, когда
+        у них освобождается место.
+        Args:
+            title_key (str): Нормализованное название книги.
+        Returns:
+            Book | None: Выданная книга или None.
+        """
+
+        queue = self.hold_queues.get(title_key)
+        if not queue:
+            return None
+
+        free = self.get_free_copies(title_key)
+        reader_id = queue.pop_eligible(self.is_within_limit) if free else None
+        if reader_id is None:
+            return None
+
+        self.forget_hold(title_key, reader_id)
+        book = self.lib[free[0]]
+        self.apply_borrow(book, self.readers[reader_id])
+        return book
+
+    def fulfil_reader_holds(self, reader: Reader) -> list:
+        """Выдает читателю, у которого освободилось место, свободные экземпляры
+        забронированных им названий.\n
+        Пока читатель был на лимите, очереди его пропускали, и свободный
+        экземпляр мог остаться на полке. Поэтому после каждого возврата
+        читатель возвращается в очереди своих броней и получает книги, пока
+        не достигнет лимита.
+        Args:
+            reader (Reader): Экземпляр класса Reader.
+        Returns:
+            list: Книги, выданные по брони.
+        """
+
+        books = []
+        for title_key in list(self.holds_by_reader.get(reader.id, ())):
+            if not self.is_within_limit(reader.id):
+                break
+            self.hold_queues[title_key].unpark(reader.id)
+            book = self.fulfil_hold(title_key)
+            if book is not None:
+                books.append(book)
+        return books
+
+    def fulfil_after_return(self, title_key: str, reader: Reader) -> tuple:
+        """Раздает по брони то, что освободил возврат: экземпляр названия и место читателя.
+        Args:
+            title_key (str): Нормализованное название возвращенной книги.
+            reader (Reader): Читатель, вернувший книгу.
+        Returns:
+            tuple: Читатель, получивший экземпляр названия, или None и кортеж выданных по брони книг.
+        """
+
+        book = self.fulfil_hold(title_key)
+        handoffs = [] if book is None else [book]
+        handoffs.extend(self.fulfil_reader_holds(reader))
+        return None if book is None else book.borrower, tuple(handoffs)
+
+    def get_reader_history(self, reader: str, start: int | None = None, end: int | None = None) -> list:
+        """Возвращает выдачи и возвраты читателя в промежутке времени [start, end).
+        Args:
+            reader (str): Строка с именем читателя.
+            start (int | None, optional): Начало промежутка в секундах. Defaults to None - с начала.
+            end (int | None, optional): Конец промежутка в секундах. Defaults to None - до конца.
+        Returns:
+            list: Список LoanEvent по времени, пустой если читателя нет.
+        """
+
+        reader_id = self.index_readers_by_name.get(normalize(reader))
+        if reader_id is None:
+            return []
+        return self.loan_history.get_reader_events(reader_id, start, end)
+
+    def get_book_history(self, book_id: int, start: int | None = None, end: int | None = None) -> list:
+        """Возвращает историю выдач книги в промежутке времени [start, end).
+        Args:
+            book_id (int): Уникальный идентификатор книги.
+            start (int | None, optional): Начало промежутка в секундах. Defaults to None - с начала.
+            end (int | None, optional): Конец промежутка в секундах. Defaults to None - до конца.
+        Returns:
+            list: Список LoanEvent по времени.
+        """
+
+        return self.loan_history.get_book_events(book_id, start, end)
+
+    def find_books_by_title(self, title: str) -> list:
+        """Находит все книги с указанным названием.
+        Args:
+            title (str): Строка с название книги.
+        Raises:
+            LookupError: Возбуждает исключение если название не найдено в индексе index_books_by_title.
+        Returns:
+            list: Список объектов класса Book в порядке регистрации.
+        """
+
+        book_ids = self.index_books_by_title.get(normalize(title))
+
+        if book_ids is None:
+            raise LookupError(f'ОТМЕНА: ID книги "{
+                              title}" не найден в индексе: index_books_by_title')
+        else:
+            return [self.lib[book_id] for book_id in book_ids]
+
+    def find_book_by_title(self, title: str) -> Book:
+        """Находит первую зарегистрированную книгу с указанным названием.
+        Args:
+            title (str): Строка с название книги.
+        Raises:
+            LookupError: Возбуждает исключение если ID книги не найден в индексе index_books_by_title.
+        Returns:
+            Book: Объект класса Book.
+        """
+
+        book_ids = self.index_books_by_title.get(normalize(title))
+
+        if book_ids is None:
+            raise LookupError(f'ОТМЕНА: ID книги "{
+                              title}" не найден в индексе: index_books_by_title')
+        else:
+            return self.lib[next(iter(book_ids))]
+
+    def find_books_by_author(self, author: str) -> list:
+        """Находит все книги указанного автора.
+        Args:
+            author (str): Строка с именем автора.
+        Raises:
+            LookupError: Возбуждает исключение если ID книги не найден в индексе index_books_by_author.
+        Returns:
+            list: Список объектов класса Book в порядке регистрации.
+        """
+
+        book_ids = self.index_books_by_author.get(normalize(author))
+
+        if book_ids is None:
+            raise LookupError(f'ОТМЕНА: ID книги "{
+                              author}" не найден в индексе: index_books_by_author')
+        else:
+            return [self.lib[book_id] for book_id in book_ids]
+
+    def find_reader_by_name(self, name: str) -> Reader:
+        """Находит объект читателя в основном словаре читателей библиотеки.
+        Args:
+            name (str): Строка с именем читателя.
+        Raises:
+            LookupError: Возбуждает исключение если ID читателя не найден в индексе index_readers_by_name.
+        Returns:
+            Reader: Объект класса Reader.
+        """
+
+        reader_id = self.index_readers_by_name.get(normalize(name))
+
+        if reader_id is None:
+            raise LookupError(f'ОТМЕНА: ID читателя по имени "{
+                              name}" не найден в индексе: index_readers_by_name')
+        else:
+            return self.readers[reader_id]
+
+    def find_books_by_reader(self, name: str) -> list:
+        """Находит все книги, выданные читателю на данный момент.
+        Args:
+            name (str): Строка с именем читателя.
+        Raises:
+            LookupError: Возбуждает исключение если ID читателя не найден в индексе index_readers_by_name.
+        Returns:
+            list: Список объектов класса Book в порядке выдачи.
+        """
+
+        current_reader = self.find_reader_by_name(name)
+        book_ids = self.index_books_by_reader.get(current_reader.id, ())
+        return [self.lib[book_id] for book_id in book_ids]
+
+    def find_reader_book_by_title(self, reader: Reader, title_key: str, exclude=()) -> Book | None:
+        """Находит среди книг, выданных читателю, книгу с указанным названием.\n
+        Перебираются только книги читателя, число которых ограничено rental_limit.
+        Args:
+            reader (Reader): Экземпляр класса Reader.
+            title_key (str): Нормализованное название книги.
+            exclude (Container, optional): ID книг, которые нужно пропустить.
+        Returns:
+            Book | None: Объект класса Book или None, если такой книги у читателя нет.
+        """
+
+        title_ids = self.index_books_by_title.get(title_key, ())
+        for book_id in self.index_books_by_reader.get(reader.id, ()):
+            if book_id in title_ids and book_id not in exclude:
+                return self.lib[book_id]
+        return None
+
+    def iter_outstanding_loans(self):
+        """Перебирает все выданные на данный момент книги вместе с читателями.\n
+        Книги, находящиеся в библиотеке, не затрагиваются.
+        Returns:
+            Iterator[tuple]: Итератор пар (Book, Reader).
+        """
+
+        for reader_id, book_ids in self.index_books_by_reader.items():
+            current_reader = self.readers[reader_id]
+            for book_id in book_ids:
+                yield self.lib[book_id], current_reader
+
+    def iter_books(self, after: int | None = None, status: bool | None = None,
+                   author: str | None = None, reader: str | None = None):
+        """Перебирает книги по возрастанию ID, начиная после курсора, не
+        собирая список всего каталога.\n
+        Источником служит самый узкий индекс: отсортированные ID книг
+        читателя (index_sorted_by_reader), автора (index_sorted_by_author)
+        или всех книг (index_sorted_ids). Начало страницы находится двоичным
+        поиском, остальные фильтры проверяются по ходу.
+        Args:
+            after (int | None, optional): ID последней книги предыдущей страницы. Defaults to None - с начала.
+            status (bool | None, optional): True - в наличии, False - выданные, None - все.
+            author (str | None, optional): Имя автора. Defaults to None - любой.
+            reader (str | None, optional): Имя читателя, у которого книга. Defaults to None - любой.
+        Returns:
+            Iterator[Book]: Итератор по книгам.
+        """
+
+        author_ids = None if author is None else self.index_books_by_author.get(normalize(author), {})
+
+        if reader is not None:
+            reader_id = self.index_readers_by_name.get(normalize(reader))
+            book_ids = self.index_sorted_by_reader.get(reader_id, ())
+        elif author_ids is not None:
+            book_ids = self.index_sorted_by_author.get(normalize(author), ())
+        else:
+            book_ids = self.index_sorted_ids
+
+        # Идем по номеру позиции: срез или islice прошли бы весь список до курсора.
+        position = 0 if after is None else bisect_right(book_ids, after)
+        while position < len(book_ids):
+            book_id = book_ids[position]
+            position += 1
+            book = self.lib[book_id]
+            if status is not None and book.status != status:
+                continue
+            if author_ids is not None and book_id not in author_ids:
+                continue
+            yield book
+
+    def get_page_books(self, after: int | None = None, size: int = 10, **filters) -> Page:
+        """Возвращает страницу книг по курсору.
+        Args:
+            after (int | None, optional): Курсор из предыдущей страницы. Defaults to None - первая страница.
+            size (int, optional): Количество книг на странице. Defaults to 10.
+            filters: Фильтры status, author, reader как в iter_books.
+        Returns:
+            Page: Книги страницы и курсор следующей страницы или None, если это последняя.
+        Raises:
+            ValueError: Если size меньше 1.
+        """
+
+        if size < 1:
+            raise ValueError(f'ОШИБКА: Размер страницы "{size}" должен быть не меньше 1.')
+
+        books = list(islice(self.iter_books(after, **filters), size))
+        return Page(books, books[-1].id if len(books) == size else None)
+
+    def add_book(self, book: Book | BookView) -> Result:
+        """Добавляет книгу в библиотеку.\n
+        Хранилище BookStore копирует книгу в свои колонки, поэтому дальше
+        используется и возвращается книга из хранилища.
+        Args:
+            book (Book | BookView): Экземпляр класса Book или представление BookView.
+        Returns:
+            Result: Результат процедуры регистрации книги.
+        """
+
+        if not isinstance(book, (Book, BookView)):
+            return Result(Status.NOT_A_BOOK)
+
+        if book.id in self.lib:
+            return Result(Status.BOOK_EXISTS, self.lib[book.id])
+
+        title_key = book.title_key
+        author_key = normalize(book.author)
+
+        self.lib[book.id] = book
+        book = self.lib[book.id]
+        self.add_in_index(self.index_books_by_title, title_key, book.id)
+        self.add_in_index(self.index_books_by_author, author_key, book.id)
+        self.update_sorted_index('index_sorted_by_author', author_key, book.id, True)
+        self.update_lazy_index('index_fuzzy', title_key)
+        self.update_lazy_index('index_fuzzy', author_key)
+        self.update_lazy_index('index_prefix_by_title', title_key, book.title)
+        self.update_lazy_index('index_prefix_by_author', author_key, book.author)
+        self.search_cache.invalidate(title_key)
+        self.search_cache.invalidate(author_key)
+        handoff = None
+        if book.status:
+            self.update_free_copies(title_key, book.id, True)
+            handoff = self.fulfil_hold(title_key)
+
+        sorted_ids = self.__dict__.get('index_sorted_ids')
+        if sorted_ids is not None:
+            insort(sorted_ids, book.id)
+        if handoff is None:
+            return Result(Status.OK, book)
+        return Result(Status.OK, book, holder=handoff.borrower, handoffs=(handoff,))
+
+    def remove_book(self, book_id: int) -> Result:
+        """Удаляет книгу из библиотеки и из всех индексов.
+        Args:
+            book_id (int): Уникальный идентификатор книги.
+        Returns:
+            Result: Результат процедуры удаления книги.
+        """
+
+        book = self.lib.get(book_id)
+
+        if book is None:
+            return Result(Status.BOOK_NOT_FOUND)
+
+        if not book.status:
+            return Result(Status.BOOK_UNAVAILABLE, book, book.borrower)
+
+        title_key = book.title_key
+        author_key = normalize(book.author)
+
+        del self.lib[book_id]
+        self.remove_from_index(self.index_books_by_title, title_key, book_id)
+        self.remove_from_index(self.index_books_by_author, author_key, book_id)
+        self.update_sorted_index('index_sorted_by_author', author_key, book_id, False)
+        self.search_cache.invalidate(title_key)
+        self.search_cache.invalidate(author_key)
+        self.update_free_copies(title_key, book_id, False)
+        if title_key not in self.index_books_by_title:
+            self.index_free_copies.pop(title_key, None)
+            self.stale_free_copies.pop(title_key, None)
+
+        sorted_ids = self.__dict__.get('index_sorted_ids')
+        if sorted_ids is not None:
+            del sorted_ids[bisect_left(sorted_ids, book_id)]
+
+        # Ключ пропадает из автодополнения вместе с последней книгой.
+        for name, index, key in (('index_prefix_by_title', self.index_books_by_title, title_key),
+                                 ('index_prefix_by_author', self.index_books_by_author, author_key)):
+            prefix_index = self.__dict__.get(name)
+            if prefix_index is not None and key not in index:
+                prefix_index.remove(key)
+        return Result(Status.OK, book)
+
+    def register_reader(self, reader: Reader) -> Result:
+        """Регистрирует нового читателя.
+        Args:
+            reader (Reader): Экземпляр класса Reader.
+        Returns:
+            Result: Результат процедуры регистрации читателя.
+        """
+
+        if not isinstance(reader, Reader):
+            return Result(Status.NOT_A_READER)
+
+        if reader.id in self.readers:
+            return Result(Status.READER_EXISTS, reader=self.readers[reader.id])
+
+        self.readers[reader.id] = reader
+        self.index_readers_by_name[reader.key] = reader.id
+        self.search_cache.invalidate(reader.key)
+        self.update_lazy_index('index_prefix_by_reader', reader.key, reader.name)
+        return Result(Status.OK, reader=reader)
+
+    def apply_borrow(self, book: Book, reader: Reader) -> None:
+        """Оформляет выдачу книги читателю без каких-либо проверок.
+        Args:
+            book (Book): Экземпляр класса Book.
+            reader (Reader): Экземпляр класса Reader.
+        """
+
+        title_key = book.title_key
+        book.status = False
+        book.borrower = reader
+        reader.borrowed_books[book] = None
+        self.index_books_by_reader.setdefault(reader.id, dict())[book.id] = None
+        self.update_sorted_index('index_sorted_by_reader', reader.id, book.id, True)
+        self.borrow_history.add(reader.name)
+        self.update_free_copies(title_key, book.id, False)
+        self.open_loan(book, reader)
+        # Читатель, взявший книгу сам, больше не ждет ее по брони.
+        if title_key in self.holds_by_reader.get(reader.id, ()):
+            self.hold_queues[title_key].remove(reader.id)
+            self.forget_hold(title_key, reader.id)
+
+    def apply_return(self, book: Book, reader: Reader) -> None:
+        """Оформляет возврат книги читателем без каких-либо проверок.
+        Args:
+            book (Book): Экземпляр класса Book.
+            reader (Reader): Экземпляр класса Reader.
+        """
+
+        book.status = True
+        book.borrower = None
+        del reader.borrowed_books[book]
+        self.remove_from_index(self.index_books_by_reader, reader.id, book.id)
+        self.update_sorted_index('index_sorted_by_reader', reader.id, book.id, False)
+        self.update_free_copies(book.title_key, book.id, True)
+        self.close_loan(book, reader)
+
+    def open_loan(self, book: Book, reader: Reader, checkout: int | None = None) -> None:
+        """Заводит запись о выдаче со сроком возврата, вносит ее в индекс сроков
+        и дописывает выдачу в историю.
+        Args:
+            book (Book): Экземпляр класса Book.
+            reader (Reader): Экземпляр класса Reader.
+            checkout (int | None, optional): Момент выдачи. Defaults to None - текущее время.
+        """
 
-    def __init__(self, title: str, author: str, id: int) -> None:
-        """Инициализирует объект класса книга.
+        checkout = int(self.clock()) if checkout is None else checkout
+        loan = self.loans[book.id] = Loan(book, reader, checkout, checkout + self.loan_period)
+        insort(self.due_index, (loan.due, book.id))
+        self.loan_history.append(checkout, book.id, reader.id, False)
+
+    def close_loan(self, book: Book, reader: Reader) -> None:
+        """Закрывает запись о выдаче, начисляет читателю штраф за просрочку
+        и дописывает возврат в историю.
         Args:
-            title (str): Строка с названием книги.
-            author (str): Строка с ФИО автора.
-            id (int): Уникальный идентификатор книги.
+            book (Book): Экземпляр класса Book.
+            reader (Reader): Экземпляр класса Reader.
         """
 
-        self.title = title
-        self.author = author
-        self.id = id
-        self.status = True
-        self.borrower = None
+        now = int(self.clock())
+        self.loan_history.append(now, book.id, reader.id, True)
+        loan = self.loans.pop(book.id, None)
+        if loan is None:
+            return
 
-    def __str__(self) -> str:
-        return f'Название книги: {self.title}\nАвтор книги: {self.author}\nID книги: {self.id}\nСтатус книги: {'В наличии' if self.status else 'У читателя'}'
+        del self.due_index[bisect_left(self.due_index, (loan.due, book.id))]
+        fine = self.get_fine(loan, now)
+        if fine:
+            self.fines[reader.id] = self.fines.get(reader.id, 0) + fine
 
-#######################################################################
+    def get_fine(self, loan: Loan, now: int | None = None) -> int:
+        """Возвращает штраф по выдаче: fine_per_day за каждый начатый день просрочки.
+        Args:
+            loan (Loan): Запись о выдаче.
+            now (int | None, optional): Момент времени в секундах. Defaults to None - текущее время.
+        Returns:
+            int: Сумма штрафа, 0 если срок не истек.
+        """
 
+        now = int(self.clock()) if now is None else now
+        if now <= loan.due:
+            return 0
+        return -(-(now - loan.due) // DAY) * self.fine_per_day
 
-class Reader:
+    def get_overdue(self, now: int | None = None) -> list:
+        """Возвращает просроченные выдачи по возрастанию срока.
+        Время работы пропорционально количеству найденных выдач.
+        Args:
+            now (int | None, optional): Момент времени в секундах. Defaults to None - текущее время.
+        Returns:
+            list: Список Loan со сроком возврата раньше now.
+        """
 
-    def __init__(self, name: str, id: int) -> None:
-        """Инициализирует объект класса читатель.
+        now = int(self.clock()) if now is None else now
+        end = bisect_left(self.due_index, (now,))
+        return [self.loans[book_id] for _, book_id in self.due_index[:end]]
+
+    def get_due_within(self, days: int, now: int | None = None) -> list:
+        """Возвращает выдачи, срок возврата которых наступит в ближайшие days дней.
         Args:
-            name (str): Имя читателя.
-            id (int): Уникальный идентификатор читателя.
+            days (int): Количество дней.
+            now (int | None, optional): Момент времени в секундах. Defaults to None - текущее время.
+        Returns:
+            list: Список Loan со сроком от now до now + days дней включительно.
         """
 
-        self.name = name.capitalize()
-        self.id = id
-        self.borrowed_books = list()
+        now = int(self.clock()) if now is None else now
+        start = bisect_left(self.due_index, (now,))
+        end = bisect_left(self.due_index, (now + days * DAY + 1,))
+        return [self.loans[book_id] for _, book_id in self.due_index[start:end]]
 
-    def __str__(self) -> str:
-        return f'Имя читателя: {self.name}\nID читателя: {self.id}'
+    def get_fines(self, now: int | None = None) -> dict:
+        """Возвращает штрафы читателей: начисленные при возврате и набегающие
+        по еще не возвращенным просроченным книгам.
+        Args:
+            now (int | None, optional): Момент времени в секундах. Defaults to None - текущее время.
+        Returns:
+            dict: Словарь ID читателя -> сумма штрафа.
+        """
 
+        now = int(self.clock()) if now is None else now
+        fines = dict(self.fines)
+        for loan in self.get_overdue(now):
+            fines[loan.reader.id] = fines.get(loan.reader.id, 0) + self.get_fine(loan, now)
+        return fines
 
-#######################################################################
+    def commit_batch(self, results: list, apply) -> list:
+        """Применяет пакет операций, только если все они прошли проверку.\n
+        Иначе ни одна операция не применяется, а успешно проверенные
+        получают статус ROLLED_BACK.
+        Args:
+            results (list): Список Result после проверки пакета.
+            apply (Callable): Метод применения одной операции.
+        Returns:
+            list: Итоговый список Result.
+        """
 
+        if all(r.status is Status.OK for r in results):
+            for r in results:
+                apply(r.book, r.reader)
+            return results
 
-class Library:
+        return [r._replace(status=Status.ROLLED_BACK) if r.status is Status.OK else r
+                for r in results]
 
-    def __init__(self, limit: int) -> None:
-        """Инициализирует объект класса библиотека.
+    def borrow_many(self, pairs) -> list:
+        """Выдает пакет книг читателям. Пакет проверяется за один проход с
+        учетом уже выданных в нем книг и лимита каждого читателя, после чего
+        применяется целиком либо не применяется вовсе. Ничего не печатает.
         Args:
-            limit (int): Число определяющее максимальное количество книг
-        которые читатель может взять.
+            pairs (Iterable[tuple]): Пары (название книги, имя читателя).
+        Returns:
+            list: Список Result для каждой пары в исходном порядке.
         """
 
-        self.lib = dict()
-        self.readers = dict()
-        self.borrow_history = set()
-        self.rental_limit = limit
-        self.index_books_by_title = dict()
-        self.index_books_by_author = dict()
-        self.index_books_by_reader = dict()
-        self.index_readers_by_name = dict()
+        # Название -> [следующий свободный экземпляр, итератор остальных по возрастанию ID].
+        candidates = dict()
+        loans = dict()
+        results = []
+
+        for title, name in pairs:
+            title_key = normalize(title)
+            book_ids = self.index_books_by_title.get(title_key)
+            reader_id = self.index_readers_by_name.get(normalize(name))
+            current_reader = None if reader_id is None else self.readers[reader_id]
+            current_book = None
+            free_id = None
+
+            if book_ids is not None:
+                # Пул названия обходится один раз за пакет: первый экземпляр,
+                # еще не занятый этим пакетом, - следующий по возрастанию ID.
+                copies = candidates.get(title_key)
+                if copies is None:
+                    pool = self.get_free_copies(title_key)
+                    stale = self.stale_free_copies.get(title_key, ())
+                    free = (book_id for book_id in iter_heap(pool) if book_id not in stale)
+                    copies = candidates[title_key] = [next(free, None), free]
+                free_id = copies[0]
+                current_book = self.lib[next(iter(book_ids)) if free_id is None else free_id]
+
+            if current_book is None:
+                status = Status.BOOK_NOT_FOUND
+            elif current_reader is None:
+                status = Status.READER_NOT_FOUND
+            elif free_id is None:
+                status = Status.BOOK_UNAVAILABLE
+            elif len(current_reader.borrowed_books) + loans.get(reader_id, 0) >= self.rental_limit:
+                status = Status.LIMIT_REACHED
+            elif self.is_reserved(title_key, reader_id):
+                status = Status.BOOK_RESERVED
+            else:
+                status = Status.OK
+                copies[0] = next(copies[1], None)
+                loans[reader_id] = loans.get(reader_id, 0) + 1
+
+            results.append(Result(status, current_book, current_reader))
 
-    def add_book_in_index_by_author(self, book: Book) -> None:
-        """Добавляет ID книги в словарь указатель по ключу имени автора. Если автор уже имеется в словаре, то по этому ключу добавляется список с ID всех книг данного автора.
+        return self.commit_batch(results, self.apply_borrow)
+
+    def return_many(self, pairs) -> list:
+        """Принимает пакет возвращаемых книг. Пакет проверяется за один проход
+        и применяется целиком либо не применяется вовсе. Ничего не печатает.
         Args:
-            book (Book): Экземпляр класса Book.
+            pairs (Iterable[tuple]): Пары (название книги, имя читателя).
+        Returns:
+            list: Список Result для каждой пары в исходном порядке.
         """
 
-        if book.author not in self.index_books_by_author:
-            self.index_books_by_author[book.author] = book.id
+        returned = set()
+        results = []
 
-        elif book.author in self.index_books_by_author:
-            temp = self.index_books_by_author[book.author]
+        for title, name in pairs:
+            title_key = normalize(title)
+            reader_id = self.index_readers_by_name.get(normalize(name))
+            current_reader = None if reader_id is None else self.readers[reader_id]
+            current_book = None
 
-            if isinstance(temp, int):
-                self.index_books_by_author[book.author] = list()
-                self.index_books_by_author[book.author].append(temp)
-                self.index_books_by_author[book.author].append(book.id)
+            if title_key not in self.index_books_by_title:
+                status = Status.BOOK_NOT_FOUND
+            elif current_reader is None:
+                status = Status.READER_NOT_FOUND
             else:
-                self.index_books_by_author[book.author].append(book.id)
+                current_book = self.find_reader_book_by_title(current_reader, title_key, returned)
+                if current_book is None:
+                    status = Status.NOT_BORROWED
+                else:
+                    status = Status.OK
+                    returned.add(current_book.id)
 
-    def find_book_by_title(self, title: str) -> Book:
-        """Находит объект книги в основном словаре книг библиотеки.
+            results.append(Result(status, current_book, current_reader))
+
+        # Освободившиеся экземпляр и место читателя уходят по брони сразу после
+        # каждого возврата, как в return_book, поэтому журнал воспроизводит
+        # пакет записями о возврате по одной.
+        fulfilled = dict()
+
+        def apply(book: Book, reader: Reader) -> None:
+            self.apply_return(book, reader)
+            fulfilled[book.id] = self.fulfil_after_return(book.title_key, reader)
+
+        results = self.commit_batch(results, apply)
+        for i, r in enumerate(results):
+            if r.status is Status.OK:
+                holder, handoffs = fulfilled[r.book.id]
+                results[i] = r._replace(holder=holder, handoffs=handoffs)
+        return results
+
+    def borrow_book(self, title: str, reader: str) -> Result:
+        """Выдает читателю свободный экземпляр книги, если такой есть.
         Args:
-            title (str): Строка с название книги.
-        Raises:
-            LookupError: Возбуждает исключение если ID книги не найден в индексе index_books_by_title.
+            title (str): Строка с названием книги.
+            reader (str): Строка с именем читателя.
         Returns:
-            Book: Объект класса Book.
+            Result: Результат процедуры выдачи книги читателю.
         """
 
-        book_id = self.index_books_by_title.get(title)
+        return self.borrow_book_by_id(title, self.index_readers_by_name.get(normalize(reader)))
 
-        if book_id is None:
-            raise LookupError(f'ОТМЕНА: ID книги "{
-                              title}" не найден в индексе: index_books_by_title')
+    def borrow_book_by_id(self, title: str, reader_id: int | None, check_holds: bool = True) -> Result:
+        """Выдает свободный экземпляр книги читателю с указанным ID.\n
+        Имя может принадлежать нескольким читателям, а индекс по имени
+        хранит только последнего из них, поэтому журнал воспроизводит выдачи
+        по ID читателя. Очередь бронирования журнал при этом не проверяет:
+        выдача уже прошла проверку, а выдачи пакета borrow_many проверялись
+        до того, как пакет начал применяться.
+        Args:
+            title (str): Строка с названием книги.
+            reader_id (int | None): Уникальный идентификатор читателя.
+            check_holds (bool, optional): Не выдавать экземпляр, отложенный для очереди. Defaults to True.
+        Returns:
+            Result: Результат процедуры выдачи книги читателю.
+        """
+
+        title_key = normalize(title)
+        book_ids = self.index_books_by_title.get(title_key)
+
+        if book_ids is None:
+            return Result(Status.BOOK_NOT_FOUND)
+
+        if reader_id not in self.readers:
+            return Result(Status.READER_NOT_FOUND)
+
+        free = self.get_free_copies(title_key)
+        current_book = self.lib[free[0] if free else next(iter(book_ids))]
+        current_reader = self.readers[reader_id]
+
+        if current_book.status and len(current_reader.borrowed_books) < self.rental_limit:
+            if check_holds and self.is_reserved(title_key, reader_id):
+                return Result(Status.BOOK_RESERVED, current_book, current_reader)
+            self.apply_borrow(current_book, current_reader)
+            return Result(Status.OK, current_book, current_reader)
+        elif len(current_reader.borrowed_books) >= self.rental_limit:
+            return Result(Status.LIMIT_REACHED, current_book, current_reader)
         else:
-            return self.lib[book_id]
+            return Result(Status.BOOK_UNAVAILABLE, current_book, current_reader)
 
-    def find_books_by_author(self, author: str) -> Book | list:
-        """Находит объект книги в основном словаре книг библиотеки.
+    def return_book(self, title: str, reader: str) -> Result:
+        """Возвращает книгу от читателя в библиотеку если она числится в списке читателя.
         Args:
-            author (str): Строка с именем автора.
-        Raises:
-            LookupError: Возбуждает исключение если ID книги не найден в индексе index_books_by_author.
+            title (str): Строка с названием книги.
+            reader (str): Строка с именем читателя.
         Returns:
-            Book | list: Объект класса Book или список объектов класса Book.
+            Result: Результат процедуры возврата книги читателем.
         """
 
-        book_id = self.index_books_by_author.get(author)
+        return self.return_book_by_id(title, self.index_readers_by_name.get(normalize(reader)))
 
-        if book_id is None:
-            raise LookupError(f'ОТМЕНА: ID книги "{
-                              author}" не найден в индексе: index_books_by_author')
-        elif isinstance(book_id, int):
-            return self.lib[book_id]
-        elif isinstance(book_id, list):
-            return [self.lib[book] for book in book_id]
+    def return_book_by_id(self, title: str, reader_id: int | None) -> Result:
+        """Возвращает книгу от читателя с указанным ID, если она числится в его списке.
+        Args:
+            title (str): Строка с названием книги.
+            reader_id (int | None): Уникальный идентификатор читателя.
+        Returns:
+            Result: Результат процедуры возврата книги читателем.
+        """
 
-    def find_reader_by_name(self, name: str) -> Reader:
-        """Находит объект читателя в основном словаре читателей библиотеки.
+        title_key = normalize(title)
+        book_ids = self.index_books_by_title.get(title_key)
+
+        if book_ids is None:
+            return Result(Status.BOOK_NOT_FOUND)
+
+        if reader_id not in self.readers:
+            return Result(Status.READER_NOT_FOUND)
+
+        current_reader = self.readers[reader_id]
+        current_book = self.find_reader_book_by_title(current_reader, title_key)
+
+        if current_book is None:
+            return Result(Status.NOT_BORROWED, self.lib[next(iter(book_ids))], current_reader)
+
+        self.apply_return(current_book, current_reader)
+        holder, handoffs = self.fulfil_after_return(current_book.title_key, current_reader)
+        return Result(Status.OK, current_book, current_reader, holder, handoffs)
+
+    def place_hold(self, title: str, reader: str, priority: int = 0) -> Result:
+        """Ставит читателя в очередь на книгу. Если свободный экземпляр уже
+        есть, он сразу выдается по очереди.
         Args:
-            name (str): Строка с именем читателя.
-        Raises:
-            LookupError: Возбуждает исключение если ID читателя не найден в индексе index_readers_by_name.
+            title (str): Строка с названием книги.
+            reader (str): Строка с именем читателя.
+            priority (int, optional): Приоритет брони, больший обслуживается раньше. Defaults to 0.
         Returns:
-            Reader: Объект класса Reader.
+            Result: Результат постановки в очередь, holder - читатель, получивший
+            свободный экземпляр по очереди.
         """
 
-        reader_id = self.index_readers_by_name.get(name)
+        return self.place_hold_by_id(title, self.index_readers_by_name.get(normalize(reader)), priority)
 
-        if reader_id is None:
-            raise LookupError(f'ОТМЕНА: ID читателя по имени "{
-                              name}" не найден в индексе: index_readers_by_name')
-        else:
-            return library.readers[reader_id]
+    def place_hold_by_id(self, title: str, reader_id: int | None, priority: int = 0) -> Result:
+        """Ставит читателя с указанным ID в очередь на книгу, как place_hold.
+        Args:
+            title (str): Строка с названием книги.
+            reader_id (int | None): Уникальный идентификатор читателя.
+            priority (int, optional): Приоритет брони, больший обслуживается раньше. Defaults to 0.
+        Returns:
+            Result: Результат постановки в очередь.
+        """
+
+        title_key = normalize(title)
+        book_ids = self.index_books_by_title.get(title_key)
+
+        if book_ids is None:
+            return Result(Status.BOOK_NOT_FOUND)
+
+        if reader_id not in self.readers:
+            return Result(Status.READER_NOT_FOUND)
+
+        current_book = self.lib[next(iter(book_ids))]
+        current_reader = self.readers[reader_id]
+        queue = self.hold_queues.get(title_key)
+
+        if queue is not None and reader_id in queue:
+            return Result(Status.HOLD_EXISTS, current_book, current_reader)
+
+        if queue is None:
+            queue = self.hold_queues[title_key] = HoldQueue()
+        queue.push(reader_id, priority)
+        self.holds_by_reader.setdefault(reader_id, dict())[title_key] = None
 
-    def add_book(self, book: Book) -> str:
-        """Добавляет книгу в библиотеку.
+        handoff = self.fulfil_hold(title_key)
+        if handoff is None:
+            return Result(Status.OK, current_book, current_reader)
+        return Result(Status.OK, current_book, current_reader, handoff.borrower, (handoff,))
+
+    def cancel_hold(self, title: str, reader: str) -> Result:
+        """Снимает бронь читателя на книгу.
         Args:
-            book (Book): Экземпляр класса Book.
+            title (str): Строка с названием книги.
+            reader (str): Строка с именем читателя.
         Returns:
-            str: Строку отражающую статус процедуры регистрации книги.
+            Result: Результат снятия брони.
         """
 
-        if isinstance(book, Book):
+        return self.cancel_hold_by_id(title, self.index_readers_by_name.get(normalize(reader)))
 
-            if book.id in self.lib:
-                print(f'ОТМЕНА: Книга с ID "{
-                      book.id}" УЖЕ зарегистрирована в библиотеке.')
-                return
+    def cancel_hold_by_id(self, title: str, reader_id: int | None) -> Result:
+        """Снимает бронь читателя с указанным ID на книгу, как cancel_hold.
+        Args:
+            title (str): Строка с названием книги.
+            reader_id (int | None): Уникальный идентификатор читателя.
+        Returns:
+            Result: Результат снятия брони.
+        """
+
+        title_key = normalize(title)
+
+        if title_key not in self.index_books_by_title:
+            return Result(Status.BOOK_NOT_FOUND)
+
+        if reader_id not in self.readers:
+            return Result(Status.READER_NOT_FOUND)
+
+        queue = self.hold_queues.get(title_key)
+        current_reader = self.readers[reader_id]
+
+        if queue is None or reader_id not in queue:
+            return Result(Status.HOLD_NOT_FOUND, reader=current_reader)
+
+        queue.remove(reader_id)
+        self.forget_hold(title_key, reader_id)
+        return Result(Status.OK, reader=current_reader)
+
+    def get_hold_position(self, title: str, reader: str) -> int | None:
+        """Возвращает место читателя в очереди на книгу за O(log n).
+        Args:
+            title (str): Строка с названием книги.
+            reader (str): Строка с именем читателя.
+        Returns:
+            int | None: Место в очереди начиная с 1 или None, если брони нет.
+        """
+
+        queue = self.hold_queues.get(normalize(title))
+        reader_id = self.index_readers_by_name.get(normalize(reader))
+
+        if queue is None or reader_id is None:
+            return None
+        return queue.get_position(reader_id)
+
+    def search_book(self, prompt: str) -> SearchResult:
+        """Метод поиска книг, который позволит искать книги по названию, автору или по тому, у какого читателя она находится.\n
+        Результаты кэшируются. В результате лежат сами объекты Book и Reader,
+        поэтому выдача и возврат не делают его устаревшим: запись кэша
+        удаляется, только когда добавляется или удаляется книга с таким
+        названием или автором либо регистрируется читатель с таким именем.
+        Кэш хранит кортежи, а каждый вызов получает свои списки, поэтому
+        изменение ответа не портит кэш.
+        Args:
+            prompt (str): Строка с название книги или именем автора или именем читателя.
+        Returns:
+            SearchResult: Книги, найденные по названию и по автору, и найденный читатель.
+        """
+
+        key = normalize(prompt)
+        cached = self.search_cache.get(key)
+
+        if cached is None:
+            title_ids = self.index_books_by_title.get(key, ())
+            author_ids = self.index_books_by_author.get(key, ())
+            reader_id = self.index_readers_by_name.get(key)
+            cached = SearchResult(
+                tuple(self.lib[book_id] for book_id in title_ids),
+                tuple(self.lib[book_id] for book_id in author_ids),
+                None if reader_id is None else self.readers[reader_id],
+            )
+            self.search_cache.put(key, cached)
+
+        return SearchResult(list(cached.by_title), list(cached.by_author), cached.reader)
+
+    def autocomplete(self, prefix: str, limit: int = 10) -> Completions:
+        """Подсказывает названия, авторов и имена читателей по началу строки.\n
+        Время ответа зависит от длины префикса и limit, а не от размера каталога.
+        Args:
+            prefix (str): Начало строки в любом регистре.
+            limit (int, optional): Наибольшее количество подсказок каждого вида. Defaults to 10.
+        Returns:
+            Completions: Подсказки в алфавитном порядке.
+        """
+
+        key = normalize(prefix)
+        return Completions(
+            self.index_prefix_by_title.complete(key, limit),
+            self.index_prefix_by_author.complete(key, limit),
+            self.index_prefix_by_reader.complete(key, limit),
+        )
+
+    def search_book_fuzzy(self, prompt: str, limit: int = 10) -> list:
+        """Нечеткий поиск книг по названию и автору с учетом опечаток.
+        Args:
+            prompt (str): Строка с названием книги или именем автора, возможно с опечатками.
+            limit (int, optional): Наибольшее количество книг в ответе. Defaults to 10.
+        Returns:
+            list: Объекты FuzzyMatch, упорядоченные по числу опечаток.
+        """
+
+        scores = self.index_fuzzy.search(normalize(prompt))
+        found = dict()
+
+        for key in sorted(scores, key=scores.__getitem__):
+            for index in (self.index_books_by_title, self.index_books_by_author):
+                for book_id in index.get(key, ()):
+                    if book_id not in found:
+                        found[book_id] = FuzzyMatch(scores[key], self.lib[book_id])
+                        if len(found) == limit:
+                            return list(found.values())
+
+        return list(found.values())
+
+
+#######################################################################
+
+
+class LibraryConsole:
+
+    def __init__(self, library: Library) -> None:
+        """Инициализирует слой представления библиотеки.\n
+        Выполняет операции библиотеки и распечатывает их результат в
+        удобочитаемом виде. Все остальные атрибуты и методы берутся у
+        самой библиотеки.
+        Args:
+            library (Library): Экземпляр класса Library.
+        """
+
+        self.library = library
+
+    def __getattr__(self, name: str):
+        return getattr(self.library, name)
+
+    def print_list_book(self, list_books) -> None:
+        """Распечатывает пронумерованный список книг.
+        Args:
+            list_books (Iterable[Book]): Последовательность объектов класса Book.
+        """
+
+        count = 1
+        for b in list_books:
+            print('')
+            print(f'{count}.')
+            count += 1
+            print(b)
+
+    def add_book(self, book: Book) -> Result:
+        """Добавляет книгу в библиотеку и распечатывает результат.
+        Args:
+            book (Book): Экземпляр класса Book.
+        Returns:
+            Result: Результат процедуры регистрации книги.
+        """
 
-            self.lib[book.id] = book
-            self.index_books_by_title[book.title] = book.id
-            self.add_book_in_index_by_author(book)
+        result = self.library.add_book(book)
+
+        if result.status is Status.OK:
             print(f'УСПЕХ: Книга "{
                   book.title}" БЫЛА УСПЕШНО зарегистрирована в библиотеке.')
+        elif result.status is Status.BOOK_EXISTS:
+            print(f'ОТМЕНА: Книга с ID "{
+                  book.id}" УЖЕ зарегистрирована в библиотеке.')
         else:
             print(f'ОШИБКА: "{book}" НЕ ЯВЛЯЕТСЯ объектом книги.')
 
-    def register_reader(self, reader: Reader) -> str:
-        """Регистрирует нового читателя.
+        return result
+
+    def remove_book(self, book_id: int) -> Result:
+        """Удаляет книгу из библиотеки и распечатывает результат.
         Args:
-            reader (Reader): Экземпляр класса Reader.
+            book_id (int): Уникальный идентификатор книги.
         Returns:
-            str: Строку отражающую статус процедуры регистрации читателя.
+            Result: Результат процедуры удаления книги.
         """
 
-        if isinstance(reader, Reader):
+        result = self.library.remove_book(book_id)
 
-            if reader.id in self.readers:
-                print(f'Читатель с ID "{
-                      reader.id}" УЖЕ зарегистрирован в библиотеке.')
-                return
+        if result.status is Status.OK:
+            print(f'УСПЕХ: Книга "{result.book.title}" БЫЛА УДАЛЕНА из библиотеки.')
+        elif result.status is Status.BOOK_UNAVAILABLE:
+            print(f'ОТМЕНА: Книга "{result.book.title}" в данный момент У ЧИТАТЕЛЯ "{
+                result.reader.name}"')
+        else:
+            print(f'ОТМЕНА: Книга с ID "{book_id}" НЕ зарегистрирована в библиотеке.')
+
+        return result
+
+    def register_reader(self, reader: Reader) -> Result:
+        """Регистрирует нового читателя и распечатывает результат.
+        Args:
+            reader (Reader): Экземпляр класса Reader.
+        Returns:
+            Result: Результат процедуры регистрации читателя.
+        """
 
-            self.readers[reader.id] = reader
-            self.index_readers_by_name[reader.name] = reader.id
+        result = self.library.register_reader(reader)
+
+        if result.status is Status.OK:
             print(f'УСПЕХ: Читатель по имени "{
                   reader.name}" БЫЛ УСПЕШНО зарегистрирован в библиотеке.')
+        elif result.status is Status.READER_EXISTS:
+            print(f'Читатель с ID "{
+                  reader.id}" УЖЕ зарегистрирован в библиотеке.')
         else:
             print(f'ОШИБКА: "{reader}" НЕ ЯВЛЯЕТСЯ объектом читателя.')
 
-    def borrow_book(self, title: str, reader: str) -> str:
-        """Выдает книгу читателю, если она в наличии.
+        return result
+
+    def print_lookup_error(self, result: Result, title: str, reader: str) -> None:
+        """Распечатывает сообщение о книге или читателе, не найденных в индексе.
+        Args:
+            result (Result): Результат операции библиотеки.
+            title (str): Строка с названием книги.
+            reader (str): Строка с именем читателя.
+        """
+
+        if result.status is Status.BOOK_NOT_FOUND:
+            print(f'ОТМЕНА: ID книги "{
+                  title}" не найден в индексе: index_books_by_title')
+        else:
+            print(f'ОТМЕНА: ID читателя по имени "{
+                  reader}" не найден в индексе: index_readers_by_name')
+
+    def borrow_book(self, title: str, reader: str) -> Result:
+        """Выдает книгу читателю и распечатывает результат.
         Args:
             title (str): Строка с названием книги.
             reader (str): Строка с именем читателя.
         Returns:
-            str: Строку отражающую статус процедуры выдачи книги читателю.
+            Result: Результат процедуры выдачи книги читателю.
         """
 
-        try:
-            current_book = self.find_book_by_title(title)
-            current_reader = self.find_reader_by_name(reader)
+        result = self.library.borrow_book(title, reader)
+
+        if result.status is Status.OK:
+            print(f'УСПЕХ: Книга "{result.book.title}" БЫЛА ВЫДАНА читателю "{
+                result.reader.name}"')
+        elif result.status is Status.LIMIT_REACHED:
+            print(f'ОТМЕНА: Для читателя "{
+                result.reader.name}" БЫЛ ДОСТИГНУТ ЛИМИТ.')
+        elif result.status is Status.BOOK_UNAVAILABLE:
+            print(f'ОТМЕНА: Книга "{result.book.title}" в данный момент У ДРУГОГО ЧИТАТЕЛЯ "{
+                result.book.borrower.name}"')
+        elif result.status is Status.BOOK_RESERVED:
+            print(f'ОТМЕНА: Свободный экземпляр книги "{result.book.title}" ОТЛОЖЕН для очереди бронирования')
+        else:
+            self.print_lookup_error(result, title, reader)
+
+        return result
 
-            if current_book.status and len(current_reader.borrowed_books) < self.rental_limit:
-                current_book.status = False
-                current_book.borrower = current_reader
-                current_reader.borrowed_books.append(current_book)
-                self.borrow_history.add(current_reader.name)
-                print(f'УСПЕХ: Книга "{current_book.title}" БЫЛА ВЫДАНА читателю "{
-                    current_reader.name}"')
-            elif len(current_reader.borrowed_books) >= self.rental_limit:
-                print(f'ОТМЕНА: Для читателя "{
-                    current_reader.name}" БЫЛ ДОСТИГНУТ ЛИМИТ.')
-            else:
-                print(f'ОТМЕНА: Книга "{current_book.title}" в данный момент У ДРУГОГО ЧИТАТЕЛЯ "{
-                    current_book.borrower.name}"')
-        except LookupError as e:
-            print(f'{e}')
+    def print_handoffs(self, result: Result) -> None:
+        """Распечатывает книги, выданные по брони в ходе операции."""
 
-    def return_book(self, title, reader) -> str:
-        """Возвращает книгу от читателя в библиотеку если она числится в списке читателя.
+        for book in result.handoffs:
+            print(f'УСПЕХ: Книга "{book.title}" БЫЛА ВЫДАНА по брони читателю "{book.borrower.name}"')
+
+    def return_book(self, title: str, reader: str) -> Result:
+        """Возвращает книгу в библиотеку и распечатывает результат.
         Args:
             title (str): Строка с названием книги.
             reader (str): Строка с именем читателя.
         Returns:
-            str: Строку отражающую статус процедуры возврата книги читателем.
+            Result: Результат процедуры возврата книги читателем.
         """
 
-        try:
-            current_book = self.find_book_by_title(title)
-            current_reader = self.find_reader_by_name(reader)
+        result = self.library.return_book(title, reader)
 
-            if current_book.borrower is not None and current_book.borrower.name == current_reader.name:
-                current_book.status = True
-                current_book.borrower = None
-                current_reader.borrowed_books.remove(current_book)
-                print(f'УСПЕХ: Книга "{current_book.title}" БЫЛА ВОЗВРАЩЕНА читателем "{
-                    current_reader.name}"')
-            else:
-                print(f'ОТМЕНА: Книга "{current_book.title}" НЕ ЧИСЛИТСЯ в списке читателя "{
-                    current_reader.name}"')
-        except LookupError as e:
-            print(f'{e}')
+        if result.status is Status.OK:
+            print(f'УСПЕХ: Книга "{result.book.title}" БЫЛА ВОЗВРАЩЕНА читателем "{
+                result.reader.name}"')
+            self.print_handoffs(result)
+        elif result.status is Status.NOT_BORROWED:
+            print(f'ОТМЕНА: Книга "{result.book.title}" НЕ ЧИСЛИТСЯ в списке читателя "{
+                result.reader.name}"')
+        else:
+            self.print_lookup_error(result, title, reader)
 
-    def get_book_status(self, title: str) -> str:
-        """Выводит информацию о статусе книги, и о читателе у которого она находится, если не в библиотеке.
+        return result
+
+    def place_hold(self, title: str, reader: str, priority: int = 0) -> Result:
+        """Ставит читателя в очередь на книгу и распечатывает результат.
         Args:
             title (str): Строка с названием книги.
+            reader (str): Строка с именем читателя.
+            priority (int, optional): Приоритет брони. Defaults to 0.
         Returns:
-            str: Строку о статусе книги и у какого читателя она находится.
+            Result: Результат постановки в очередь.
+        """
+
+        result = self.library.place_hold(title, reader, priority)
+
+        if result.status is Status.OK:
+            self.print_handoffs(result)
+            position = self.library.get_hold_position(title, reader)
+            if position is not None:
+                print(f'УСПЕХ: Читатель "{result.reader.name}" ПОСТАВЛЕН в очередь на книгу "{
+                    result.book.title}", место: {position}')
+        elif result.status is Status.HOLD_EXISTS:
+            print(f'ОТМЕНА: Читатель "{result.reader.name}" УЖЕ СТОИТ в очереди на книгу "{
+                result.book.title}"')
+        else:
+            self.print_lookup_error(result, title, reader)
+
+        return result
+
+    def get_book_status(self, title: str) -> None:
+        """Выводит информацию о статусе книги, и о читателе у которого она находится, если не в библиотеке.
+        Args:
+            title (str): Строка с названием книги.
         """
 
-        current_book = self.find_book_by_title(title)
+        current_book = self.library.find_book_by_title(title)
         result_string = f'{current_book}'
 
         if current_book.borrower is not None:
@@ -248,221 +2235,293 @@ class Library:
 
         print(result_string)
 
-    def list_reader_books(self, reader) -> None:
+    def show_availability(self, title: str) -> Availability:
+        """Выводит количество экземпляров книги всего и в наличии.
+        Args:
+            title (str): Строка с названием книги.
+        Returns:
+            Availability: Счетчики экземпляров.
+        """
+
+        availability = self.library.get_availability(title)
+        print(f'Экземпляров книги "{title}": {availability.total}, в наличии: {availability.available}')
+        return availability
+
+    def show_overdue(self, now: int | None = None) -> list:
+        """Выводит просроченные выдачи и штраф по каждой.
+        Args:
+            now (int | None, optional): Момент времени в секундах. Defaults to None - текущее время.
+        Returns:
+            list: Список просроченных Loan.
+        """
+
+        overdue = self.library.get_overdue(now)
+        if not overdue:
+            print('Просроченных книг нет.')
+        for loan in overdue:
+            print(f'{loan.book.id}: {loan.book.title} - {loan.reader.name}, штраф: {self.library.get_fine(loan, now)}')
+        return overdue
+
+    def list_reader_books(self, reader: str) -> None:
         """Выводит список книг, находящихся у читателя.
         Args:
             reader (str): Строка с именем читателя.
         """
 
-        current_reader = self.find_reader_by_name(reader)
-        count = 1
+        current_reader = self.library.find_reader_by_name(reader)
 
         print(f'Список книг читателя "{current_reader.name}" {
             len(current_reader.borrowed_books)} шт.')
+        self.print_list_book(current_reader.borrowed_books)
 
-        for b in current_reader.borrowed_books:
-            print('')
-            print(f'{count}.')
-            count += 1
-            print(b)
-
-    def search_book(self, prompt: str) -> None:
-        """Метод поиска книг, который позволит искать книги по названию, автору или по тому, у какого читателя она находится.
+    def search_book(self, prompt: str, show_reader_books: bool = False) -> SearchResult:
+        """Ищет книги по названию, автору или читателю и распечатывает результат.\n
+        Если найден читатель с книгами, печатает их количество, а при
+        show_reader_books - и сам список.
         Args:
             prompt (str): Строка с название книги или именем автора или именем читателя.
+            show_reader_books (bool, optional): Показать книги найденного читателя. Defaults to False.
+        Returns:
+            SearchResult: Результат поиска.
         """
 
-        found = False
+        result = self.library.search_book(prompt)
 
         # Поиск книги по названию.
-        try:
-            title_book = self.find_book_by_title(prompt)
-            found = True
+        if result.by_title:
             print('--------------------------------')
-            print(f'По запросу "{prompt}" найдено 1 книга.')
-            print('')
-            print(title_book)
-            if title_book.borrower is not None:
-                print(title_book.borrower)
-        except LookupError:
-            pass
+            print(f'По запросу "{prompt}" найдено ({len(result.by_title)}) книг.')
 
-        # Поиск книги по автору
-        try:
-            author_book = self.find_books_by_author(prompt)
-            found = True
-            print('--------------------------------')
-            if isinstance(author_book, list):
-                print(f'По запросу "{prompt}" найдено несколько ({
-                    len(author_book)}) книг.')
+            count = 1
+            for b in result.by_title:
                 print('')
+                print(f'{count}.')
+                count += 1
+                print(b)
+                if b.borrower is not None:
+                    print(b.borrower)
 
-                count = 1
-                for b in author_book:
-                    print('')
-                    print(f'{count}.')
-                    count += 1
-                    print(b)
-            else:
-                print(f'По запросу "{prompt}" найдена 1 книга.')
-                print('')
-                print(author_book)
-        except LookupError:
-            pass
+        # Поиск книги по автору
+        if result.by_author:
+            print('--------------------------------')
+            print(f'По запросу "{prompt}" найдено ({len(result.by_author)}) книг.')
+            self.print_list_book(result.by_author)
 
         # Поиск читателя по имени.
-        try:
-            reader_name = self.find_reader_by_name(prompt)
-            found = True
+        reader_name = result.reader
+        if reader_name is not None:
             print('--------------------------------')
             print(f'По запросу "{
                 prompt}" найден читатель:\n{reader_name}')
             if len(reader_name.borrowed_books) > 0:
                 print(f'За читателем по имени "{
                     reader_name.name}" числится {len(reader_name.borrowed_books)} книг.')
-                answer = input(f'Показать список книг читателя {
-                    reader_name.name} (Y/n): ').lower()
-                if answer == 'y' or answer == '':
+                if show_reader_books:
                     self.list_reader_books(reader_name.name)
                     print('')
-                else:
-                    return
             else:
                 print(f'За читателем по имени "{
                     reader_name.name}" числится 0 книг.')
-        except LookupError:
-            pass
 
         #  Ни чего не найдено.
-        if not found:
+        if not (result.by_title or result.by_author or reader_name is not None):
             print(f'По запросу "{prompt}" ни чего не найдено.')
+            suggestions = self.library.search_book_fuzzy(prompt, 5)
+            if suggestions:
+                print('Возможно, вы искали:')
+                self.print_list_book(match.book for match in suggestions)
 
+        return result
 
 # tests ###############################################################
 
 
-print('-------- Создаем Библиотеку: class Library(limit: int)')
-library = Library(4)
-print('')
-
-print('-------- Создаем Книги: class Book(title: str, author: str, id: int)')
-b1 = Book("FastAPI", "Билл Любанович", 1)
-b2 = Book("Простой Python", "Билл Любанович", 2)
-b3 = Book("Чистый код", "Роберт Мартин", 3)
-b4 = Book("Идеальная работа", "Роберт Мартин", 4)
-b5 = Book("Идеальный программист", "Роберт Мартин", 5)
-b6 = Book("Изучаем Python", "Марк Лутц", 6)
-b7 = Book("Python Карманный справочник", "Марк Лутц", 7)
-b8 = Book("ES6 и не только", "Кайл Симпсон", 8)
-b9 = Book("Замыкания и объекты", "Кайл Симпсон", 9)
-b10 = Book("Познакомьтесь, JavaScript", "Кайл Симпсон", 10)
-b11 = Book("Изучаем SQL", "Алан Бьюли", 11)
-b12 = Book("Django 4 в примерах", "Антонио Меле", 12)
-b13 = Book("Linux Книга рецептов", "Карла Шрёдер", 13)
-b14 = Book("jQuery в действии", "Аурелио де Роза", 14)
-b15 = Book("Внутреннее устройство Linux", "Дмитрий Кетов", 15)
-b16 = Book("Alice in Wonderland", "Льюис Кэрролл", 16)
-b17 = Book("Yeah! Yeah! Yeah!", "Bob Stanley", 17)
-b18 = Book("Yeah! Yeah! Yeah!", "Bob Stanley", 17)  # Duplicate
-print('')
-
-print('-------- Регистрируем Книги в библиотеке: (method) def add_book(book: Book) -> str')
-library.add_book(b1)
-library.add_book(b2)
-library.add_book(b3)
-library.add_book(b4)
-library.add_book(b5)
-library.add_book(b6)
-library.add_book(b7)
-library.add_book(b8)
-library.add_book(b9)
-library.add_book(b10)
-library.add_book(b11)
-library.add_book(b12)
-library.add_book(b13)
-library.add_book(b14)
-library.add_book(b15)
-library.add_book(b16)
-library.add_book(b17)
-library.add_book(b18)  # Duplicate
-library.add_book('Fake_book')
-print('')
-
-print('-------- Показываем основной словарь Книг')
-for k, v in library.lib.items():
-    print(f'{k}: (obj_book) {v.title} - {v.author}')
-print('')
-
-print('-------- Показываем индекс Книг по автору')
-for k, v in library.index_books_by_author.items():
-    print(f'{k}: {v}')
-print('')
-
-#######################################################################
-
-
-print('-------- Создаем Читателей: class Reader(name: str, id: int)')
-r1 = Reader('Alice', 123)
-r2 = Reader('Bob', 456)
-r3 = Reader('Eve', 789)
-r4 = Reader('Eve', 789)  # Duplicate
-r5 = Reader('Trent', 246)
-print('')
-
-print('-------- Регистрируем Читателей в библиотеке: (method) def register_reader(reader: Reader) -> str')
-library.register_reader(r1)
-library.register_reader(r2)
-library.register_reader(r3)
-library.register_reader(r4)  # Duplicate
-library.register_reader(r5)
-library.register_reader('Chuck')
-print('')
-
-print('-------- Показываем основной словарь Читателей')
-for k, v in library.readers.items():
-    print(f'{k}: (obj_reader) {v.name}')
-print('')
-
-print('-------- Показываем индекс Читателей по имени')
-for k, v in library.index_readers_by_name.items():
-    print(f'{k}: {v}')
-print('')
-
-#######################################################################
-
-
-print('-------- Выдаем Книги Читателям: (method) def borrow_book(title: str, reader: str) -> str')
-library.borrow_book('FastAPI', 'Alice')
-library.borrow_book('Простой Python', 'Alice')
-library.borrow_book('Чистый код', 'Alice')
-library.borrow_book('Идеальная работа', 'Alice')
-library.borrow_book('Alice in Wonderland', 'Bob')
-library.borrow_book('Изучаем Python', 'Bob')
-library.borrow_book('Python Карманный справочник', 'Bob')
-library.borrow_book('ES6 и не только', 'Bob')
-library.borrow_book('Yeah! Yeah! Yeah!', 'Eve')
-library.borrow_book('Познакомьтесь, JavaScript', 'Eve')
-library.borrow_book('Изучаем SQL', 'Eve')
-library.borrow_book('Django 4 в примерах', 'Eve')
-library.borrow_book('Linux Книга рецептов', 'Alice')
-library.borrow_book('jQuery в действии', 'Bob')
-library.borrow_book('Внутреннее устройство Linux', 'Eve')
-library.borrow_book('Внутреннее устройство Linux', 'Bob')  # !
-library.borrow_book('Идеальный программист', 'Chukc')  # Fake
-library.borrow_book('Замыкания и объекты', 'Eve')
-library.borrow_book('Идеальный программист', 'Bob')
-print('')
-
-print('-------- Читатели возвращают книги: (method) def return_book(title: Any, reader: Any) -> str')
-library.return_book('Python Карманный справочник', 'Bob')
-library.return_book('Чистый код', 'Alice')
-library.return_book('Django 4 в примерах', 'Eve')
-library.return_book('Идеальный программист', 'Eve')  # Fake
-library.return_book('Идеальный программист', 'Chukc')  # Fake
-library.return_book('Fake book', 'Chukc')  # Fake
-print('')
-
-print('-------- Проверяем статус книг: (method) def get_book_status(title: str) -> str')
-library.get_book_status("Чистый код")
-print('')
-library.get_book_status("Идеальная работа")
+def main() -> None:
+    print('-------- Создаем Библиотеку: class Library(limit: int)')
+    library = LibraryConsole(Library(4))
+    print('')
+
+    print('-------- Создаем Книги: class Book(title: str, author: str, id: int)')
+    b1 = Book("FastAPI", "Билл Любанович", 1)
+    b2 = Book("Простой Python", "Билл Любанович", 2)
+    b3 = Book("Чистый код", "Роберт Мартин", 3)
+    b4 = Book("Идеальная работа", "Роберт Мартин", 4)
+    b5 = Book("Идеальный программист", "Роберт Мартин", 5)
+    b6 = Book("Изучаем Python", "Марк Лутц", 6)
+    b7 = Book("Python Карманный справочник", "Марк Лутц", 7)
+    b8 = Book("ES6 и не только", "Кайл Симпсон", 8)
+    b9 = Book("Замыкания и объекты", "Кайл Симпсон", 9)
+    b10 = Book("Познакомьтесь, JavaScript", "Кайл Симпсон", 10)
+    b11 = Book("Изучаем SQL", "Алан Бьюли", 11)
+    b12 = Book("Django 4 в примерах", "Антонио Меле", 12)
+    b13 = Book("Linux Книга рецептов", "Карла Шрёдер", 13)
+    b14 = Book("jQuery в действии", "Аурелио де Роза", 14)
+    b15 = Book("Внутреннее устройство Linux", "Дмитрий Кетов", 15)
+    b16 = Book("Alice in Wonderland", "Льюис Кэрролл", 16)
+    b17 = Book("Yeah! Yeah! Yeah!", "Bob Stanley", 17)
+    b18 = Book("Yeah! Yeah! Yeah!", "Bob Stanley", 17)  # Duplicate
+    print('')
+
+    print('-------- Регистрируем Книги в библиотеке: (method) def add_book(book: Book) -> str')
+    library.add_book(b1)
+    library.add_book(b2)
+    library.add_book(b3)
+    library.add_book(b4)
+    library.add_book(b5)
+    library.add_book(b6)
+    library.add_book(b7)
+    library.add_book(b8)
+    library.add_book(b9)
+    library.add_book(b10)
+    library.add_book(b11)
+    library.add_book(b12)
+    library.add_book(b13)
+    library.add_book(b14)
+    library.add_book(b15)
+    library.add_book(b16)
+    library.add_book(b17)
+    library.add_book(b18)  # Duplicate
+    library.add_book('Fake_book')
+    print('')
+
+    print('-------- Показываем основной словарь Книг')
+    for k, v in library.lib.items():
+        print(f'{k}: (obj_book) {v.title} - {v.author}')
+    print('')
+
+    print('-------- Показываем индекс Книг по автору')
+    for k, v in library.index_books_by_author.items():
+        print(f'{k}: {list(v)}')
+    print('')
+
+    #######################################################################
+
+    print('-------- Создаем Читателей: class Reader(name: str, id: int)')
+    r1 = Reader('Alice', 123)
+    r2 = Reader('Bob', 456)
+    r3 = Reader('Eve', 789)
+    r4 = Reader('Eve', 789)  # Duplicate
+    r5 = Reader('Trent', 246)
+    print('')
+
+    print('-------- Регистрируем Читателей в библиотеке: (method) def register_reader(reader: Reader) -> str')
+    library.register_reader(r1)
+    library.register_reader(r2)
+    library.register_reader(r3)
+    library.register_reader(r4)  # Duplicate
+    library.register_reader(r5)
+    library.register_reader('Chuck')
+    print('')
+
+    print('-------- Показываем основной словарь Читателей')
+    for k, v in library.readers.items():
+        print(f'{k}: (obj_reader) {v.name}')
+    print('')
+
+    print('-------- Показываем индекс Читателей по имени')
+    for k, v in library.index_readers_by_name.items():
+        print(f'{k}: {v}')
+    print('')
+
+    #######################################################################
+
+    print('-------- Выдаем Книги Читателям: (method) def borrow_book(title: str, reader: str) -> str')
+    library.borrow_book('FastAPI', 'Alice')
+    library.borrow_book('Простой Python', 'Alice')
+    library.borrow_book('Чистый код', 'Alice')
+    library.borrow_book('Идеальная работа', 'Alice')
+    library.borrow_book('Alice in Wonderland', 'Bob')
+    library.borrow_book('Изучаем Python', 'Bob')
+    library.borrow_book('Python Карманный справочник', 'Bob')
+    library.borrow_book('ES6 и не только', 'Bob')
+    library.borrow_book('Yeah! Yeah! Yeah!', 'Eve')
+    library.borrow_book('Познакомьтесь, JavaScript', 'Eve')
+    library.borrow_book('Изучаем SQL', 'Eve')
+    library.borrow_book('Django 4 в примерах', 'Eve')
+    library.borrow_book('Linux Книга рецептов', 'Alice')
+    library.borrow_book('jQuery в действии', 'Bob')
+    library.borrow_book('Внутреннее устройство Linux', 'Eve')
+    library.borrow_book('Внутреннее устройство Linux', 'Bob')  # !
+    library.borrow_book('Идеальный программист', 'Chukc')  # Fake
+    library.borrow_book('Замыкания и объекты', 'Eve')
+    library.borrow_book('Идеальный программист', 'Bob')
+    print('')
+
+    print('-------- Читатели возвращают книги: (method) def return_book(title: Any, reader: Any) -> str')
+    library.return_book('Python Карманный справочник', 'Bob')
+    library.return_book('Чистый код', 'Alice')
+    library.return_book('Django 4 в примерах', 'Eve')
+    library.return_book('Идеальный программист', 'Eve')  # Fake
+    library.return_book('Идеальный программист', 'Chukc')  # Fake
+    library.return_book('Fake book', 'Chukc')  # Fake
+    print('')
+
+    print('-------- Ищем книги и читателей: (method) def search_book(prompt: str) -> SearchResult')
+    # Ответ спрашивается только при запуске из терминала, чтобы демонстрация шла и без ввода.
+    answer = input('Показать список книг читателя Alice (Y/n): ').lower() if sys.stdin.isatty() else 'y'
+    library.search_book('Alice', answer in ('y', ''))
+    print('')
+
+    print('-------- Проверяем статус книг: (method) def get_book_status(title: str) -> str')
+    library.get_book_status("Чистый код")
+    print('')
+    library.get_book_status("Идеальная работа")
+    print('')
+
+    print('-------- Показываем все выданные книги: (method) def iter_outstanding_loans()')
+    for b, r in library.iter_outstanding_loans():
+        print(f'{b.id}: {b.title} - {r.name}')
+    print('')
+
+    print('-------- Пакетная выдача и возврат книг: (method) def borrow_many(pairs) -> list')
+    for r in library.return_many([('FastAPI', 'Alice'), ('Изучаем SQL', 'Eve')]):
+        print(f'{r.book.title}: {r.status.value}')
+    for r in library.borrow_many([('Чистый код', 'Eve'), ('FastAPI', 'Trent'), ('FastAPI', 'Bob')]):
+        print(f'{r.book.title}: {r.status.value}')
+    print('')
+
+    print('-------- Несколько экземпляров одной книги: (method) def get_availability(title: str) -> Availability')
+    library.add_book(Book("FastAPI", "Билл Любанович", 18))
+    library.show_availability("FastAPI")
+    for r in library.borrow_many([('FastAPI', 'Trent'), ('FastAPI', 'Bob')]):
+        print(f'{r.book.id}: {r.book.title} - {r.status.value}')
+    library.show_availability("FastAPI")
+    print('')
+
+    print('-------- Очередь бронирования: (method) def place_hold(title: str, reader: str, priority: int = 0) -> Result')
+    library.place_hold('FastAPI', 'Alice')
+    library.place_hold('FastAPI', 'Eve', priority=1)
+    library.place_hold('FastAPI', 'Alice')  # Duplicate
+    print(f'Место Alice в очереди: {library.get_hold_position("FastAPI", "Alice")}')
+    library.return_book('FastAPI', 'Trent')
+    print(f'Место Alice в очереди: {library.get_hold_position("FastAPI", "Alice")}')
+    library.return_book('FastAPI', 'Bob')
+    library.show_availability("FastAPI")
+    print('')
+
+    print('-------- Сроки возврата и штрафы: (method) def get_overdue(now: int | None = None) -> list')
+    moment = [0]
+    loans = LibraryConsole(Library(4, loan_days=14, fine_per_day=10, clock=lambda: moment[0]))
+    for b in (Book("Чистый код", "Роберт Мартин", 1), Book("Изучаем SQL", "Алан Бьюли", 2),
+              Book("FastAPI", "Билл Любанович", 3)):
+        loans.library.add_book(b)
+    loans.library.register_reader(Reader('Alice', 123))
+    loans.library.borrow_book('Чистый код', 'Alice')
+    moment[0] = 5 * DAY
+    loans.library.borrow_many([('Изучаем SQL', 'Alice'), ('FastAPI', 'Alice')])
+    moment[0] = 17 * DAY
+    loans.show_overdue()
+    print(f'Срок возврата в ближайшие 3 дня: {[loan.book.id for loan in loans.get_due_within(3)]}')
+    loans.library.return_book('Чистый код', 'Alice')
+    moment[0] = 20 * DAY
+    print(f'Штрафы читателей: {loans.get_fines()}')
+    print('')
+
+    print('-------- История выдач: (method) def get_reader_history(reader: str, start: int, end: int) -> list')
+    for event in loans.get_reader_history('Alice', 0, 10 * DAY):
+        print(f'День {event.time // DAY}: книга {event.book_id} {"возвращена" if event.is_return else "выдана"}')
+    print(f'История книги 1: {[(e.time // DAY, e.is_return) for e in loans.get_book_history(1)]}')
+
+
+if __name__ == '__main__':
+    main()
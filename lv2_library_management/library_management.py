@@ -1,9 +1,50 @@
+import unicodedata
+from enum import Enum
+from itertools import islice
+from typing import NamedTuple
+
+
+class Status(Enum):
+    """Коды результата операций библиотеки."""
+    OK = 'Успешно'
+    NOT_A_BOOK = 'Не является книгой'
+    BOOK_EXISTS = 'Книга уже зарегистрирована в библиотеке'
+    BOOK_NOT_FOUND = 'Книга не зарегистрирована в библиотеке'
+    BOOK_UNAVAILABLE = 'Книга в данный момент у читателя'
+    NOT_BORROWED = 'Ни один экземпляр книги не выдан'
+
+
+class Result(NamedTuple):
+    """Результат одной операции: код и затронутая книга."""
+    status: Status
+    book: object = None
+
+
+class Availability(NamedTuple):
+    """Количество экземпляров издания: всего и в наличии."""
+    total: int
+    available: int
+
+
+def normalize(text: str) -> str:
+    """Возвращает ключ поиска: строка в форме NFKC без учета регистра,
+    с "ё" замененной на "е" и одиночными пробелами между словами."""
+    text = unicodedata.normalize('NFKC', text).casefold().replace('ё', 'е')
+    return ' '.join(text.split())
+
+
+#######################################################################
+
+
 class Book:
+    __slots__ = ('title', 'author', 'status', 'key')
 
     def __init__(self, title: str, author: str, status: bool = True) -> None:
         self.title = title
         self.author = author
         self.status = status
+        # Поисковый ключ считается один раз, а не при каждом поиске.
+        self.key = normalize(f'{title} {author}')
 
     def get_status(self):
         """Возвращает статус книги в удобочитаемом формате.
@@ -27,21 +68,209 @@ class Book:
 #######################################################################
 
 
+class Edition:
+    __slots__ = ('title', 'author', 'copies', 'free', 'borrowed')
+
+    def __init__(self, title: str, author: str) -> None:
+        """Запись об издании: все физические экземпляры одной книги.\n
+        free - стек экземпляров в наличии, из него книга выдается за O(1).
+        borrowed - выданные экземпляры, словарь как упорядоченное множество.
+        Количество экземпляров в наличии - это просто длина стека.
+        Args:
+            title (str): Название книги.
+            author (str): Автор книги.
+        """
+        self.title = title
+        self.author = author
+        self.copies = []
+        self.free = []
+        self.borrowed = dict()
+
+
+#######################################################################
+
+
 class Library:
     def __init__(self) -> None:
         self.lib = []
+        # Нормализованное название -> издание.
+        self.index_books_by_title = dict()
+        # Экземпляры книг в наличии и у читателей: словари как упорядоченные множества.
+        self.books_in_stock = dict()
+        self.books_out_stock = dict()
 
     def is_stock(self, book_obj: Book) -> bool:
-        """Проверяет регистрацию книги.
+        """Проверяет, зарегистрирован ли этот экземпляр книги.
         Args:
             book_obj (Book): Экземпляр объекта Book.
         Returns:
             bool: True или False соответственно.
         """
-        for b in self.lib:
-            if (b.title == book_obj.title):
-                return True
-        return False
+        return book_obj in self.books_in_stock or book_obj in self.books_out_stock
+
+    def set_status_book(self, book_obj: Book, status: bool) -> None:
+        """Устанавливает статус книги и переносит её в соответствующий раздел
+        книг в наличии или выданных читателю.
+        Args:
+            book_obj (Book): Экземпляр объекта Book.
+            status (bool): True - книга в наличии, False - у читателя.
+        """
+        book_obj.status = status
+        if (status):
+            self.books_out_stock.pop(book_obj, None)
+            self.books_in_stock[book_obj] = None
+        else:
+            self.books_in_stock.pop(book_obj, None)
+            self.books_out_stock[book_obj] = None
+
+    def register_copy(self, book_obj: Book) -> None:
+        """Добавляет экземпляр к изданию с тем же названием, создавая издание при необходимости.
+        Args:
+            book_obj (Book): Экземпляр объекта Book.
+        """
+        title_key = normalize(book_obj.title)
+        edition = self.index_books_by_title.get(title_key)
+        if (edition is None):
+            edition = self.index_books_by_title[title_key] = Edition(book_obj.title, book_obj.author)
+        edition.copies.append(book_obj)
+        if (book_obj.status):
+            edition.free.append(book_obj)
+        else:
+            edition.borrowed[book_obj] = None
+        self.set_status_book(book_obj, book_obj.status)
+
+    def add_book(self, book_obj: Book) -> Result:
+        """Добавляет экземпляр книги в библиотеку. Экземпляры с одинаковым
+        названием становятся копиями одного издания.
+        Args:
+            book_obj (Book): Экземпляр объекта Book.
+        Returns:
+            Result: Результат процедуры регистрации книги.
+        """
+        if (not isinstance(book_obj, Book)):
+            return Result(Status.NOT_A_BOOK)
+        elif (self.is_stock(book_obj)):
+            return Result(Status.BOOK_EXISTS, book_obj)
+        self.lib.append(book_obj)
+        self.register_copy(book_obj)
+        return Result(Status.OK, book_obj)
+
+    def add_books(self, books) -> int:
+        """Добавляет в библиотеку сразу много книг.
+        Уже зарегистрированные экземпляры пропускаются.
+        Args:
+            books (Iterable[Book]): Последовательность экземпляров объекта Book.
+        Returns:
+            int: Количество зарегистрированных книг.
+        """
+        added = []
+        for b in books:
+            if (isinstance(b, Book) and not self.is_stock(b)):
+                self.register_copy(b)
+                added.append(b)
+        self.lib.extend(added)
+        return len(added)
+
+    def get_availability(self, title_book: str) -> Availability:
+        """Возвращает количество экземпляров издания. Счетчики не
+        пересчитываются, а берутся из пулов издания.
+        Args:
+            title_book (str): Строка с название книги.
+        Returns:
+            Availability: Всего экземпляров и в наличии, нули если издания нет.
+        """
+        edition = self.index_books_by_title.get(normalize(title_book))
+        if (edition is None):
+            return Availability(0, 0)
+        return Availability(len(edition.copies), len(edition.free))
+
+    def out_book(self, title_book: str) -> Result:
+        """Выдает пользователю любой экземпляр книги из имеющихся в наличии.
+        Args:
+            title_book (str): Строка с название книги.
+        Returns:
+            Result: Результат процедуры выдачи книги.
+        """
+        edition = self.index_books_by_title.get(normalize(title_book))
+        if (edition is None):
+            return Result(Status.BOOK_NOT_FOUND)
+        elif (not edition.free):
+            return Result(Status.BOOK_UNAVAILABLE, edition.copies[0])
+        b = edition.free.pop()
+        edition.borrowed[b] = None
+        self.set_status_book(b, False)
+        return Result(Status.OK, b)
+
+    def return_book(self, title_book: str) -> Result:
+        """Возвращает в библиотеку один из выданных экземпляров книги.
+        Args:
+            title_book (str): Строка с название книги.
+        Returns:
+            Result: Результат процедуры возврата книги.
+        """
+        edition = self.index_books_by_title.get(normalize(title_book))
+        if (edition is None):
+            return Result(Status.BOOK_NOT_FOUND)
+        elif (not edition.borrowed):
+            return Result(Status.NOT_BORROWED, edition.copies[0])
+        b, _ = edition.borrowed.popitem()
+        edition.free.append(b)
+        self.set_status_book(b, True)
+        return Result(Status.OK, b)
+
+    def search_book(self, prompt: str) -> list:
+        """Ищет книгу среди всех зарегистрированных по названию или автору.\n
+        Не чувствителен к регистру.\n
+        Args:
+            prompt (str): Строка содержащая название книги или автора.
+        Returns:
+            list: Список найденных экземпляров класса Book.
+        """
+        query = normalize(prompt)
+        return [b for b in self.lib if query in b.key]
+
+    def iter_nomenclature(self, status: bool = None):
+        """Перебирает книги только из запрошенного раздела, не собирая список.
+        Args:
+            status (bool, optional): None - все книги, True - в наличии,
+            False - выданные читателю.
+        Returns:
+            Iterator[Book]: Итератор по книгам раздела.
+        """
+        if (status):
+            return iter(self.books_in_stock)
+        elif (status is False):
+            return iter(self.books_out_stock)
+        else:
+            return iter(self.lib)
+
+    def get_page_nomenclature(self, status: bool = None, page: int = 1, size: int = 10) -> list:
+        """Возвращает одну страницу списка книг выбранного раздела.
+        Args:
+            status (bool, optional): Флаг раздела, как в show_nomenclature.
+            page (int, optional): Номер страницы начиная с 1. Defaults to 1.
+            size (int, optional): Количество книг на странице. Defaults to 10.
+        Returns:
+            list: Список экземпляров класса Book на запрошенной странице.
+        """
+        start = (page - 1) * size
+        return list(islice(self.iter_nomenclature(status), start, start + size))
+
+
+#######################################################################
+
+
+class LibraryConsole:
+    def __init__(self, library: Library) -> None:
+        """Слой представления: выполняет операции библиотеки и распечатывает
+        их результат. Остальные атрибуты и методы берутся у самой библиотеки.
+        Args:
+            library (Library): Экземпляр объекта Library.
+        """
+        self.library = library
+
+    def __getattr__(self, name: str):
+        return getattr(self.library, name)
 
     def print_list_book(self, list_books: list) -> None:
         """Распечатывает список книг в формате:\n
@@ -54,76 +283,95 @@ class Library:
         for b in list_books:
             b.print_info_book()
 
-    def add_book(self, book_obj: Book) -> None:
-        """Добавляет книгу в библиотеку.
+    def add_book(self, book_obj: Book) -> Result:
+        """Добавляет книгу в библиотеку и распечатывает результат.
         Args:
             book_obj (Book): Экземпляр объекта Book.
+        Returns:
+            Result: Результат процедуры регистрации книги.
         """
-        if (isinstance(book_obj, Book) and not self.is_stock(book_obj)):
-            self.lib.append(book_obj)
+        result = self.library.add_book(book_obj)
+        if (result.status is Status.OK):
             print('Книга была успешно зарегистрирована в библиотеке.')
             self.print_list_book([book_obj])
+        return result
 
-    def out_book(self, title_book: str) -> None:
-        """Выдает книгу пользователю.
+    def add_books(self, books) -> int:
+        """Добавляет в библиотеку сразу много книг и печатает их количество.
+        Args:
+            books (Iterable[Book]): Последовательность экземпляров объекта Book.
+        Returns:
+            int: Количество зарегистрированных книг.
+        """
+        count = self.library.add_books(books)
+        print(f'Книг зарегистрировано в библиотеке: {count}')
+        return count
+
+    def out_book(self, title_book: str) -> Result:
+        """Выдает книгу пользователю и распечатывает результат.
         Args:
             title_book (str): Строка с название книги.
+        Returns:
+            Result: Результат процедуры выдачи книги.
         """
-        for b in self.lib:
-            if (b.title == title_book and b.status):
-                b.status = False
-                print('Книга была выдана читателю.')
-                self.print_list_book([b])
-                return
-            elif (b.title == title_book and not b.status):
-                print('Книга в данный момент у читателя.')
-                self.print_list_book([b])
-                return
-        print(f'Книга с названием "{
-            title_book}" не зарегистрирована в библиотеке.')
-
-    def return_book(self, title_book: str) -> None:
-        """Возвращает книгу в библиотеку.
+        result = self.library.out_book(title_book)
+        if (result.status is Status.BOOK_NOT_FOUND):
+            print(f'Книга с названием "{
+                title_book}" не зарегистрирована в библиотеке.')
+            return result
+        elif (result.status is Status.OK):
+            print('Книга была выдана читателю.')
+        else:
+            print('Книга в данный момент у читателя.')
+        self.print_list_book([result.book])
+        return result
+
+    def return_book(self, title_book: str) -> Result:
+        """Возвращает книгу в библиотеку и распечатывает результат.
         Args:
             title_book (str): Строка с название книги.
+        Returns:
+            Result: Результат процедуры возврата книги.
         """
-        for b in self.lib:
-            if (b.title == title_book):
-                b.status = True
-                print('Книга была возвращена в библиотеку.')
-                self.print_list_book([b])
-                return
-        print(f'Книга с названием "{
-            title_book}" не зарегистрирована в библиотеке.')
+        result = self.library.return_book(title_book)
+        if (result.status is Status.OK):
+            print('Книга была возвращена в библиотеку.')
+            self.print_list_book([result.book])
+        elif (result.status is Status.NOT_BORROWED):
+            print(f'Ни один экземпляр книги "{result.book.title}" не выдан читателям.')
+        else:
+            print(f'Книга с названием "{
+                title_book}" не зарегистрирована в библиотеке.')
+        return result
 
-    def search_book(self, prompt: str) -> None:
-        """Ищет книгу среди всех зарегистрированных по названию или автору.\n
-        Не чувствителен к регистру.\n
+    def search_book(self, prompt: str) -> list:
+        """Ищет книгу по названию или автору и распечатывает результат.
         Args:
             prompt (str): Строка содержащая название книги или автора.
+        Returns:
+            list: Список найденных экземпляров класса Book.
         """
-        match_count = 0
-        match_list = []
-        for b in self.lib:
-            current_book = f'{b.title} {b.author}'
-            if (prompt.lower() in current_book.lower()):
-                match_count += 1
-                match_list.append(b)
-        print(f"Найдено {match_count} совпадений")
+        match_list = self.library.search_book(prompt)
+        print(f"Найдено {len(match_list)} совпадений")
         self.print_list_book(match_list)
+        return match_list
+
+    def show_availability(self, title_book: str) -> Availability:
+        """Распечатывает количество экземпляров книги всего и в наличии.
+        Args:
+            title_book (str): Строка с название книги.
+        Returns:
+            Availability: Количество экземпляров.
+        """
+        availability = self.library.get_availability(title_book)
+        print(f'Экземпляров книги "{title_book}": {availability.total}, в наличии: {availability.available}')
+        return availability
 
     def show_status_library(self) -> None:
         """Отображает текущее состояние всех книг в библиотеке."""
-        in_stock = 0
-        out_stock = 0
-        for b in self.lib:
-            if (b.status):
-                in_stock += 1
-            else:
-                out_stock += 1
-        print(f'Книг всего зарегистрировано: {len(self.lib)}')
-        print(f'Книг в наличии: {in_stock}')
-        print(f'Книг выдано читателю: {out_stock}')
+        print(f'Книг всего зарегистрировано: {len(self.library.lib)}')
+        print(f'Книг в наличии: {len(self.library.books_in_stock)}')
+        print(f'Книг выдано читателю: {len(self.library.books_out_stock)}')
 
     def show_nomenclature(self, status: bool = None) -> None:
         """Распечатывает тот или иной список книг в зависимости от аргумента.\n
@@ -134,49 +382,51 @@ class Library:
             status (bool, optional): Флаг обозначающий тот или иной список.
         """
         print(f"==>> status: {status}")
-        in_stock = []
-        out_stock = []
-        for b in self.lib:
-            if (b.status):
-                in_stock.append(b)
-            else:
-                out_stock.append(b)
         if (status):
-            print(f'Книги в наличии: {len(in_stock)}')
-            self.print_list_book(in_stock)
+            print(f'Книги в наличии: {len(self.library.books_in_stock)}')
         elif (status is False):
-            print(f'Книги выданные читателю: {len(out_stock)}')
-            self.print_list_book(out_stock)
+            print(f'Книги выданные читателю: {len(self.library.books_out_stock)}')
         else:
-            print(f'Книг всего зарегистрировано: {len(self.lib)}')
-            self.print_list_book(self.lib)
-
+            print(f'Книг всего зарегистрировано: {len(self.library.lib)}')
+        self.print_list_book(self.library.iter_nomenclature(status))
 
 #######################################################################
-b1 = Book("FastAPI", "Билл Любанович")
-b2 = Book("Простой Python", "Билл Любанович")
-b3 = Book("Чистый код", "Роберт Мартин")
-b4 = Book("Идеальная работа", "Роберт Мартин")
-b5 = Book("Идеальный программист", "Роберт Мартин")
-b6 = Book("Изучаем Python", "Марк Лутц")
-b7 = Book("Python Карманный справочник", "Марк Лутц")
-b8 = Book("Linux Книга рецептов", "Карла Шрёдер")
-b9 = Book("Внутреннее устройство Linux", "Дмитрий Кетов")
-b10 = Book("Django 4 в примерах", "Антонио Меле")
-b11 = Book("Django 4 в примерах", "Антонио Меле")
-
-library = Library()
-
-library.add_book(b1)
-library.add_book(b2)
-library.add_book(b3)
-library.add_book(b4)
-library.add_book(b5)
-library.add_book(b6)
-library.add_book(b7)
-library.add_book(b8)
-library.add_book(b9)
-library.add_book(b10)
-library.add_book(b11)
-
-library.show_status_library()
+
+
+def main() -> None:
+    b1 = Book("FastAPI", "Билл Любанович")
+    b2 = Book("Простой Python", "Билл Любанович")
+    b3 = Book("Чистый код", "Роберт Мартин")
+    b4 = Book("Идеальная работа", "Роберт Мартин")
+    b5 = Book("Идеальный программист", "Роберт Мартин")
+    b6 = Book("Изучаем Python", "Марк Лутц")
+    b7 = Book("Python Карманный справочник", "Марк Лутц")
+    b8 = Book("Linux Книга рецептов", "Карла Шрёдер")
+    b9 = Book("Внутреннее устройство Linux", "Дмитрий Кетов")
+    b10 = Book("Django 4 в примерах", "Антонио Меле")
+    b11 = Book("Django 4 в примерах", "Антонио Меле")
+
+    library = LibraryConsole(Library())
+
+    library.add_book(b1)
+    library.add_book(b2)
+    library.add_book(b3)
+    library.add_book(b4)
+    library.add_book(b5)
+    library.add_book(b6)
+    library.add_book(b7)
+    library.add_book(b8)
+    library.add_book(b9)
+    library.add_book(b10)
+    library.add_book(b11)
+    library.add_book(b11)
+
+    library.show_availability("Django 4 в примерах")
+    library.out_book("Django 4 в примерах")
+    library.show_availability("Django 4 в примерах")
+
+    library.show_status_library()
+
+
+if __name__ == '__main__':
+    main()
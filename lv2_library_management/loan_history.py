@@ -0,0 +1,163 @@
+from array import array
+from bisect import bisect_left
+from typing import NamedTuple
+
+
+class LoanEvent(NamedTuple):
+    """Событие истории выдач: момент, ID книги, ID читателя и признак возврата."""
+
+    time: int
+    book_id: int
+    reader_id: int
+    is_return: bool
+
+
+class LoanHistory:
+
+    SEGMENT_SIZE = 65_536
+
+    def __init__(self) -> None:
+        """История выдач и возвратов книг, только на дозапись.\n
+        События хранятся сегментами по SEGMENT_SIZE в колонках array:
+        момент, ID книги, ID читателя и признак возврата - 25 байт на
+        событие вместо отдельного объекта. События идут по времени, поэтому
+        диапазон времени находится бинарным поиском. Индексы по читателю и
+        по книге хранят номера событий в array, строятся при первом запросе
+        и после этого дополняются при каждой записи.
+        """
+
+        self.segments = []
+        self.size = 0
+        self.last_time = None
+        self.by_reader = None
+        self.by_book = None
+
+    def __len__(self) -> int:
+        return self.size
+
+    def append(self, moment: int, book_id: int, reader_id: int, is_return: bool) -> None:
+        """Дописывает событие в конец истории.
+        Если часы отстали от последнего события, событие получает его
+        момент, чтобы история оставалась упорядоченной по времени.
+        Args:
+            moment (int): Момент события в секундах.
+            book_id (int): Уникальный идентификатор книги.
+            reader_id (int): Уникальный идентификатор читателя.
+            is_return (bool): True - возврат, False - выдача.
+        """
+
+        if not self.segments or len(self.segments[-1][0]) == self.SEGMENT_SIZE:
+            self.segments.append((array('q'), array('q'), array('q'), array('b')))
+
+        if self.last_time is not None and moment < self.last_time:
+            moment = self.last_time
+        self.last_time = moment
+
+        times, book_ids, reader_ids, returns = self.segments[-1]
+        times.append(moment)
+        book_ids.append(book_id)
+        reader_ids.append(reader_id)
+        returns.append(is_return)
+
+        if self.by_reader is not None:
+            self.by_reader.setdefault(reader_id, array('q')).append(self.size)
+            self.by_book.setdefault(book_id, array('q')).append(self.size)
+        self.size += 1
+
+    def extend_columns(self, times, book_ids, reader_ids, returns) -> None:
+        """Дописывает упорядоченные по времени события готовыми колонками,
+        например из снимка. Колонки копируются в сегменты срезами, а индексы
+        будут построены заново при следующем запросе.
+        Args:
+            times (Sequence[int]): Моменты событий.
+            book_ids (Sequence[int]): ID книг.
+            reader_ids (Sequence[int]): ID читателей.
+            returns (Sequence[int]): 1 - возврат, 0 - выдача.
+        """
+
+        position = 0
+        while position < len(times):
+            if not self.segments or len(self.segments[-1][0]) == self.SEGMENT_SIZE:
+                self.segments.append((array('q'), array('q'), array('q'), array('b')))
+            segment = self.segments[-1]
+            end = position + min(self.SEGMENT_SIZE - len(segment[0]), len(times) - position)
+            for column, values in zip(segment, (times, book_ids, reader_ids, returns)):
+                column.extend(values[position:end])
+            position = end
+
+        if len(times):
+            self.size += len(times)
+            self.last_time = times[-1]
+            self.by_reader = None
+            self.by_book = None
+
+    def get_time(self, position: int) -> int:
+        segment, offset = divmod(position, self.SEGMENT_SIZE)
+        return self.segments[segment][0][offset]
+
+    def get_event(self, position: int) -> LoanEvent:
+        """Собирает событие номер position из колонок сегмента."""
+
+        segment, offset = divmod(position, self.SEGMENT_SIZE)
+        times, book_ids, reader_ids, returns = self.segments[segment]
+        return LoanEvent(times[offset], book_ids[offset], reader_ids[offset], bool(returns[offset]))
+
+    def build_indexes(self) -> None:
+        """Строит индексы номеров событий по читателю и по книге."""
+
+        self.by_reader = dict()
+        self.by_book = dict()
+        position = 0
+        for _, book_ids, reader_ids, _ in self.segments:
+            for book_id, reader_id in zip(book_ids, reader_ids):
+                self.by_reader.setdefault(reader_id, array('q')).append(position)
+                self.by_book.setdefault(book_id, array('q')).append(position)
+                position += 1
+
+    def select(self, positions, start: int | None, end: int | None) -> list:
+        """Возвращает события из упорядоченных номеров positions в промежутке [start, end).
+        Границы находятся бинарным поиском по моменту события.
+        """
+
+        lo = 0 if start is None else bisect_left(positions, start, key=self.get_time)
+        hi = len(positions) if end is None else bisect_left(positions, end, lo, key=self.get_time)
+        return [self.get_event(positions[i]) for i in range(lo, hi)]
+
+    def get_events(self, start: int | None = None, end: int | None = None) -> list:
+        """Возвращает все события в промежутке времени [start, end).
+        Args:
+            start (int | None, optional): Начало промежутка в секундах. Defaults to None - с начала.
+            end (int | None, optional): Конец промежутка в секундах. Defaults to None - до конца.
+        Returns:
+            list: Список LoanEvent по времени.
+        """
+
+        return self.select(range(self.size), start, end)
+
+    def get_reader_events(self, reader_id: int, start: int | None = None, end: int | None = None) -> list:
+        """Возвращает события читателя в промежутке времени [start, end).
+        Args:
+            reader_id (int): Уникальный идентификатор читателя.
+            start (int | None, optional): Начало промежутка в секундах. Defaults to None - с начала.
+            end (int | None, optional): Конец промежутка в секундах. Defaults to None - до конца.
+        Returns:
+            list: Список LoanEvent по времени.
+        """
+
+        if self.by_reader is None:
+            self.build_indexes()
+        return self.select(self.by_reader.get(reader_id, ()), start, end)
+
+    def get_book_events(self, book_id: int, start: int | None = None, end: int | None = None) -> list:
+        """Возвращает события книги в промежутке времени [start, end).
+        Args:
+            book_id (int): Уникальный идентификатор книги.
+            start (int | None, optional): Начало промежутка в секундах. Defaults to None - с начала.
+            end (int | None, optional): Конец промежутка в секундах. Defaults to None - до конца.
+        Returns:
+            list: Список LoanEvent по времени.
+        """
+
+        if self.by_book is None:
+            self.build_indexes()
+        return self.select(self.by_book.get(book_id, ()), start, end)
@@ -0,0 +1,351 @@
+import heapq
+import os
+import sys
+from multiprocessing import Pipe, Process
+from typing import NamedTuple
+
+from .library_manag_revol import Book, Library, Reader, SearchResult, Status, normalize
+
+
+class ShardResult(NamedTuple):
+    """Результат операции шардированной библиотеки: статус, книга и номер шарда."""
+
+    status: Status
+    book_id: int | None = None
+    shard: int | None = None
+
+
+class BookInfo(NamedTuple):
+    """Копия книги, переданная из процесса шарда."""
+
+    id: int
+    title: str
+    author: str
+    status: bool
+    borrower: str | None
+
+
+def describe_book(book: Book) -> BookInfo:
+    """Переводит книгу шарда в BookInfo, чтобы не пересылать весь граф объектов."""
+
+    borrower = book.borrower
+    return BookInfo(book.id, book.title, book.author, book.status,
+                    None if borrower is None else borrower.name)
+
+
+def shard_add_books(library: Library, rows: list) -> list:
+    """Добавляет книги в шард и возвращает номера отклоненных строк."""
+
+    return [i for i, row in enumerate(rows) if library.add_book(Book(*row)).status is not Status.OK]
+
+
+def shard_register_reader(library: Library, name: str, id: int) -> Status:
+    return library.register_reader(Reader(name, id)).status
+
+
+def shard_borrow_book(library: Library, title: str, reader: str) -> tuple:
+    result = library.borrow_book(title, reader)
+    return result.status, None if result.book is None else result.book.id
+
+
+def shard_return_book(library: Library, title: str, reader: str) -> tuple:
+    result = library.return_book(title, reader)
+    return result.status, None if result.book is None else result.book.id
+
+
+def shard_search_many(library: Library, prompts: list) -> list:
+    found = []
+    for prompt in prompts:
+        result = library.search_book(prompt)
+        found.append((
+            [describe_book(book) for book in result.by_title],
+            [describe_book(book) for book in result.by_author],
+        ))
+    return found
+
+
+COMMANDS = {
+    'add_books': shard_add_books,
+    'register_reader': shard_register_reader,
+    'borrow_book': shard_borrow_book,
+    'return_book': shard_return_book,
+    'search_many': shard_search_many,
+}
+
+
+def run_shard(connection) -> None:
+    """Цикл процесса шарда: принимает (команда, аргументы) и отправляет ответ.\n
+    Лимит выдачи в шарде не ограничен - его проверяет координатор, который
+    видит выдачи читателя во всех шардах.
+    """
+
+    library = Library(sys.maxsize)
+    while (message := connection.recv()) is not None:
+        command, args = message
+        connection.send(COMMANDS[command](library, *args))
+    connection.close()
+
+
+class ShardedLibrary:
+
+    CHUNK = 50_000
+
+    def __init__(self, limit: int, shards: int | None = None) -> None:
+        """Библиотека, разделенная между процессами по хешу id книги.\n
+        Каждый процесс держит свою Library с частью книг и копией реестра
+        читателей. Координатор хранит таблицу маршрутизации название ->
+        id книг и выдачи читателей, поэтому выдача и возврат идут в один
+        шард, лимит выдачи проверяется глобально, а поиск рассылается
+        всем шардам и собирается обратно. Свободные экземпляры названия
+        координатор держит в min-куче ID, как и Library, и отправляет выдачу
+        в шард наименьшего свободного ID.
+        Args:
+            limit (int): Количество книг которое можно выдать одному читателю.
+            shards (int | None, optional): Количество процессов. Defaults to None - по числу ядер.
+        """
+
+        self.rental_limit = limit
+        self.connections = []
+        self.processes = []
+        self.readers = dict()
+        self.index_books_by_title = dict()
+        self.index_free_copies = dict()
+        self.index_readers_by_name = dict()
+        self.loans = dict()
+
+        for _ in range(shards or os.cpu_count() or 1):
+            parent, child = Pipe()
+            process = Process(target=run_shard, args=(child,), daemon=True)
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+
+    def __enter__(self) -> 'ShardedLibrary':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def get_shard(self, book_id: int) -> int:
+        return hash(book_id) % len(self.connections)
+
+    def call(self, shard: int, command: str, *args):
+        """Отправляет команду одному шарду и ждет ответ."""
+
+        connection = self.connections[shard]
+        connection.send((command, args))
+        return connection.recv()
+
+    def scatter(self, requests: dict) -> dict:
+        """Отправляет команды нескольким шардам сразу и собирает ответы.
+        Args:
+            requests (dict): Словарь номер шарда -> (команда, аргументы).
+        Returns:
+            dict: Словарь номер шарда -> ответ.
+        """
+
+        for shard, request in requests.items():
+            self.connections[shard].send(request)
+        return {shard: self.connections[shard].recv() for shard in requests}
+
+    def add_books(self, books) -> int:
+        """Добавляет книги пачками, распределяя их по шардам. Шарды
+        загружают свои пачки параллельно.
+        Args:
+            books (Iterable[Book]): Книги для регистрации.
+        Returns:
+            int: Количество добавленных книг.
+        """
+
+        added = 0
+        pending = []
+
+        for book in books:
+            if isinstance(book, Book):
+                pending.append(book)
+            if len(pending) == self.CHUNK:
+                added += self.load_chunk(pending)
+                pending.clear()
+        return added + self.load_chunk(pending)
+
+    def load_chunk(self, books: list) -> int:
+        """Рассылает пачку книг по шардам и дополняет таблицу маршрутизации
+        в исходном порядке, пропуская книги, которые шарды отклонили."""
+
+        rows = dict()
+        positions = dict()
+        for position, book in enumerate(books):
+            shard = self.get_shard(book.id)
+            rows.setdefault(shard, []).append((book.title, book.author, book.id))
+            positions.setdefault(shard, []).append(position)
+
+        answers = self.scatter({shard: ('add_books', (chunk,)) for shard, chunk in rows.items()})
+        rejected = {positions[shard][i] for shard, failed in answers.items() for i in failed}
+
+        for position, book in enumerate(books):
+            if position not in rejected:
+                self.index_book(book)
+        return len(books) - len(rejected)
+
+    def add_book(self, book: Book) -> ShardResult:
+        """Добавляет книгу в шард, которому принадлежит ее id.
+        Args:
+            book (Book): Экземпляр класса Book.
+        Returns:
+            ShardResult: Результат процедуры регистрации книги.
+        """
+
+        if not isinstance(book, Book):
+            return ShardResult(Status.NOT_A_BOOK)
+
+        shard = self.get_shard(book.id)
+        if self.call(shard, 'add_books', [(book.title, book.author, book.id)]):
+            return ShardResult(Status.BOOK_EXISTS, book.id, shard)
+
+        self.index_book(book)
+        return ShardResult(Status.OK, book.id, shard)
+
+    def index_book(self, book: Book) -> None:
+        """Вносит принятую шардом книгу в таблицу маршрутизации и пул свободных экземпляров."""
+
+        title_key = book.title_key
+        self.index_books_by_title.setdefault(title_key, dict())[book.id] = None
+        heapq.heappush(self.index_free_copies.setdefault(title_key, []), book.id)
+
+    def register_reader(self, reader: Reader) -> ShardResult:
+        """Регистрирует читателя во всех шардах.
+        Args:
+            reader (Reader): Экземпляр класса Reader.
+        Returns:
+            ShardResult: Результат процедуры регистрации читателя.
+        """
+
+        if not isinstance(reader, Reader):
+            return ShardResult(Status.NOT_A_READER)
+
+        if reader.id in self.readers:
+            return ShardResult(Status.READER_EXISTS)
+
+        args = (reader.name, reader.id)
+        self.scatter({shard: ('register_reader', args) for shard in range(len(self.connections))})
+        self.readers[reader.id] = reader.name
+        self.index_readers_by_name[reader.key] = reader.id
+        # Выдачи хранятся по ID: читатель с тем же именем получает свой
+        # список, а выдачи прежнего остаются учтенными, как в Library.
+        self.loans[reader.id] = []
+        return ShardResult(Status.OK)
+
+    def borrow_book(self, title: str, reader: str) -> ShardResult:
+        """Выдает книгу читателю через шард, в котором лежит свободный экземпляр.\n
+        Наименьший свободный ID названия наименьший и в своем шарде,
+        поэтому шард выдаст именно его, как и обычная Library.
+        Args:
+            title (str): Строка с названием книги.
+            reader (str): Строка с именем читателя.
+        Returns:
+            ShardResult: Результат процедуры выдачи книги читателю.
+        """
+
+        title_key = normalize(title)
+        reader_id = self.index_readers_by_name.get(normalize(reader))
+        book_ids = self.index_books_by_title.get(title_key)
+
+        if book_ids is None:
+            return ShardResult(Status.BOOK_NOT_FOUND)
+
+        if reader_id is None:
+            return ShardResult(Status.READER_NOT_FOUND)
+
+        free = self.index_free_copies[title_key]
+        book_id = free[0] if free else next(iter(book_ids))
+        shard = self.get_shard(book_id)
+
+        loans = self.loans[reader_id]
+        if len(loans) >= self.rental_limit:
+            return ShardResult(Status.LIMIT_REACHED, book_id, shard)
+
+        if not free:
+            return ShardResult(Status.BOOK_UNAVAILABLE, book_id, shard)
+
+        status, book_id = self.call(shard, 'borrow_book', title, reader)
+        if status is Status.OK:
+            heapq.heappop(free)
+            loans.append((title_key, shard))
+        return ShardResult(status, book_id, shard)
+
+    def return_book(self, title: str, reader: str) -> ShardResult:
+        """Возвращает книгу в шард, из которого ее выдали.
+        Args:
+            title (str): Строка с названием книги.
+            reader (str): Строка с именем читателя.
+        Returns:
+            ShardResult: Результат процедуры возврата книги читателем.
+        """
+
+        title_key = normalize(title)
+        reader_id = self.index_readers_by_name.get(normalize(reader))
+        book_ids = self.index_books_by_title.get(title_key)
+
+        if book_ids is None:
+            return ShardResult(Status.BOOK_NOT_FOUND)
+
+        if reader_id is None:
+            return ShardResult(Status.READER_NOT_FOUND)
+
+        loans = self.loans[reader_id]
+        for position, (loan_title, shard) in enumerate(loans):
+            if loan_title == title_key:
+                break
+        else:
+            return ShardResult(Status.NOT_BORROWED, next(iter(book_ids)))
+
+        status, book_id = self.call(shard, 'return_book', title, reader)
+        if status is Status.OK:
+            del loans[position]
+            heapq.heappush(self.index_free_copies[title_key], book_id)
+        return ShardResult(status, book_id, shard)
+
+    def search_many(self, prompts: list) -> list:
+        """Ищет несколько запросов сразу: каждый шард получает их одним сообщением.
+        Args:
+            prompts (list): Строки запросов.
+        Returns:
+            list: SearchResult для каждого запроса. Книги представлены BookInfo
+            и упорядочены по id, читатель - именем.
+        """
+
+        answers = self.scatter({shard: ('search_many', (prompts,)) for shard in range(len(self.connections))})
+        results = []
+        for i, prompt in enumerate(prompts):
+            by_title, by_author = [], []
+            for found in answers.values():
+                by_title.extend(found[i][0])
+                by_author.extend(found[i][1])
+            by_title.sort()
+            by_author.sort()
+            reader_id = self.index_readers_by_name.get(normalize(prompt))
+            reader = None if reader_id is None else self.readers[reader_id]
+            results.append(SearchResult(by_title, by_author, reader))
+        return results
+
+    def search_book(self, prompt: str) -> SearchResult:
+        """Ищет книги по названию, автору и читателя по имени во всех шардах.
+        Args:
+            prompt (str): Строка с название книги или именем автора или именем читателя.
+        Returns:
+            SearchResult: Книги, найденные по названию и по автору, и имя читателя.
+        """
+
+        return self.search_many([prompt])[0]
+
+    def close(self) -> None:
+        """Останавливает процессы шардов."""
+
+        for connection in self.connections:
+            connection.send(None)
+            connection.close()
+        for process in self.processes:
+            process.join()
+        self.connections.clear()
+        self.processes.clear()
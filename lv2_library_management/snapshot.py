@@ -0,0 +1,353 @@
+import mmap
+import os
+import struct
+from bisect import bisect_left
+from collections.abc import MutableMapping
+
+from .library_manag_revol import Book, HoldQueue, Library, Loan, Reader, normalize
+
+# Формат снимка (little-endian, все числа 8 байт):
+#   заголовок: MAGIC, версия, номер последней учтенной записи журнала операций,
+#   rental_limit, срок выдачи в секундах, штраф за день просрочки,
+#   книг, читателей, выдач, записей истории, читателей со штрафами, событий
+#   истории выдач, очередей бронирования, броней;
+#   колонки книг: ID в порядке регистрации, ID по возрастанию и номера их строк;
+#   смещения названий и авторов в блоке строк (n + 1 значений на колонку);
+#   колонки читателей: ID и смещения имён; выдачи: четверки (ID книги,
+#   ID читателя, момент выдачи, срок возврата); штрафы: пары (ID читателя,
+#   сумма); смещения имён из borrow_history; колонки событий истории выдач:
+#   моменты, ID книг, ID читателей, признаки возврата; смещения названий
+#   очередей бронирования и их длины; брони всех очередей по порядку: тройки
+#   (ID читателя, приоритет, признак parked); брони читателей в порядке
+#   holds_by_reader: пары (ID читателя, номер очереди); блок строк UTF-8.
+MAGIC = b'LIBSNAP1'
+VERSION = 5
+HEADER = struct.Struct('<8s13q')
+
+
+def pack_column(values) -> bytes:
+    """Упаковывает последовательность целых чисел в колонку из 8-байтовых чисел."""
+
+    values = list(values)
+    return struct.pack(f'<{len(values)}q', *values)
+
+
+def pack_strings(strings: list, blob: bytearray) -> bytes:
+    """Дописывает строки в блок строк и возвращает колонку их смещений.
+    Args:
+        strings (list): Список строк.
+        blob (bytearray): Общий блок строк в кодировке UTF-8.
+    Returns:
+        bytes: Колонка из len(strings) + 1 смещений.
+    """
+
+    offsets = [len(blob)]
+    for string in strings:
+        blob += string.encode()
+        offsets.append(len(blob))
+    return pack_column(offsets)
+
+
+def save_snapshot(library: Library, path: str, sequence: int = 0) -> None:
+    """Сохраняет книги, читателей, выдачи, историю и очереди бронирования библиотеки в файл снимка.\n
+    Файл сначала пишется во временный, а затем атомарно заменяет старый снимок.
+    Индексы не сохраняются: они строятся заново при загрузке.
+    Args:
+        library (Library): Экземпляр класса Library.
+        path (str): Путь к файлу снимка.
+        sequence (int, optional): Номер последней записи журнала операций,
+        уже учтенной в снимке. Defaults to 0.
+    """
+
+    books = list(library.lib.values())
+    readers = list(library.readers.values())
+    loans = [library.loans[b.id] for r in readers for b in r.borrowed_books]
+    history = list(library.borrow_history)
+    segments = library.loan_history.segments
+    event_columns = [pack_column(value for segment in segments for value in segment[column]) for column in range(4)]
+    order = sorted(range(len(books)), key=lambda row: books[row].id)
+    queues = list(library.hold_queues.items())
+    queue_numbers = {title_key: i for i, (title_key, _) in enumerate(queues)}
+    holds = [(queue, sorted(queue.keys.values())) for _, queue in queues]
+    n_holds = sum(len(queue) for _, queue in queues)
+    blob = bytearray()
+
+    parts = [
+        HEADER.pack(MAGIC, VERSION, sequence, library.rental_limit, library.loan_period, library.fine_per_day,
+                    len(books), len(readers), len(loans), len(history), len(library.fines), len(library.loan_history),
+                    len(queues), n_holds),
+        pack_column(b.id for b in books),
+        pack_column(books[row].id for row in order),
+        pack_column(order),
+        pack_strings([b.title for b in books], blob),
+        pack_strings([b.author for b in books], blob),
+        pack_column(r.id for r in readers),
+        pack_strings([r.name for r in readers], blob),
+        pack_column(value for loan in loans for value in (loan.book.id, loan.reader.id, loan.checkout, loan.due)),
+        pack_column(value for fine in library.fines.items() for value in fine),
+        pack_strings(history, blob),
+        *event_columns,
+        pack_strings([title_key for title_key, _ in queues], blob),
+        pack_column(len(queue) for _, queue in queues),
+        pack_column(value for queue, entries in holds for priority, _, reader_id in entries
+                    for value in (reader_id, -priority, int(reader_id in queue.parked))),
+        pack_column(value for reader_id, title_keys in library.holds_by_reader.items() for title_key in title_keys
+                    for value in (reader_id, queue_numbers[title_key])),
+        bytes(blob),
+    ]
+
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'wb') as f:
+        for part in parts:
+            f.write(part)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class Snapshot:
+
+    def __init__(self, path: str) -> None:
+        """Отображает файл снимка в память и размечает его колонки.\n
+        Данные не копируются: колонки являются представлениями memoryview
+        над отображённым файлом.
+        Args:
+            path (str): Путь к файлу снимка.
+        Raises:
+            ValueError: Если файл не является снимком библиотеки.
+        """
+
+        with open(path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, *counts = HEADER.unpack_from(self.mm)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'ОШИБКА: Файл "{path}" НЕ ЯВЛЯЕТСЯ снимком библиотеки.')
+
+        (self.sequence, self.rental_limit, self.loan_period, self.fine_per_day,
+         self.n_books, self.n_readers, self.n_loans, n_history, n_fines, n_events,
+         self.n_queues, self.n_holds) = counts
+        self.view = memoryview(self.mm)
+        self.position = HEADER.size
+
+        self.book_ids = self.take_column(self.n_books)
+        self.sorted_ids = self.take_column(self.n_books)
+        self.sorted_rows = self.take_column(self.n_books)
+        self.title_offsets = self.take_column(self.n_books + 1)
+        self.author_offsets = self.take_column(self.n_books + 1)
+        self.reader_ids = self.take_column(self.n_readers)
+        self.name_offsets = self.take_column(self.n_readers + 1)
+        self.loans = self.take_column(4 * self.n_loans)
+        self.fines = self.take_column(2 * n_fines)
+        self.history_offsets = self.take_column(n_history + 1)
+        self.events = [self.take_column(n_events) for _ in range(4)]
+        self.queue_offsets = self.take_column(self.n_queues + 1)
+        self.queue_sizes = self.take_column(self.n_queues)
+        self.holds = self.take_column(3 * self.n_holds)
+        self.reader_holds = self.take_column(2 * self.n_holds)
+        self.blob_start = self.position
+
+    def take_column(self, count: int) -> memoryview:
+        """Возвращает следующую колонку из count 8-байтовых чисел."""
+
+        end = self.position + 8 * count
+        column = self.view[self.position:end].cast('q')
+        self.position = end
+        return column
+
+    def get_string(self, offsets: memoryview, row: int) -> str:
+        """Декодирует строку номер row из блока строк."""
+
+        start = self.blob_start + offsets[row]
+        end = self.blob_start + offsets[row + 1]
+        return str(self.mm[start:end], 'utf-8')
+
+    def find_row(self, book_id: int) -> int | None:
+        """Находит номер строки книги по ID двоичным поиском.
+        Args:
+            book_id (int): Уникальный идентификатор книги.
+        Returns:
+            int | None: Номер строки или None, если книги нет в снимке.
+        """
+
+        i = bisect_left(self.sorted_ids, book_id)
+        if i < self.n_books and self.sorted_ids[i] == book_id:
+            return self.sorted_rows[i]
+        return None
+
+    def make_book(self, row: int) -> Book:
+        """Создает объект книги из строки снимка."""
+
+        return Book(self.get_string(self.title_offsets, row),
+                    self.get_string(self.author_offsets, row),
+                    self.book_ids[row])
+
+
+class SnapshotCatalog(MutableMapping):
+
+    def __init__(self, snapshot: Snapshot) -> None:
+        """Словарь книг библиотеки поверх снимка.\n
+        Объект книги создается только при первом обращении к ней. Новые и
+        удаленные после загрузки книги хранятся отдельно от снимка.
+        Args:
+            snapshot (Snapshot): Отображенный в память снимок.
+        """
+
+        self.snapshot = snapshot
+        self.cache = dict()
+        self.added = dict()
+        self.deleted = set()
+
+    def __getitem__(self, book_id: int) -> Book:
+        book = self.added.get(book_id)
+        if book is not None:
+            return book
+
+        book = self.cache.get(book_id)
+        if book is not None:
+            return book
+
+        row = self.snapshot.find_row(book_id)
+        if row is None or book_id in self.deleted:
+            raise KeyError(book_id)
+
+        book = self.cache[book_id] = self.snapshot.make_book(row)
+        return book
+
+    def __contains__(self, book_id) -> bool:
+        if book_id in self.added or book_id in self.cache:
+            return True
+        return book_id not in self.deleted and self.snapshot.find_row(book_id) is not None
+
+    def __setitem__(self, book_id: int, book: Book) -> None:
+        if book_id in self:
+            del self[book_id]
+        self.added[book_id] = book
+
+    def __delitem__(self, book_id: int) -> None:
+        if book_id in self.added:
+            del self.added[book_id]
+        elif book_id in self:
+            self.cache.pop(book_id, None)
+            self.deleted.add(book_id)
+        else:
+            raise KeyError(book_id)
+
+    def __iter__(self):
+        for book_id in self.snapshot.book_ids:
+            if book_id not in self.deleted:
+                yield book_id
+        yield from self.added
+
+    def __len__(self) -> int:
+        return self.snapshot.n_books - len(self.deleted) + len(self.added)
+
+    def iter_keys(self, offsets: memoryview, attribute: str):
+        """Перебирает пары (ID книги, значение атрибута) без создания книг
+        из снимка.
+        Args:
+            offsets (memoryview): Колонка смещений строк атрибута в снимке.
+            attribute (str): Имя того же атрибута у объекта Book.
+        Returns:
+            Iterator[tuple]: Итератор пар (ID книги, строка).
+        """
+
+        snapshot = self.snapshot
+        deleted = self.deleted
+        # Строки колонки лежат в блоке подряд: читаем их одним куском.
+        data = snapshot.mm[snapshot.blob_start + offsets[0]:snapshot.blob_start + offsets[-1]]
+        base = offsets[0]
+        bounds = offsets.tolist()
+        for row, book_id in enumerate(snapshot.book_ids.tolist()):
+            if book_id not in deleted:
+                yield book_id, str(data[bounds[row] - base:bounds[row + 1] - base], 'utf-8')
+        for book_id, book in self.added.items():
+            yield book_id, getattr(book, attribute)
+
+
+def read_sequence(path: str) -> int:
+    """Возвращает номер последней записи журнала операций, учтенной в снимке.
+    Args:
+        path (str): Путь к файлу снимка.
+    Returns:
+        int: Номер записи журнала.
+    """
+
+    return Snapshot(path).sequence
+
+
+def load_snapshot(path: str) -> Library:
+    """Загружает библиотеку из файла снимка.\n
+    Книги создаются по мере обращения к ним, а индексы по названию, автору и
+    читателям строятся при первом использовании. Сразу создаются только
+    читатели и выданные им книги.
+    Args:
+        path (str): Путь к файлу снимка.
+    Returns:
+        Library: Экземпляр класса Library.
+    """
+
+    snapshot = Snapshot(path)
+    library = Library(snapshot.rental_limit, fine_per_day=snapshot.fine_per_day)
+    library.loan_period = snapshot.loan_period
+    catalog = library.lib = SnapshotCatalog(snapshot)
+
+    for row in range(snapshot.n_readers):
+        reader = Reader(snapshot.get_string(snapshot.name_offsets, row), snapshot.reader_ids[row])
+        library.readers[reader.id] = reader
+
+    loans = snapshot.loans
+    for i in range(0, len(loans), 4):
+        book = catalog[loans[i]]
+        reader = library.readers[loans[i + 1]]
+        book.status = False
+        book.borrower = reader
+        reader.borrowed_books[book] = None
+        library.loans[book.id] = Loan(book, reader, loans[i + 2], loans[i + 3])
+    library.due_index = sorted((loan.due, book_id) for book_id, loan in library.loans.items())
+
+    fines = snapshot.fines
+    library.fines = {fines[i]: fines[i + 1] for i in range(0, len(fines), 2)}
+    library.loan_history.extend_columns(*snapshot.events)
+
+    library.borrow_history = {snapshot.get_string(snapshot.history_offsets, row)
+                              for row in range(len(snapshot.history_offsets) - 1)}
+
+    queue_titles = [snapshot.get_string(snapshot.queue_offsets, row) for row in range(snapshot.n_queues)]
+    holds = snapshot.holds.tolist()
+    position = 0
+    for title_key, size in zip(queue_titles, snapshot.queue_sizes.tolist()):
+        queue = library.hold_queues[title_key] = HoldQueue()
+        for i in range(position, position + 3 * size, 3):
+            queue.push(holds[i], holds[i + 1], bool(holds[i + 2]))
+        position += 3 * size
+    reader_holds = snapshot.reader_holds.tolist()
+    for i in range(0, len(reader_holds), 2):
+        library.holds_by_reader.setdefault(reader_holds[i], dict())[queue_titles[reader_holds[i + 1]]] = None
+
+    def build_index(offsets: memoryview, attribute: str):
+        def build() -> dict:
+            index = dict()
+            for book_id, key in catalog.iter_keys(offsets, attribute):
+                library.add_in_index(index, normalize(key), book_id)
+            return index
+        return build
+
+    def build_index_books_by_reader() -> dict:
+        return {r.id: {b.id: None for b in r.borrowed_books}
+                for r in library.readers.values() if r.borrowed_books}
+
+    def build_index_readers_by_name() -> dict:
+        return {r.key: r.id for r in library.readers.values()}
+
+    lazy = {
+        'index_books_by_title': build_index(snapshot.title_offsets, 'title'),
+        'index_books_by_author': build_index(snapshot.author_offsets, 'author'),
+        'index_books_by_reader': build_index_books_by_reader,
+        'index_readers_by_name': build_index_readers_by_name,
+    }
+    for name, build in lazy.items():
+        delattr(library, name)
+        library.lazy_indexes[name] = build
+
+    return library
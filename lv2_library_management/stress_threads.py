@@ -0,0 +1,104 @@
+import random
+import sys
+import threading
+
+from .library_manag_advanc import Book, ConcurrentLibrary, Library, Reader
+
+BOOKS = 50
+READERS = 20
+LIMIT = 3
+THREADS = 16
+OPERATIONS = 200_000
+
+
+def check_invariants(library: Library) -> list:
+    """Проверяет согласованность книг, читателей и счетчиков библиотеки.
+    Args:
+        library (Library): Экземпляр объекта Library.
+    Returns:
+        list: Список строк с описанием нарушений.
+    """
+
+    errors = []
+    holders = dict()
+
+    for reader_obj in library.readers.values():
+        if len(reader_obj.borrowed_books) > library.rental_limit:
+            errors.append(f'У читателя {reader_obj.name} больше {library.rental_limit} книг')
+        for book_obj in reader_obj.borrowed_books:
+            if book_obj.id in holders:
+                errors.append(f'Книга {book_obj.id} выдана двум читателям')
+            holders[book_obj.id] = reader_obj
+
+    for book_obj in library.lib.values():
+        reader_obj = holders.get(book_obj.id)
+        if book_obj.status != (reader_obj is None):
+            errors.append(f'Статус книги {book_obj.id} не совпадает со списками читателей')
+        elif reader_obj is not None and book_obj.borrower != reader_obj.name:
+            errors.append(f'Книга {book_obj.id} числится не за тем читателем')
+
+    if len(library.books_out_stock) != len(holders):
+        errors.append('Счетчик выданных книг не совпадает с выдачами')
+    if len(library.books_in_stock) + len(library.books_out_stock) != len(library.lib):
+        errors.append('Разделы книг не покрывают весь каталог')
+    if library.loans.keys() != holders.keys():
+        errors.append('Записи о выдаче не совпадают с выдачами')
+    if library.due_index != sorted((loan.due, book_id) for book_id, loan in library.loans.items()):
+        errors.append('Индекс сроков не совпадает с записями о выдаче')
+
+    return errors
+
+
+def hammer(library: Library, seed: int) -> None:
+    """Случайно выдает и возвращает книги из одного потока."""
+
+    rnd = random.Random(seed)
+    for _ in range(OPERATIONS // THREADS):
+        book_id = rnd.randrange(BOOKS)
+        reader_id = rnd.randrange(READERS)
+        if rnd.random() < 0.1:
+            library.borrow_many([(book_id, reader_id), (rnd.randrange(BOOKS), reader_id)])
+        elif rnd.random() < 0.5:
+            library.borrow_book(book_id, reader_id)
+        else:
+            library.return_book(book_id, reader_id)
+
+
+def stress(library: Library) -> list:
+    """Запускает THREADS потоков над одной библиотекой и проверяет инварианты."""
+
+    for i in range(BOOKS):
+        library.add_book(Book(f'Книга {i}', 'Автор', i))
+    for i in range(READERS):
+        library.register_reader(Reader(f'Читатель {i}', i))
+
+    threads = [threading.Thread(target=hammer, args=(library, seed)) for seed in range(THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    return check_invariants(library)
+
+
+def main() -> None:
+    """Нагружает обычную и потокобезопасную библиотеку и завершает работу с
+    ошибкой, если потокобезопасная нарушила инварианты."""
+
+    # Частое переключение потоков увеличивает шанс поймать гонку.
+    sys.setswitchinterval(1e-6)
+
+    errors = stress(Library(LIMIT))
+    print(f'Library: нарушений {len(errors)}')
+
+    errors = stress(ConcurrentLibrary(LIMIT))
+    print(f'ConcurrentLibrary: нарушений {len(errors)}')
+    for error in errors[:10]:
+        print(error)
+
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from lv2_library_management.analytics import WEEK, CirculationAnalytics  # noqa: E402
+from lv2_library_management.library_manag_revol import DAY, Book, Library, Reader, normalize  # noqa: E402
+
+
+def count_events(library: Library, now: int) -> tuple:
+    """Отчеты перебором событий истории, которым должны соответствовать колонки NumPy."""
+
+    title_loans, author_seconds, week_readers = dict(), dict(), dict()
+    checkouts = dict()
+    for event in library.loan_history.get_events():
+        book = library.lib[event.book_id]
+        week_readers.setdefault(event.time // WEEK, set()).add(event.reader_id)
+        author_seconds.setdefault(book.author, 0)
+        if event.is_return:
+            author_seconds[book.author] += event.time - checkouts.pop(event.book_id)
+        else:
+            title_loans[book.title] = title_loans.get(book.title, 0) + 1
+            checkouts[event.book_id] = event.time
+    for book_id, checkout in checkouts.items():
+        author_seconds[library.lib[book_id].author] += now - checkout
+
+    top = sorted(title_loans.items(), key=lambda item: (-item[1], item[0]))
+    return top, author_seconds, {week: len(readers) for week, readers in week_readers.items()}
+
+
+def test_reports_match_event_scan() -> None:
+    rng = random.Random(5)
+    moment = [1_700_000_000]
+
+    def clock() -> int:
+        return moment[0]
+
+    library = Library(3, cache_size=0, clock=clock)
+    # Маленькие сегменты: refresh дочитывает сегменты с середины.
+    library.loan_history.SEGMENT_SIZE = 97
+    for i in range(200):
+        library.add_book(Book(f'Книга {rng.randrange(40)}', f'Автор {rng.randrange(8)}', i))
+    for i in range(30):
+        library.register_reader(Reader(f'Читатель {i}', i))
+    analytics = CirculationAnalytics(library)
+    assert analytics.get_top_titles() == []
+    assert analytics.get_author_utilization() == []
+
+    for step in range(5000):
+        moment[0] += rng.randrange(4 * 60 * 60)
+        title, reader = f'Книга {rng.randrange(40)}', f'Читатель {rng.randrange(30)}'
+        if rng.random() < 0.55:
+            library.borrow_book(title, reader)
+        else:
+            library.return_book(title, reader)
+        if step % 700 != 699:
+            continue
+
+        top, author_seconds, week_readers = count_events(library, moment[0])
+        assert [tuple(item) for item in analytics.get_top_titles(1000)] == top
+        assert [tuple(item) for item in analytics.get_top_titles(3)] == top[:3]
+
+        utilization = analytics.get_author_utilization()
+        assert sorted(u.author for u in utilization) == sorted(author_seconds)
+        for u in utilization:
+            assert u.loan_days == pytest.approx(author_seconds[u.author] / DAY)
+            assert u.copies == len(library.index_books_by_author[normalize(u.author)])
+            assert u.utilization == pytest.approx(author_seconds[u.author] / (
+                u.copies * (moment[0] - analytics.first_time)))
+        assert [u.utilization for u in utilization] == sorted((u.utilization for u in utilization), reverse=True)
+
+        weeks = analytics.get_active_readers_per_week()
+        assert {w.start // WEEK: w.readers for w in weeks if w.readers} == week_readers
+        assert len(weeks) == max(week_readers) - min(week_readers) + 1
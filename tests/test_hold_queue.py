@@ -0,0 +1,114 @@
+import random
+
+import pytest
+
+from lv2_library_management.library_manag_revol import Book, HoldQueue, Library, Reader, normalize
+from lv2_library_management.snapshot import load_snapshot, save_snapshot
+
+
+class ListHoldQueue:
+    """Очередь бронирования списком, которой должна соответствовать HoldQueue."""
+
+    def __init__(self) -> None:
+        self.entries = []
+        self.parked = set()
+        self.sequence = 0
+
+    def push(self, reader_id: int, priority: int = 0) -> None:
+        self.sequence += 1
+        self.entries.append((-priority, self.sequence, reader_id))
+
+    def remove(self, reader_id: int) -> None:
+        self.entries = [e for e in self.entries if e[2] != reader_id]
+        self.parked.discard(reader_id)
+
+    def get_position(self, reader_id: int) -> int | None:
+        ranked = sorted(self.entries)
+        return next((i + 1 for i, e in enumerate(ranked) if e[2] == reader_id), None)
+
+    def peek_eligible(self, is_eligible) -> int | None:
+        # Пропущенные читатели уходят в parked до unpark.
+        for entry in sorted(self.entries):
+            if entry[2] in self.parked:
+                continue
+            if is_eligible(entry[2]):
+                return entry[2]
+            self.parked.add(entry[2])
+        return None
+
+
+@pytest.mark.parametrize('compact_at', [8, HoldQueue.COMPACT_AT])
+def test_hold_queue_matches_list(compact_at: int) -> None:
+    rng = random.Random(compact_at)
+    queue, model = HoldQueue(), ListHoldQueue()
+    queue.COMPACT_AT = compact_at
+    blocked = set()
+
+    def is_eligible(reader_id: int) -> bool:
+        return reader_id not in blocked
+
+    for _ in range(20000):
+        reader_id = rng.randrange(60)
+        x = rng.random()
+        if x < 0.35:
+            if reader_id not in queue:
+                priority = rng.choice((0, 0, 0, 1, 2))
+                queue.push(reader_id, priority)
+                model.push(reader_id, priority)
+        elif x < 0.5:
+            if reader_id in queue:
+                queue.remove(reader_id)
+                model.remove(reader_id)
+        elif x < 0.6:
+            blocked ^= {reader_id}
+            if reader_id in queue and reader_id not in blocked:
+                queue.unpark(reader_id)
+                model.parked.discard(reader_id)
+        elif x < 0.75:
+            expected = model.peek_eligible(is_eligible)
+            if rng.random() < 0.5:
+                assert queue.peek_eligible(is_eligible) == expected
+            else:
+                assert queue.pop_eligible(is_eligible) == expected
+                if expected is not None:
+                    model.remove(expected)
+        else:
+            assert queue.get_position(reader_id) == model.get_position(reader_id)
+        assert len(queue) == len(model.entries)
+
+    assert [queue.get_position(e[2]) for e in sorted(model.entries)] == list(range(1, len(model.entries) + 1))
+
+
+def test_snapshot_keeps_hold_queues(tmp_path) -> None:
+    path = str(tmp_path / 'library.snap')
+    library = Library(1, cache_size=0)
+    library.add_book(Book('Чистый код', 'Роберт Мартин', 1))
+    library.add_book(Book('Python', 'Марк Лутц', 2))
+    library.add_book(Book('Linux', 'Уильям Шоттс', 3))
+    for i in range(6):
+        library.register_reader(Reader(f'Читатель {i}', i))
+    library.borrow_book('Чистый код', 'Читатель 0')
+    library.borrow_book('Python', 'Читатель 1')
+    library.borrow_book('Linux', 'Читатель 4')
+    for i in (5, 2, 3, 4):
+        library.place_hold('Чистый код', f'Читатель {i}', priority=int(i == 4))
+    library.place_hold('Python', 'Читатель 2')
+    library.place_hold('Python', 'Читатель 3')
+    library.cancel_hold('Чистый код', 'Читатель 5')
+    # Читатель 4 на лимите: возврат уводит его в parked, книга достается следующему.
+    assert library.return_book('Чистый код', 'Читатель 0').holder.id == 2
+    assert library.hold_queues[normalize('Чистый код')].parked == {4}
+
+    save_snapshot(library, path)
+    loaded = load_snapshot(path)
+
+    for title_key, queue in library.hold_queues.items():
+        copy = loaded.hold_queues[title_key]
+        # Номера постановки перенумеровываются, порядок и приоритеты сохраняются.
+        assert [(e[0], e[2]) for e in sorted(copy.keys.values())] == [(e[0], e[2]) for e in sorted(queue.keys.values())]
+        assert copy.parked == queue.parked
+    assert loaded.hold_queues.keys() == library.hold_queues.keys()
+    assert {k: list(v) for k, v in loaded.holds_by_reader.items()} == \
+        {k: list(v) for k, v in library.holds_by_reader.items()}
+    assert loaded.get_hold_position('Чистый код', 'Читатель 4') == 1
+    assert loaded.get_hold_position('Python', 'Читатель 3') == 2
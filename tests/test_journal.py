@@ -0,0 +1,126 @@
+import os
+import random
+
+from lv2_library_management.journal import JournaledLibrary, read_journal
+from lv2_library_management.library_manag_revol import Book, Reader, Status
+
+DAY = 24 * 60 * 60
+
+
+def get_state(library) -> tuple:
+    """Состояние библиотеки, которое должно пережить перезапуск."""
+
+    return (sorted((b.id, b.title, b.author, b.status, b.borrower and b.borrower.id) for b in library.lib.values()),
+            sorted((r.id, r.name) for r in library.readers.values()),
+            sorted((book_id, loan.reader.id, loan.checkout, loan.due) for book_id, loan in library.loans.items()),
+            dict(library.fines),
+            library.loan_history.get_events(),
+            {title_key: sorted((queue.get_position(reader_id), reader_id) for reader_id in queue.keys)
+             for title_key, queue in library.hold_queues.items()},
+            {reader_id: list(title_keys) for reader_id, title_keys in library.holds_by_reader.items()})
+
+
+def reopen(snapshot_path: str, journal_path: str, clock) -> tuple:
+    # Без снимка лимит берется из аргумента, как при первом запуске.
+    with JournaledLibrary(snapshot_path, journal_path, limit=2, clock=clock) as library:
+        return get_state(library.library)
+
+
+def run_random(library: JournaledLibrary, rng: random.Random, moment: list, count: int) -> None:
+    """Выполняет случайные операции с книгами, читателями и бронями."""
+
+    books = len(library.lib)
+    readers = len(library.readers)
+    for _ in range(count):
+        moment[0] += rng.randrange(3 * DAY)
+        x = rng.random()
+        if x < 0.1:
+            library.add_book(Book(f'Книга {rng.randrange(8)}', 'Автор', books))
+            books += 1
+        elif x < 0.15:
+            # Повторяющиеся имена: выдача по брони должна достаться тому же читателю.
+            library.register_reader(Reader(f'Читатель {readers % 6}', readers))
+            readers += 1
+        elif x < 0.17 and books:
+            library.remove_book(rng.randrange(books))
+        elif x < 0.27 and readers:
+            library.place_hold(f'Книга {rng.randrange(8)}', f'Читатель {rng.randrange(6)}', rng.randrange(2))
+        elif x < 0.3 and readers:
+            library.cancel_hold(f'Книга {rng.randrange(8)}', f'Читатель {rng.randrange(6)}')
+        elif x < 0.65 and readers:
+            library.borrow_book(f'Книга {rng.randrange(8)}', f'Читатель {rng.randrange(6)}')
+        elif readers:
+            library.return_book(f'Книга {rng.randrange(8)}', f'Читатель {rng.randrange(6)}')
+
+
+def test_torn_tail_is_dropped(tmp_path) -> None:
+    snapshot_path, journal_path = str(tmp_path / 'library.snap'), str(tmp_path / 'library.wal')
+    moment = [0]
+
+    def clock() -> int:
+        return moment[0]
+
+    with JournaledLibrary(snapshot_path, journal_path, limit=2, compact_every=10 ** 9, clock=clock) as library:
+        run_random(library, random.Random(1), moment, 400)
+        before = get_state(library.library)
+        library.register_reader(Reader('Последний', 10 ** 6))
+        after = get_state(library.library)
+
+    records, valid_size = read_journal(journal_path)
+    assert valid_size == os.path.getsize(journal_path)
+    assert [r[0] for r in records] == list(range(1, len(records) + 1))
+    assert reopen(snapshot_path, journal_path, clock) == after
+
+    # Недописанная последняя запись отбрасывается вместе с ее операцией.
+    with open(journal_path, 'rb') as f:
+        data = f.read()
+    for cut in (1, 7, 20):
+        with open(journal_path, 'wb') as f:
+            f.write(data[:-cut])
+        assert reopen(snapshot_path, journal_path, clock) == before
+        # Хвост отрезан, и новые записи пойдут следом за последней корректной.
+        assert os.path.getsize(journal_path) == read_journal(journal_path)[1]
+        assert read_journal(journal_path)[0] == records[:-1]
+
+
+def test_replay_after_compaction(tmp_path) -> None:
+    snapshot_path, journal_path = str(tmp_path / 'library.snap'), str(tmp_path / 'library.wal')
+    moment = [0]
+
+    def clock() -> int:
+        return moment[0]
+    rng = random.Random(2)
+
+    with JournaledLibrary(snapshot_path, journal_path, limit=2, compact_every=37, clock=clock) as library:
+        for _ in range(5):
+            run_random(library, rng, moment, 300)
+            assert os.path.exists(snapshot_path)
+            # Снимок плюс записи журнала после него.
+            assert reopen(snapshot_path, journal_path, clock) == get_state(library.library)
+        library.compact()
+        assert read_journal(journal_path) == ([], 0)
+        expected = get_state(library.library)
+
+    assert reopen(snapshot_path, journal_path, clock) == expected
+
+
+def test_handoff_is_replayed_to_same_reader(tmp_path) -> None:
+    snapshot_path, journal_path = str(tmp_path / 'library.snap'), str(tmp_path / 'library.wal')
+
+    def clock() -> int:
+        return 0
+
+    with JournaledLibrary(snapshot_path, journal_path, limit=2, clock=clock) as library:
+        library.add_book(Book('Чистый код', 'Роберт Мартин', 1))
+        library.register_reader(Reader('Eve', 1))
+        library.register_reader(Reader('Bob', 2))
+        library.borrow_book('Чистый код', 'Bob')
+        library.place_hold('Чистый код', 'Eve')
+        # Второй читатель с тем же именем: индекс по имени указывает на него.
+        library.register_reader(Reader('Eve', 3))
+        result = library.return_book('Чистый код', 'Bob')
+        assert result.status is Status.OK
+        assert result.holder.id == 1
+        expected = get_state(library.library)
+
+    assert reopen(snapshot_path, journal_path, clock) == expected
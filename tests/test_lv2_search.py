@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from lv2_library.library import Book, Library, normalize
+
+WORDS = ['Python', 'Linux', 'Код', 'Ёжик', 'ежик', 'Мартин', 'Роберт', 'API', 'Fast', 'и', 'a']
+
+
+def scan(books: list, prompt: str) -> list:
+    """Поиск перебором, которому должен соответствовать n-граммный индекс."""
+
+    query = normalize(prompt)
+    return [b for b in books if query in normalize(f'{b.title} {b.author}')]
+
+
+def make_books(rng: random.Random, count: int) -> list:
+    return [Book(' '.join(rng.choices(WORDS, k=rng.randint(1, 3))),
+                 ' '.join(rng.choices(WORDS, k=rng.randint(1, 2))), 2000 + i)
+            for i in range(count)]
+
+
+def make_queries(rng: random.Random, books: list, count: int) -> list:
+    """Подстроки строки "название автор", в том числе через границу
+    названия и автора, короткие запросы и запросы без совпадений."""
+
+    queries = ['', ' ', 'zzz', 'python linux', '  PYTHON  ']
+    for _ in range(count):
+        book = rng.choice(books)
+        text = f'{book.title} {book.author}'
+        start = rng.randrange(len(text))
+        queries.append(text[start:start + rng.randint(1, 12)])
+        # Конец названия и начало автора.
+        queries.append(f'{book.title[-rng.randint(1, 3):]} {book.author[:rng.randint(1, 3)]}')
+        queries.append(''.join(rng.choices('ёеаиктоnpyx ', k=rng.randint(1, 2))))
+    return queries
+
+
+@pytest.mark.parametrize('cache_size', [0, 64])
+def test_search_book_matches_scan(cache_size: int) -> None:
+    rng = random.Random(cache_size)
+    library = Library(cache_size=cache_size)
+    books = make_books(rng, 400)
+
+    for i, book in enumerate(books):
+        library.add_book(book)
+        # Поиск между добавлениями проверяет и сброс кэша.
+        if i % 40 == 0:
+            for query in make_queries(rng, books[:i + 1], 20):
+                assert library.search_book(query) == scan(books[:i + 1], query), query
+
+    for query in make_queries(rng, books, 1000):
+        assert library.search_book(query) == scan(books, query), query
+
+
+def test_short_queries_use_scan() -> None:
+    library = Library()
+    books = [Book('Ёлка', 'Иван', 1), Book('Лес', 'Ёж', 2), Book('Код', 'Ли', 3)]
+    for book in books:
+        library.add_book(book)
+
+    for query in ('', 'е', 'Ё', 'ли', 'с ', ' е', 'x'):
+        assert library.search_book(query) == scan(books, query), query